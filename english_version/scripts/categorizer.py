@@ -0,0 +1,230 @@
+# categorizer.py - Single-pass term categorization and abstract scanning
+# The taxonomy (research methods, category keywords, inference words) is
+# compiled once into an Aho-Corasick automaton; a term is scanned once and the
+# highest-priority match decides its category
+
+import re
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+try:
+    import ahocorasick
+
+    HAS_AHOCORASICK = True
+except ImportError:  # pragma: no cover - depends on environment
+    HAS_AHOCORASICK = False
+
+RESEARCH_METHODS = "research_methods"
+UNCLASSIFIED = "unclassified"
+DEFAULT_MEMO_SIZE = 100_000
+
+
+class KeywordAutomaton:
+    """Multi-pattern substring matcher returning the best (lowest) rank found
+
+    Uses pyahocorasick when installed, otherwise a pure-Python automaton.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, int]], backend: Optional[str] = None) -> None:
+        ranks: Dict[str, int] = {}
+        for pattern, rank in patterns:
+            if pattern:
+                ranks[pattern] = min(rank, ranks.get(pattern, rank))
+
+        if backend is None:
+            backend = "ahocorasick" if HAS_AHOCORASICK else "python"
+        self.backend = backend
+
+        if backend == "ahocorasick":
+            self._automaton = ahocorasick.Automaton()
+            for pattern, rank in ranks.items():
+                self._automaton.add_word(pattern, rank)
+            if ranks:
+                self._automaton.make_automaton()
+        else:
+            self._build(ranks)
+
+    def _build(self, ranks: Mapping[str, int]) -> None:
+        """Goto/fail tables, with each state's best rank folded along its fail chain"""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._best: List[Optional[int]] = [None]
+
+        for pattern, rank in ranks.items():
+            state = 0
+            for char in pattern:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(None)
+                state = nxt
+            best = self._best[state]
+            self._best[state] = rank if best is None else min(best, rank)
+
+        # Breadth-first, so fail targets are complete before their dependants
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                inherited = self._best[self._fail[nxt]]
+                if inherited is not None:
+                    own = self._best[nxt]
+                    self._best[nxt] = inherited if own is None else min(own, inherited)
+
+    def best_rank(self, text: str) -> Optional[int]:
+        """Lowest rank among the patterns occurring in text, or None"""
+        best: Optional[int] = None
+
+        if self.backend == "ahocorasick":
+            if self._automaton.kind == ahocorasick.EMPTY:
+                return None
+            for _, rank in self._automaton.iter(text):
+                if best is None or rank < best:
+                    best = rank
+                    if best == 0:
+                        break
+            return best
+
+        goto, fail, ranks = self._goto, self._fail, self._best
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            rank = ranks[state]
+            if rank is not None and (best is None or rank < best):
+                best = rank
+                if best == 0:
+                    break
+        return best
+
+
+class TermCategorizer:
+    """Category of a term by taxonomy priority, memoised per term
+
+    Priority: research methods, then categories in declaration order, then
+    the inference word lists in order, else "unclassified".
+    """
+
+    def __init__(
+        self,
+        research_methods: Iterable[str],
+        categories: Mapping[str, Mapping[str, Sequence[str]]],
+        inference_words: Sequence[Tuple[str, Sequence[str]]] = (),
+        memo_size: int = DEFAULT_MEMO_SIZE,
+        backend: Optional[str] = None,
+    ) -> None:
+        # Rank -> category; every pattern of a group shares its group's rank
+        self.outcomes: List[str] = [RESEARCH_METHODS]
+        patterns = [(term, 0) for term in research_methods]
+        for category, info in categories.items():
+            patterns += [(keyword, len(self.outcomes)) for keyword in info["keywords"]]
+            self.outcomes.append(category)
+        for category, words in inference_words:
+            patterns += [(word, len(self.outcomes)) for word in words]
+            self.outcomes.append(category)
+
+        self.automaton = KeywordAutomaton(patterns, backend=backend)
+        self.memo_size = memo_size
+        self._memo: Dict[str, str] = {}
+
+    def categorize(self, term: str) -> str:
+        try:
+            return self._memo[term]
+        except KeyError:
+            pass
+
+        rank = self.automaton.best_rank(term.lower())
+        category = UNCLASSIFIED if rank is None else self.outcomes[rank]
+
+        if len(self._memo) >= self.memo_size:
+            del self._memo[next(iter(self._memo))]
+        self._memo[term] = category
+        return category
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Regex matching the longest of words at a position, with shared prefixes factored out"""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in node.items() if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+class AbstractScanner:
+    """Cleaned category keywords mentioned in a text
+
+    Keywords are cleaned once here; `scan` returns their cleaned forms in
+    keyword declaration order. With pyahocorasick the text is walked once by
+    the C automaton; otherwise one compiled regex finds the longest keyword
+    starting at each position in a single pass, and the keywords contained in
+    it are added from a table built here.
+    """
+
+    def __init__(
+        self,
+        categories: Mapping[str, Mapping[str, Sequence[str]]],
+        clean: Callable[[str], Optional[str]],
+        backend: Optional[str] = None,
+    ) -> None:
+        # Distinct keywords in declaration order, with their cleaned terms
+        cleaned: Dict[str, str] = {}
+        for info in categories.values():
+            for keyword in info["keywords"]:
+                if keyword not in cleaned:
+                    term = clean(keyword)
+                    if term:
+                        cleaned[keyword] = term
+        self.keywords = list(cleaned)
+        self.terms = list(cleaned.values())
+
+        if backend is None:
+            backend = "ahocorasick" if HAS_AHOCORASICK else "python"
+        self.backend = backend
+        if backend == "ahocorasick" and self.keywords:
+            self._automaton = ahocorasick.Automaton()
+            for index, keyword in enumerate(self.keywords):
+                self._automaton.add_word(keyword, index)
+            self._automaton.make_automaton()
+        else:
+            self.backend = "python"
+            # Every keyword occurring at a position is a prefix of the longest
+            # one matched there, so matches imply the keywords they contain
+            self._index = {keyword: index for index, keyword in enumerate(self.keywords)}
+            self._contained = [
+                [index for index, other in enumerate(self.keywords) if other in keyword]
+                for keyword in self.keywords
+            ]
+            self._pattern = re.compile(f"(?=({_trie_pattern(self.keywords)}))")
+
+    def scan(self, text: str) -> List[str]:
+        text = text.lower()
+        if self.backend == "ahocorasick":
+            found = sorted({index for _, index in self._automaton.iter(text)})
+        elif not self.keywords:
+            return []
+        else:
+            longest = {self._index[match] for match in self._pattern.findall(text)}
+            found = sorted({index for i in longest for index in self._contained[i]})
+        # Different keywords can clean to the same term
+        return list(dict.fromkeys(self.terms[index] for index in found))
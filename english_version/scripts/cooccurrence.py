@@ -0,0 +1,397 @@
+# cooccurrence.py - Term and term-pair counting for the co-occurrence network
+# Terms are interned to integer columns and articles buffered as rows of a
+# binary article x term matrix X; pair counts are the upper triangle of Xᵀ·X,
+# folded in a batch of articles at a time
+
+import os
+import tempfile
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+try:
+    from scipy import sparse
+
+    HAS_SCIPY = True
+except ImportError:  # pragma: no cover - depends on environment
+    HAS_SCIPY = False
+
+# A term pair (i, j), i < j, is packed into one int64 key: i << PAIR_SHIFT | j
+PAIR_SHIFT = 32
+PAIR_MASK = (1 << PAIR_SHIFT) - 1
+
+
+def pair_counts(
+    indices: npt.ArrayLike,
+    indptr: npt.ArrayLike,
+    n_terms: int,
+    row_weights: Optional[npt.ArrayLike] = None,
+    backend: Optional[str] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Upper triangle of Xᵀ·diag(w)·X for a binary CSR matrix X
+
+    Row i of X holds the (distinct) column ids indices[indptr[i]:indptr[i + 1]].
+    Returns the sorted packed pair keys and their counts, zero counts dropped.
+    Uses a SciPy sparse product when available, otherwise NumPy pair expansion.
+    """
+    columns = np.asarray(indices, dtype=np.int64)
+    offsets = np.asarray(indptr, dtype=np.int64)
+    n_rows = len(offsets) - 1
+    lengths = np.diff(offsets)
+    weights = (
+        np.ones(n_rows, dtype=np.int64)
+        if row_weights is None
+        else np.asarray(row_weights, dtype=np.int64)
+    )
+    if backend is None:
+        backend = "scipy" if HAS_SCIPY else "numpy"
+
+    if backend == "scipy":
+        weighted = sparse.csr_matrix(
+            (np.repeat(weights, lengths), columns, offsets), shape=(n_rows, n_terms)
+        )
+        binary = sparse.csr_matrix(
+            (np.ones(len(columns), dtype=np.int64), columns, offsets), shape=(n_rows, n_terms)
+        )
+        product = sparse.triu(binary.T.tocsr() @ weighted, k=1).tocoo()
+        first, second, counts = product.row, product.col, product.data
+    else:
+        # Pair every position with the later positions of its row
+        row_of = np.repeat(np.arange(n_rows, dtype=np.int64), lengths)
+        later = offsets[row_of + 1] - np.arange(len(columns), dtype=np.int64) - 1
+        left = np.repeat(np.arange(len(columns), dtype=np.int64), later)
+        starts = np.repeat(np.cumsum(later) - later, later)
+        right = left + np.arange(len(left), dtype=np.int64) - starts + 1
+        first = np.minimum(columns[left], columns[right])
+        second = np.maximum(columns[left], columns[right])
+        counts = weights[row_of[left]]
+
+    keys, inverse = np.unique(
+        (first.astype(np.int64) << PAIR_SHIFT) | second.astype(np.int64), return_inverse=True
+    )
+    totals = np.bincount(inverse.ravel(), weights=counts, minlength=len(keys)).astype(np.int64)
+    keep = totals != 0
+    return keys[keep], totals[keep]
+
+
+def merge_pair_counts(
+    keys: np.ndarray,
+    counts: np.ndarray,
+    new_keys: np.ndarray,
+    new_counts: np.ndarray,
+    partial: bool = False,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Add sorted (key, count) arrays; pairs whose count drops to 0 or below are removed
+
+    With `partial` (other counts live in spilled runs) only zero counts are
+    removed, since a negative partial count can still be offset by a run.
+    """
+    positions = np.searchsorted(keys, new_keys)
+    found = positions < len(keys)
+    found[found] = keys[positions[found]] == new_keys[found]
+
+    counts = counts.copy()
+    counts[positions[found]] += new_counts[found]
+    missing = ~found
+    keys = np.insert(keys, positions[missing], new_keys[missing])
+    counts = np.insert(counts, positions[missing], new_counts[missing])
+
+    keep = counts != 0 if partial else counts > 0
+    if not keep.all():
+        keys, counts = keys[keep], counts[keep]
+    return keys, counts
+
+
+def merge_runs(
+    runs: Sequence[Tuple[np.ndarray, np.ndarray]], block_size: int = 1 << 20
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """K-way merge of sorted (key, count) runs, summing equal keys, block by block
+
+    Runs may be memory-mapped; at most block_size entries per run are read
+    at a time. Every key up to the smallest last key of the current blocks
+    is complete once those blocks are read, so it is emitted in that step.
+    """
+    positions = [0] * len(runs)
+    while True:
+        active = [i for i, (keys, _) in enumerate(runs) if positions[i] < len(keys)]
+        if not active:
+            return
+        bound = min(runs[i][0][min(positions[i] + block_size, len(runs[i][0])) - 1] for i in active)
+        block_keys, block_counts = [], []
+        for i in active:
+            keys, counts = runs[i]
+            start = positions[i]
+            stop = start + int(
+                np.searchsorted(keys[start : start + block_size], bound, side="right")
+            )
+            block_keys.append(np.asarray(keys[start:stop]))
+            block_counts.append(np.asarray(counts[start:stop]))
+            positions[i] = stop
+
+        merged, inverse = np.unique(np.concatenate(block_keys), return_inverse=True)
+        totals = np.bincount(
+            inverse.ravel(), weights=np.concatenate(block_counts), minlength=len(merged)
+        )
+        yield merged, totals.astype(np.int64)
+
+
+def _concat_blocks(
+    blocks: List[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    if len(blocks) == 1:
+        return blocks[0]
+    if not blocks:
+        return tuple(np.empty(0, dtype=np.int64) for _ in range(3))  # type: ignore[return-value]
+    first, second, counts = zip(*blocks)
+    return np.concatenate(first), np.concatenate(second), np.concatenate(counts)
+
+
+class CooccurrenceCounter:
+    """Running node frequencies and pair counts over a stream of articles
+
+    Terms are interned to integer ids and all counting is done on those ids.
+    Added articles are buffered as rows of term ids and folded into the counts
+    BATCH_SIZE rows at a time; subtracted articles are rows of weight -1.
+    """
+
+    BATCH_SIZE = 20_000
+
+    def __init__(self, backend: Optional[str] = None, memory_budget: Optional[int] = None) -> None:
+        self.articles = 0
+        # Every term seen -> id; ids are never reused
+        self.vocabulary: Dict[str, int] = {}
+        self.terms: List[str] = []
+        self.backend = backend
+        # Buffered rows, not yet folded into the counts
+        self._indices = array("i")
+        self._indptr = array("q", [0])
+        self._weights = array("b")
+        # Folded counts: frequency per term id, pair counts sorted by packed key
+        self._frequency = np.zeros(0, dtype=np.int64)
+        self._keys = np.empty(0, dtype=np.int64)
+        self._counts = np.empty(0, dtype=np.int64)
+        # Past memory_budget bytes (16 per pair) the in-memory pair table is
+        # written out as a sorted run; reads merge the runs back
+        self.memory_budget = memory_budget
+        self._spill_dir: Optional[tempfile.TemporaryDirectory] = None
+        self._runs: List[str] = []
+
+    def intern(self, terms: Iterable[str]) -> List[int]:
+        """Ids of terms, adding unseen ones to the vocabulary"""
+        vocabulary = self.vocabulary
+        ids = []
+        for term in terms:
+            term_id = vocabulary.get(term)
+            if term_id is None:
+                term_id = vocabulary[term] = len(self.terms)
+                self.terms.append(term)
+            ids.append(term_id)
+        return ids
+
+    def add_ids(self, ids: Iterable[int], weight: int = 1) -> None:
+        """Fold one article's (distinct) term ids in; weight -1 takes one out"""
+        self.articles += weight
+        self._indices.extend(dict.fromkeys(ids))
+        self._indptr.append(len(self._indices))
+        self._weights.append(weight)
+        if len(self._weights) >= self.BATCH_SIZE:
+            self.fold()
+
+    def fold(self) -> None:
+        """Fold the buffered rows into the counts (done before any read)"""
+        if not self._weights:
+            return
+        indices = np.frombuffer(self._indices, dtype=np.int32)
+        indptr = np.frombuffer(self._indptr, dtype=np.int64)
+        weights = np.frombuffer(self._weights, dtype=np.int8)
+
+        frequency = np.bincount(
+            indices, weights=np.repeat(weights, np.diff(indptr)), minlength=len(self.terms)
+        ).astype(np.int64)
+        frequency[: len(self._frequency)] += self._frequency
+        self._frequency = frequency
+
+        self._fold_pairs(indices, indptr, weights)
+        self._indices = array("i")
+        self._indptr = array("q", [0])
+        self._weights = array("b")
+
+    def _fold_pairs(self, indices: np.ndarray, indptr: np.ndarray, weights: np.ndarray) -> None:
+        """Fold one batch of buffered rows into the pair counts"""
+        self._add_pairs(
+            *pair_counts(indices, indptr, len(self.terms), weights, backend=self.backend)
+        )
+
+    def add(self, terms: Iterable[str]) -> None:
+        """Fold one article's term list into the counts"""
+        self.add_ids(self.intern(terms))
+
+    def subtract(self, terms: Iterable[str]) -> None:
+        """Remove one previously added article's contribution"""
+        self.add_ids(self.intern(terms), -1)
+
+    def add_counts(
+        self,
+        terms: Sequence[str],
+        frequency: npt.ArrayLike,
+        pairs: npt.ArrayLike,
+    ) -> List[int]:
+        """Add raw counts over `terms`, e.g. from a saved state; returns their ids
+
+        `frequency` holds one count per term and `pairs` (i, j, weight) rows
+        whose i and j index `terms`.
+        """
+        self.fold()
+        term_ids = self.intern(terms)
+        ids = np.array(term_ids, dtype=np.int64)
+
+        counts = np.zeros(len(self.terms), dtype=np.int64)
+        counts[: len(self._frequency)] = self._frequency
+        np.add.at(counts, ids, np.asarray(frequency, dtype=np.int64))
+        self._frequency = counts
+
+        rows = np.asarray(pairs, dtype=np.int64).reshape(-1, 3)
+        first, second = ids[rows[:, 0]], ids[rows[:, 1]]
+        keys, inverse = np.unique(
+            (np.minimum(first, second) << PAIR_SHIFT) | np.maximum(first, second),
+            return_inverse=True,
+        )
+        weights = np.bincount(inverse.ravel(), weights=rows[:, 2], minlength=len(keys))
+        self._add_pairs(keys, weights.astype(np.int64))
+        return term_ids
+
+    def _add_pairs(self, keys: np.ndarray, counts: np.ndarray) -> None:
+        """Merge sorted pair counts into the in-memory table, spilling it if too big"""
+        self._keys, self._counts = merge_pair_counts(
+            self._keys, self._counts, keys, counts, partial=bool(self._runs)
+        )
+        if self.memory_budget is not None and (
+            self._keys.nbytes + self._counts.nbytes > self.memory_budget
+        ):
+            self._spill()
+
+    def _spill_path(self, name: str) -> str:
+        """Path for a temporary file, removed with the counter"""
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.TemporaryDirectory(prefix="migranet-pairs-")
+        return os.path.join(self._spill_dir.name, name)
+
+    def _spill(self) -> None:
+        """Write the in-memory pair table to disk as a sorted run and clear it"""
+        path = self._spill_path(f"run-{len(self._runs)}")
+        np.save(f"{path}.keys.npy", self._keys)
+        np.save(f"{path}.counts.npy", self._counts)
+        self._runs.append(path)
+        self._keys = np.empty(0, dtype=np.int64)
+        self._counts = np.empty(0, dtype=np.int64)
+
+    def _clear_pairs(self) -> None:
+        """Drop every pair count, in memory and spilled"""
+        for path in self._runs:
+            os.remove(f"{path}.keys.npy")
+            os.remove(f"{path}.counts.npy")
+        self._runs = []
+        self._keys = np.empty(0, dtype=np.int64)
+        self._counts = np.empty(0, dtype=np.int64)
+
+    @property
+    def spilled_runs(self) -> int:
+        """Number of pair-count runs written to disk so far"""
+        return len(self._runs)
+
+    def merge(self, other: "CooccurrenceCounter") -> None:
+        """Add another counter's counts, e.g. one filled by a worker process
+
+        Terms new to this counter are interned in the other's first-seen order,
+        so merging partial counters in corpus order gives the serial result.
+        """
+        first, second, weights = other.pairs()
+        self.add_counts(other.terms, other.frequencies(), np.column_stack([first, second, weights]))
+        self.articles += other.articles
+
+    def frequencies(self) -> np.ndarray:
+        """Frequency of every term id (0 once all its articles are subtracted)"""
+        self.fold()
+        return self._frequency
+
+    @property
+    def node_frequency(self) -> Dict[str, int]:
+        """Terms with a positive frequency, in first-seen order"""
+        return self.filtered_terms(1)
+
+    def filtered_terms(self, min_frequency: int) -> Dict[str, int]:
+        """Terms whose frequency reaches min_frequency"""
+        frequency = self.frequencies()
+        ids = np.flatnonzero(frequency >= max(min_frequency, 1))
+        return dict(zip([self.terms[i] for i in ids.tolist()], frequency[ids].tolist()))
+
+    def iter_pairs(
+        self, min_weight: int = 1, block_size: int = 1 << 20
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Blocks of term id pairs (i < j) and counts reaching min_weight, in (i, j) order
+
+        Spilled runs are k-way merged with the in-memory table, with min_weight
+        applied during the merge, so memory stays bounded by the block size.
+        """
+        self.fold()
+        min_weight = max(min_weight, 1)
+        if not self._runs:
+            blocks: Iterable[Tuple[np.ndarray, np.ndarray]] = [(self._keys, self._counts)]
+        else:
+            # Runs are memory-mapped and read a block at a time
+            runs = [
+                (
+                    np.load(f"{path}.keys.npy", mmap_mode="r"),
+                    np.load(f"{path}.counts.npy", mmap_mode="r"),
+                )
+                for path in self._runs
+            ]
+            runs.append((self._keys, self._counts))
+            blocks = merge_runs(runs, block_size)
+
+        for keys, counts in blocks:
+            keep = counts >= min_weight
+            yield keys[keep] >> PAIR_SHIFT, keys[keep] & PAIR_MASK, counts[keep]
+
+    def pairs(self, min_weight: int = 1) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Term id pairs (i < j) and their counts, sorted by (i, j)"""
+        return _concat_blocks(list(self.iter_pairs(min_weight)))
+
+    def edges(
+        self, min_weight: int = 1, terms: Optional[Iterable[str]] = None
+    ) -> Tuple[List[str], List[str], List[int]]:
+        """Term1, Term2 and Weight columns of the pairs reaching min_weight
+
+        If `terms` is given, both endpoints must be in it. Counting every pair and
+        restricting afterwards gives the same weights as counting only those
+        terms. Each pair is ordered term1 < term2, and rows are sorted by pair.
+        """
+        member = None
+        if terms is not None:
+            member = np.zeros(len(self.terms), dtype=bool)
+            member[[self.vocabulary[term] for term in terms if term in self.vocabulary]] = True
+
+        kept = []
+        for first, second, weights in self.iter_pairs(min_weight):
+            if member is not None:
+                keep = member[first] & member[second]
+                first, second, weights = first[keep], second[keep], weights[keep]
+            kept.append((first, second, weights))
+        first, second, weights = _concat_blocks(kept)
+
+        # Alphabetical rank of every interned term, to orient and sort the pairs
+        labels = np.array(self.terms, dtype=object)
+        rank = np.empty(len(labels), dtype=np.int64)
+        rank[np.argsort(labels, kind="stable")] = np.arange(len(labels))
+        low = np.where(rank[first] < rank[second], first, second)
+        high = np.where(rank[first] < rank[second], second, first)
+        order = np.lexsort((rank[high], rank[low]))
+        return labels[low[order]].tolist(), labels[high[order]].tolist(), weights[order].tolist()
+
+    @property
+    def edge_weights(self) -> Dict[Tuple[str, str], int]:
+        """Every pair count as {(term1, term2): weight}"""
+        sources, targets, weights = self.edges()
+        return dict(zip(zip(sources, targets), weights))
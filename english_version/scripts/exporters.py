@@ -0,0 +1,253 @@
+# exporters.py - Output stage for the refined network
+# Writes the detailed node/edge tables once per requested format, the Gephi
+# CSV projections only when asked for, and GEXF/GraphML for direct import
+
+import datetime
+import os
+from typing import IO, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+import pandas as pd
+
+from matrices import DocumentTermPostings
+from network_db import write_sqlite
+
+try:
+    import pyarrow  # noqa: F401
+
+    HAS_PYARROW = True
+except ImportError:  # pragma: no cover - depends on environment
+    HAS_PYARROW = False
+
+# Supported formats for the detailed tables, mapped to file extensions
+OUTPUT_FORMATS = {
+    "csv": "csv",
+    "csv.gz": "csv.gz",
+    "parquet": "parquet",
+    "feather": "feather",
+}
+
+# Columns Gephi's Data Laboratory imports
+GEPHI_NODE_COLUMNS = ["Id", "Label", "Category", "Frequency"]
+GEPHI_EDGE_COLUMNS = ["Source", "Target", "Weight", "Type"]
+
+# Node columns written as typed graph attributes: (column, GEXF type, GraphML type)
+NODE_ATTRIBUTES = (
+    ("Category", "string", "string"),
+    ("Frequency", "integer", "int"),
+    ("Category_Description", "string", "string"),
+)
+
+# "Academic Style" palette from config/README.md, pre-applied in GEXF output
+CATEGORY_COLORS = {
+    "trigger_mechanisms": (255, 193, 7),
+    "true_comorbidities": (244, 67, 54),
+    "social_impact": (33, 150, 243),
+    "interventions": (76, 175, 80),
+}
+
+
+def check_formats(formats: Sequence[str]) -> List[str]:
+    """Validate requested output formats, raising ValueError/ImportError early"""
+    known = list(OUTPUT_FORMATS) + list(GRAPH_FORMATS) + ["sqlite"]
+    unknown = [fmt for fmt in formats if fmt not in known]
+    if unknown:
+        raise ValueError(
+            f"Unknown output format(s): {', '.join(unknown)} (choose from {', '.join(known)})"
+        )
+    if not HAS_PYARROW and any(fmt in ("parquet", "feather") for fmt in formats):
+        raise ImportError("Parquet/Feather output requires: pip install pyarrow")
+    return list(formats)
+
+
+def write_table(df: pd.DataFrame, path_stem: str, fmt: str) -> str:
+    """Write one frame in the given format; returns the file path"""
+    path = f"{path_stem}.{OUTPUT_FORMATS[fmt]}"
+    if fmt == "csv":
+        df.to_csv(path, index=False, encoding="utf-8-sig")
+    elif fmt == "csv.gz":
+        df.to_csv(path, index=False, encoding="utf-8", compression="gzip")
+    elif fmt == "parquet":
+        df.to_parquet(path, index=False, compression="zstd")
+    elif fmt == "feather":
+        df.reset_index(drop=True).to_feather(path, compression="lz4")
+    return path
+
+
+def _node_rows(nodes_df: pd.DataFrame) -> Iterator[Tuple]:
+    """Node fields in attribute order, iterated without materialising row objects"""
+    columns = ["Id", "Label"] + [name for name, _, _ in NODE_ATTRIBUTES]
+    yield from nodes_df.reindex(columns=columns).itertuples(index=False, name=None)
+
+
+def _edge_rows(edges_df: pd.DataFrame) -> Iterator[Tuple]:
+    columns = ["Source", "Target", "Weight"]
+    yield from edges_df.reindex(columns=columns).itertuples(index=False, name=None)
+
+
+def _value(value: object) -> str:
+    """Attribute value as text; missing values become empty strings"""
+    if value is None or (isinstance(value, float) and pd.isna(value)) or value is pd.NA:
+        return ""
+    return str(value)
+
+
+def _write_gexf_nodes(f: IO[str], nodes_df: pd.DataFrame) -> None:
+    for node_id, label, *attributes in _node_rows(nodes_df):
+        f.write(f"      <node id={quoteattr(_value(node_id))} label={quoteattr(_value(label))}>\n")
+        f.write("        <attvalues>\n")
+        for (name, _, _), value in zip(NODE_ATTRIBUTES, attributes):
+            f.write(
+                f"          <attvalue for={quoteattr(name.lower())} "
+                f"value={quoteattr(_value(value))}/>\n"
+            )
+        f.write("        </attvalues>\n")
+        color = CATEGORY_COLORS.get(_value(attributes[0]))
+        if color:
+            f.write(f'        <viz:color r="{color[0]}" g="{color[1]}" b="{color[2]}"/>\n')
+        f.write("      </node>\n")
+
+
+def write_gexf(nodes_df: pd.DataFrame, edges_df: pd.DataFrame, path: str) -> str:
+    """Stream the network to a GEXF 1.3 file with typed node attributes
+
+    Elements are written row by row, so memory does not grow with the graph.
+    Nodes carry Category, Frequency and Category_Description attributes plus
+    a category colour; edges carry their Weight.
+    """
+    today = datetime.date.today().isoformat()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write(
+            '<gexf xmlns="http://gexf.net/1.3" xmlns:viz="http://gexf.net/1.3/viz" '
+            'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+            'xsi:schemaLocation="http://gexf.net/1.3 http://gexf.net/1.3/gexf.xsd" '
+            'version="1.3">\n'
+        )
+        f.write(f'  <meta lastmodifieddate="{today}">\n')
+        f.write("    <creator>MigraNet</creator>\n")
+        f.write("    <description>Refined PubMed term co-occurrence network</description>\n")
+        f.write("  </meta>\n")
+        f.write('  <graph mode="static" defaultedgetype="undirected">\n')
+
+        f.write('    <attributes class="node" mode="static">\n')
+        for name, gexf_type, _ in NODE_ATTRIBUTES:
+            f.write(
+                f"      <attribute id={quoteattr(name.lower())} title={quoteattr(name)} "
+                f'type="{gexf_type}"/>\n'
+            )
+        f.write("    </attributes>\n")
+
+        f.write("    <nodes>\n")
+        _write_gexf_nodes(f, nodes_df)
+        f.write("    </nodes>\n")
+
+        f.write("    <edges>\n")
+        for i, (source, target, weight) in enumerate(_edge_rows(edges_df)):
+            f.write(
+                f'      <edge id="{i}" source={quoteattr(_value(source))} '
+                f"target={quoteattr(_value(target))} weight={quoteattr(_value(weight))}/>\n"
+            )
+        f.write("    </edges>\n")
+
+        f.write("  </graph>\n")
+        f.write("</gexf>\n")
+    return path
+
+
+def write_graphml(nodes_df: pd.DataFrame, edges_df: pd.DataFrame, path: str) -> str:
+    """Stream the network to a GraphML file with typed node and edge attributes"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write(
+            '<graphml xmlns="http://graphml.graphdrawing.org/xmlns" '
+            'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+            'xsi:schemaLocation="http://graphml.graphdrawing.org/xmlns '
+            'http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd">\n'
+        )
+        f.write('  <key id="label" for="node" attr.name="Label" attr.type="string"/>\n')
+        for name, _, graphml_type in NODE_ATTRIBUTES:
+            f.write(
+                f'  <key id={quoteattr(name.lower())} for="node" '
+                f'attr.name={quoteattr(name)} attr.type="{graphml_type}"/>\n'
+            )
+        # Gephi maps an edge attribute named "weight" to the edge weight
+        f.write('  <key id="weight" for="edge" attr.name="Weight" attr.type="double"/>\n')
+        f.write('  <graph id="G" edgedefault="undirected">\n')
+
+        for node_id, label, *attributes in _node_rows(nodes_df):
+            f.write(f"    <node id={quoteattr(_value(node_id))}>\n")
+            f.write(f'      <data key="label">{escape(_value(label))}</data>\n')
+            for (name, _, _), value in zip(NODE_ATTRIBUTES, attributes):
+                f.write(
+                    f"      <data key={quoteattr(name.lower())}>{escape(_value(value))}</data>\n"
+                )
+            f.write("    </node>\n")
+
+        for source, target, weight in _edge_rows(edges_df):
+            f.write(
+                f"    <edge source={quoteattr(_value(source))} "
+                f"target={quoteattr(_value(target))}>\n"
+                f'      <data key="weight">{escape(_value(weight))}</data>\n'
+                "    </edge>\n"
+            )
+
+        f.write("  </graph>\n")
+        f.write("</graphml>\n")
+    return path
+
+
+# Whole-graph formats, written as network.<format>
+GRAPH_FORMATS: Dict[str, Callable[[pd.DataFrame, pd.DataFrame, str], str]] = {
+    "gexf": write_gexf,
+    "graphml": write_graphml,
+}
+
+
+def write_network(
+    nodes_df: pd.DataFrame,
+    edges_df: pd.DataFrame,
+    output_dir: str,
+    formats: Sequence[str] = ("csv",),
+    gephi: bool = True,
+    postings: Optional[DocumentTermPostings] = None,
+) -> List[str]:
+    """Write detailed_{nodes,edges} in each format, plus gephi_{nodes,edges}.csv if asked
+
+    The graph formats (gexf, graphml) produce a single network.<format> file,
+    and sqlite a network.sqlite database (with article postings if recorded).
+    The defaults reproduce the classic four CSV files.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+
+    if gephi:
+        # Gephi only imports CSV; keep the BOM for spreadsheet compatibility
+        written.append(
+            write_table(
+                nodes_df.reindex(columns=GEPHI_NODE_COLUMNS),
+                os.path.join(output_dir, "gephi_nodes"),
+                "csv",
+            )
+        )
+        written.append(
+            write_table(
+                edges_df.reindex(columns=GEPHI_EDGE_COLUMNS),
+                os.path.join(output_dir, "gephi_edges"),
+                "csv",
+            )
+        )
+
+    for fmt in check_formats(formats):
+        if fmt == "sqlite":
+            path = os.path.join(output_dir, "network.sqlite")
+            written.append(write_sqlite(nodes_df, edges_df, path, postings))
+            continue
+        if fmt in GRAPH_FORMATS:
+            path = os.path.join(output_dir, f"network.{fmt}")
+            written.append(GRAPH_FORMATS[fmt](nodes_df, edges_df, path))
+            continue
+        written.append(write_table(nodes_df, os.path.join(output_dir, "detailed_nodes"), fmt))
+        written.append(write_table(edges_df, os.path.join(output_dir, "detailed_edges"), fmt))
+
+    return written
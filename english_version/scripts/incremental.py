@@ -0,0 +1,180 @@
+# incremental.py - Persisted pre-threshold counts for incremental network updates
+# Keeps raw term/pair counts plus each article's term ids so new articles can be
+# merged in and retracted ones subtracted without re-processing the corpus
+
+import gzip
+import hashlib
+import json
+import os
+from array import array
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from cooccurrence import CooccurrenceCounter
+from ingest import IDENTIFIER_COLUMNS, iter_rows, record_keys
+
+
+def _content_key(values: Iterable[object]) -> str:
+    """Key of an article without identifiers, from its values in sorted-column order"""
+    content = "\x1f".join("" if pd.isna(value) else str(value) for value in values)
+    return "content:" + hashlib.blake2b(content.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def frame_article_keys(df: pd.DataFrame) -> List[List[str]]:
+    """Identifiers of every article row of df; the first one is its persistent ID"""
+    keys = [record_keys(*values) for values in iter_rows(df, IDENTIFIER_COLUMNS)]
+    # No identifiers at all: fall back to the article's content
+    anonymous = [position for position, row_keys in enumerate(keys) if not row_keys]
+    if anonymous:
+        rows = iter_rows(df.iloc[anonymous], sorted(df.columns))
+        for position, values in zip(anonymous, rows):
+            keys[position] = [_content_key(values)]
+    return keys
+
+
+def normalize_article_id(value: str) -> str:
+    """Accept bare PMIDs and DOIs (or DOI URLs) as well as prefixed article IDs"""
+    value = value.strip()
+    lowered = value.lower()
+    if lowered.startswith("pmid:"):
+        return "pmid:" + value[len("pmid:") :].strip()
+    if lowered.startswith(("title:", "content:")):
+        return value
+    if value.isdigit():
+        return "pmid:" + value
+    keys = record_keys(None, value, None)
+    return keys[0] if keys else value
+
+
+class NetworkState:
+    """Raw counts, per-article terms and seen IDs carried between runs
+
+    Each article's terms are stored as ids in the counter's vocabulary, as one
+    row of a flat int32 buffer with offsets (CSR layout).
+    """
+
+    VERSION = 1
+
+    def __init__(self) -> None:
+        self.counts = CooccurrenceCounter()
+        # Article ID -> row holding the capped term ids it contributed;
+        # row i is term_ids[term_offsets[i]:term_offsets[i + 1]]
+        self.articles: Dict[str, int] = {}
+        self.term_ids = array("i")
+        self.term_offsets = array("q", [0])
+        # Every identifier seen (PMID, DOI, title hash) -> article ID
+        self.aliases: Dict[str, str] = {}
+        self.retracted: Set[str] = set()
+
+    def has_article(self, keys: Iterable[str]) -> bool:
+        """Whether any of an article's identifiers was processed (or retracted) before"""
+        return any(key in self.aliases for key in keys)
+
+    def _store(self, article_id: str, ids: Iterable[int]) -> None:
+        self.articles[article_id] = len(self.term_offsets) - 1
+        self.term_ids.extend(ids)
+        self.term_offsets.append(len(self.term_ids))
+
+    def _row(self, row: int) -> List[int]:
+        return self.term_ids[self.term_offsets[row] : self.term_offsets[row + 1]].tolist()
+
+    def article_terms(self, article_id: str) -> List[str]:
+        """The term list an article contributed"""
+        terms = self.counts.terms
+        return [terms[i] for i in self._row(self.articles[article_id])]
+
+    def iter_articles(self) -> Iterator[Tuple[str, List[str]]]:
+        """(article ID, terms) of every counted article"""
+        for article_id in self.articles:
+            yield article_id, self.article_terms(article_id)
+
+    def add_article(self, keys: List[str], terms: List[str]) -> None:
+        """Record a new article and fold its terms into the counts"""
+        article_id = keys[0]
+        for key in keys:
+            self.aliases.setdefault(key, article_id)
+        ids = self.counts.intern(terms)
+        self._store(article_id, ids)
+        if ids:
+            self.counts.add_ids(ids)
+
+    def remove_article(self, identifier: str) -> bool:
+        """Subtract a retracted article's contribution; True if it had been counted
+
+        The ID stays known, so the article is not re-added if it shows up in a
+        later export. Its row stays in the buffer until the state is saved.
+        """
+        key = normalize_article_id(identifier)
+        article_id = self.aliases.setdefault(key, key)
+        if article_id in self.retracted:
+            return False
+        self.retracted.add(article_id)
+
+        row = self.articles.pop(article_id, None)
+        if row is None:
+            return False
+        ids = self._row(row)
+        if ids:
+            self.counts.add_ids(ids, -1)
+        return True
+
+    def save(self, path: str) -> None:
+        """Write the state as gzip-compressed JSON (terms stored as vocabulary indices)"""
+        counts = self.counts
+        frequency = counts.frequencies()
+        ids = np.flatnonzero(frequency > 0)
+        # Saved vocabulary is sorted; index maps a term id to its position there
+        order = np.argsort(np.array(counts.terms, dtype=object)[ids], kind="stable")
+        ids = ids[order]
+        index = np.full(len(counts.terms), -1, dtype=np.int64)
+        index[ids] = np.arange(len(ids))
+        term_ids = np.frombuffer(self.term_ids, dtype=np.int32)
+        offsets = np.frombuffer(self.term_offsets, dtype=np.int64)
+        first, second, weights = counts.pairs()
+
+        payload = {
+            "version": self.VERSION,
+            "vocabulary": [counts.terms[i] for i in ids.tolist()],
+            "articles_with_terms": counts.articles,
+            "node_frequency": frequency[ids].tolist(),
+            "edge_weights": np.column_stack([index[first], index[second], weights]).tolist(),
+            "articles": {
+                article_id: index[term_ids[offsets[row] : offsets[row + 1]]].tolist()
+                for article_id, row in self.articles.items()
+            },
+            # Only aliases that differ from the article ID need storing
+            "aliases": {key: aid for key, aid in self.aliases.items() if key != aid},
+            "retracted": sorted(self.retracted),
+        }
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "NetworkState":
+        """Read a state written by save()"""
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("version") != cls.VERSION:
+            raise ValueError(f"Unsupported network state version: {payload.get('version')}")
+
+        state = cls()
+        ids = state.counts.add_counts(
+            payload["vocabulary"], payload["node_frequency"], payload["edge_weights"]
+        )
+        state.counts.articles = payload["articles_with_terms"]
+        for article_id, terms in payload["articles"].items():
+            state._store(article_id, (ids[i] for i in terms))
+        state.aliases = {article_id: article_id for article_id in state.articles}
+        state.aliases.update(payload["aliases"])
+        state.retracted = set(payload["retracted"])
+        for article_id in state.retracted:
+            state.aliases.setdefault(article_id, article_id)
+        return state
@@ -0,0 +1,773 @@
+# ingest.py - Input format detection and loading for PubMed exports
+# Inspects only the first few KB of a file so the full parse happens exactly once
+
+import bz2
+import codecs
+import csv
+import glob
+import gzip
+import hashlib
+import io
+import itertools
+import json
+import lzma
+import os
+import re
+import time
+import unicodedata
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
+
+import numpy as np
+import pandas as pd
+
+from pubmed_formats import (
+    RECORD_FIELDS,
+    detect_record_format,
+    iter_medline,
+    iter_pubmed_xml,
+    records_to_frames,
+)
+
+try:
+    import zstandard
+
+    HAS_ZSTANDARD = True
+except ImportError:  # pragma: no cover - depends on environment
+    HAS_ZSTANDARD = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    HAS_PYARROW = True
+except ImportError:  # pragma: no cover - depends on environment
+    HAS_PYARROW = False
+
+# Parsed-input snapshots live in the project's data/cache/, wherever the input is
+DEFAULT_CACHE_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "cache")
+)
+
+# How much of the file is inspected before committing to a dialect
+SNIFF_BYTES = 64 * 1024
+
+# Same candidates the loader used to brute-force, in the same priority order
+CANDIDATE_ENCODINGS = ("utf-8", "latin-1", "cp1252")
+CANDIDATE_SEPARATORS = (",", "\t", ";")
+
+# Byte-order marks checked before any decode attempt
+BYTE_ORDER_MARKS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# Zotero/PubMed exports always have more columns than this
+MIN_COLUMNS = 4
+
+# Magic bytes of the compressed formats decoded transparently while streaming
+COMPRESSION_MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+)
+
+# Abstract column names seen in Zotero, PubMed and EndNote exports, in priority order
+ABSTRACT_COLUMNS = ("Abstract", "Abstract Note", "Description", "Summary")
+
+# Columns used to recognise the same article across overlapping exports.
+# Zotero keeps the PMID in "Extra" ("PMID: 12345"); native readers emit a PMID column
+IDENTIFIER_COLUMNS = ("PMID", "DOI", "Title", "Extra")
+
+# Normalised titles shorter than this are too generic to identify an article
+MIN_TITLE_KEY_LENGTH = 20
+
+# A wanted column is either a name or a tuple of alternatives (first present wins)
+ColumnSpec = Union[str, Sequence[str]]
+
+
+@dataclass
+class CsvDialect:
+    """Result of sniffing a CSV file"""
+
+    encoding: str
+    sep: str
+    columns: List[str] = field(default_factory=list)
+    has_bom: bool = False
+    consistency: float = 0.0
+    detection_seconds: float = 0.0
+    from_cache: bool = False
+    # "csv", or "xml"/"medline" for native PubMed files (sep is unused then)
+    format: str = "csv"
+    compression: Optional[str] = None
+
+    def describe(self) -> str:
+        """One-line summary for progress output"""
+        if self.compression:
+            return f"{self.compression}-compressed, " + self._describe_content()
+        return self._describe_content()
+
+    def _describe_content(self) -> str:
+        if self.format != "csv":
+            summary = f"format={self.format}, encoding={self.encoding}, fields={len(self.columns)}"
+        else:
+            summary = (
+                f"encoding={self.encoding}, separator={self.sep!r}, "
+                f"columns={len(self.columns)}, consistency={self.consistency:.0%}, "
+                f"detected in {self.detection_seconds * 1000:.1f} ms"
+            )
+        return summary + " (cached snapshot)" if self.from_cache else summary
+
+
+def detect_compression(head: bytes) -> Optional[str]:
+    """Name of the compression format announced by a file's magic bytes, if any"""
+    for magic, name in COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def open_input(file_path: str) -> IO[bytes]:
+    """Open a file for binary reading, decompressing on the fly when it is compressed"""
+    with open(file_path, "rb") as f:
+        compression = detect_compression(f.read(8))
+
+    stream: Any
+    if compression == "gzip":
+        stream = gzip.open(file_path, "rb")
+    elif compression == "bz2":
+        stream = bz2.open(file_path, "rb")
+    elif compression == "xz":
+        stream = lzma.open(file_path, "rb")
+    elif compression == "zstd":
+        if not HAS_ZSTANDARD:
+            raise ImportError("Reading zstd-compressed input requires: pip install zstandard")
+        raw = open(file_path, "rb")
+        stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+    else:
+        return open(file_path, "rb")
+    # The decompressing readers are binary file objects, though not typed as IO[bytes]
+    return cast(IO[bytes], stream)
+
+
+def detect_encoding(sample: bytes, candidates: Sequence[str] = CANDIDATE_ENCODINGS) -> str:
+    """Pick an encoding from a BOM or the first candidate that decodes the sample"""
+    for bom, encoding in BYTE_ORDER_MARKS:
+        if sample.startswith(bom):
+            return encoding
+
+    for encoding in candidates:
+        # Incremental decode tolerates a multi-byte character cut at the sample boundary
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            decoder.decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+
+    return "latin-1"
+
+
+def vote_separator(
+    text: str, truncated: bool, candidates: Sequence[str] = CANDIDATE_SEPARATORS
+) -> Tuple[str, List[str], float]:
+    """Choose the separator whose records agree best with the header width"""
+    best: Tuple[Tuple[bool, float, int, int], str, List[str], float] = (
+        (False, 0.0, 0, 0),
+        candidates[0],
+        [],
+        0.0,
+    )
+
+    for rank, sep in enumerate(candidates):
+        rows = list(csv.reader(io.StringIO(text), delimiter=sep))
+        if truncated and len(rows) > 1:
+            # Last record was cut by the sample window
+            rows = rows[:-1]
+        rows = [row for row in rows if row]
+        if not rows:
+            continue
+
+        header = rows[0]
+        body = rows[1:]
+        if body:
+            widths = Counter(len(row) for row in body)
+            consistency = widths[len(header)] / len(body)
+        else:
+            consistency = 1.0
+
+        score = (len(header) >= MIN_COLUMNS, consistency, len(header), -rank)
+        if score > best[0]:
+            best = (score, sep, header, consistency)
+
+    return best[1], best[2], best[3]
+
+
+def sniff_csv_dialect(file_path: str, sample_size: int = SNIFF_BYTES) -> CsvDialect:
+    """Detect encoding, separator and header from the (decompressed) start of a CSV file"""
+    start = time.perf_counter()
+
+    with open_input(file_path) as f:
+        sample = f.read(sample_size)
+        truncated = bool(f.read(1))
+
+    encoding = detect_encoding(sample)
+    text = codecs.getincrementaldecoder(encoding)(errors="replace").decode(sample, final=False)
+    sep, columns, consistency = vote_separator(text, truncated)
+
+    return CsvDialect(
+        encoding=encoding,
+        sep=sep,
+        columns=[col.lstrip("\ufeff") for col in columns],
+        has_bom=encoding in ("utf-8-sig", "utf-16"),
+        consistency=consistency,
+        detection_seconds=time.perf_counter() - start,
+    )
+
+
+def project_columns(header: Sequence[str], wanted: Sequence[ColumnSpec]) -> List[str]:
+    """Resolve wanted column names against a header, keeping header order"""
+    present = set(header)
+    selected = set()
+    for spec in wanted:
+        alternatives = [spec] if isinstance(spec, str) else list(spec)
+        for name in alternatives:
+            if name in present:
+                selected.add(name)
+                break
+    return [col for col in header if col in selected]
+
+
+def resolve_column(columns: Iterable[str], spec: ColumnSpec) -> Optional[str]:
+    """The first of a spec's names present in columns, or None"""
+    present = set(columns)
+    alternatives = [spec] if isinstance(spec, str) else list(spec)
+    return next((name for name in alternatives if name in present), None)
+
+
+def iter_rows(df: pd.DataFrame, specs: Sequence[ColumnSpec]) -> Iterator[Tuple[Any, ...]]:
+    """One plain tuple of values per row, for the given column specs
+
+    Each spec is resolved against df's columns once; a spec matching no
+    column gives None in every row. Values come from whole-column lists, so
+    no Series is built per row (unlike iterrows).
+    """
+    columns: List[Iterable[Any]] = []
+    for spec in specs:
+        name = resolve_column(df.columns, spec)
+        columns.append(df[name].tolist() if name is not None else itertools.repeat(None, len(df)))
+    return zip(*columns)
+
+
+def text_dtypes(columns: Sequence[str]) -> Dict[str, str]:
+    """Text dtypes for the columns, Arrow-backed strings when pyarrow is available
+
+    Columns are never left to type inference: a PMID column with one blank
+    cell would otherwise be read as float and give "111.0" instead of "111".
+    """
+    dtype = "string[pyarrow]" if HAS_PYARROW else "object"
+    return {col: dtype for col in columns}
+
+
+def file_digest(file_path: str, block_size: int = 1 << 20) -> str:
+    """Content hash of a file"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SnapshotCache:
+    """Columnar (Feather) snapshots of parsed inputs, keyed by file content
+
+    The index remembers each input's size, mtime and content hash so an
+    unchanged file is recognised without re-hashing it.
+    """
+
+    VERSION = 1
+    INDEX_NAME = "index.json"
+
+    def __init__(self, cache_dir: str) -> None:
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, self.INDEX_NAME)
+        self.index = self._read_index()
+
+    def _read_index(self) -> Dict[str, Dict[str, Any]]:
+        index: Dict[str, Dict[str, Any]] = {"files": {}, "snapshots": {}}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, encoding="utf-8") as f:
+                    index.update(json.load(f))
+            except (OSError, ValueError):
+                pass  # A corrupt index only costs a re-hash
+        return index
+
+    def _save_index(self) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Merge with what other processes may have written since we read it
+        on_disk = self._read_index()
+        for section in ("files", "snapshots"):
+            on_disk[section].update(self.index[section])
+        self.index = on_disk
+
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=1)
+        os.replace(tmp_path, self.index_path)
+
+    def fingerprint(self, file_path: str) -> str:
+        """Content hash of file_path, reused while its size and mtime are unchanged"""
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        entry = self.index["files"].get(path)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return str(entry["digest"])
+
+        digest = file_digest(path)
+        self.index["files"][path] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "digest": digest,
+        }
+        self._save_index()
+        return digest
+
+    def key_for(self, file_path: str, columns: Optional[Sequence[ColumnSpec]]) -> str:
+        """Snapshot key for a file's content and the column projection applied to it"""
+        spec = [c if isinstance(c, str) else list(c) for c in columns or []]
+        projection = hashlib.blake2b(
+            json.dumps([self.VERSION, spec]).encode("utf-8"), digest_size=4
+        ).hexdigest()
+        return f"{self.fingerprint(file_path)}-{projection}"
+
+    def _snapshot_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.feather")
+
+    def lookup(self, key: str) -> Optional[Tuple["pa.Table", CsvDialect]]:
+        """Memory-map a stored snapshot, or None on a miss"""
+        path = self._snapshot_path(key)
+        meta = self.index["snapshots"].get(key)
+        if meta is None or not os.path.exists(path):
+            return None
+        table = feather.read_table(path, memory_map=True)
+        dialect = CsvDialect(**dict(meta, detection_seconds=0.0, from_cache=True))
+        return table, dialect
+
+    def _record(self, key: str, dialect: CsvDialect) -> None:
+        meta = asdict(dialect)
+        meta.pop("detection_seconds")
+        meta.pop("from_cache")
+        self.index["snapshots"][key] = meta
+        self._save_index()
+
+    def store(self, key: str, df: pd.DataFrame, dialect: CsvDialect) -> None:
+        """Write a parsed frame as an uncompressed (memory-mappable) Feather file"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._snapshot_path(key)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        feather.write_feather(table, path + ".tmp", compression="uncompressed")
+        os.replace(path + ".tmp", path)
+        self._record(key, dialect)
+
+    def store_stream(
+        self, key: str, chunks: Iterator[pd.DataFrame], dialect: CsvDialect
+    ) -> Iterator[pd.DataFrame]:
+        """Pass chunks through while appending them to a snapshot
+
+        The snapshot is only published once the stream is fully consumed. A
+        cache that cannot be written never interrupts the stream.
+        """
+        tmp_path = self._snapshot_path(key) + ".tmp"
+        writer = None
+        failed = False
+        completed = False
+        try:
+            for chunk in chunks:
+                if not failed:
+                    try:
+                        batch = pa.Table.from_pandas(chunk, preserve_index=False)
+                        if writer is None:
+                            os.makedirs(self.cache_dir, exist_ok=True)
+                            writer = pa.ipc.new_file(tmp_path, batch.schema)
+                        writer.write_table(batch)
+                    except (OSError, pa.ArrowException, ValueError, TypeError) as e:
+                        # Chunks whose inferred types disagree cannot share a schema
+                        print(f"Snapshot cache skipped: {e}")
+                        failed = True
+                yield chunk
+            completed = True
+        finally:
+            try:
+                if writer is not None:
+                    writer.close()
+                    if completed and not failed:
+                        os.replace(tmp_path, self._snapshot_path(key))
+                        self._record(key, dialect)
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            except (OSError, pa.ArrowException) as e:
+                print(f"Snapshot cache skipped: {e}")
+
+
+def _iter_table(table: "pa.Table", chunksize: int) -> Iterator[pd.DataFrame]:
+    """Yield a memory-mapped table as DataFrame chunks with a running index"""
+    for offset in range(0, table.num_rows, chunksize):
+        chunk = table.slice(offset, chunksize).to_pandas()
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        yield chunk
+
+
+def _read_csv(
+    file_path: str, columns: Optional[Sequence[ColumnSpec]], chunksize: Optional[int]
+) -> Tuple[Union[pd.DataFrame, Iterator[pd.DataFrame]], CsvDialect]:
+    """Sniff the dialect, then read only the wanted columns in a single pass"""
+    dialect = sniff_csv_dialect(file_path)
+
+    usecols = project_columns(dialect.columns, columns) if columns else []
+    # Nothing matched usually means an odd header; read everything rather than nothing
+    options = {
+        "encoding": dialect.encoding,
+        "sep": dialect.sep,
+        "on_bad_lines": "skip",
+        "usecols": usecols or None,
+        "dtype": text_dtypes(usecols) if usecols else None,
+    }
+
+    if chunksize:
+        # Chunks already handed out cannot be re-read, so a byte past the sniffed
+        # head that does not decode is replaced instead
+        options["encoding_errors"] = "replace"
+        return _iter_csv_chunks(file_path, chunksize, options), dialect
+
+    # The encoding was chosen from the file head only; if a later byte does not
+    # decode, the whole file is read again with the next candidate encoding
+    fallbacks = [encoding for encoding in CANDIDATE_ENCODINGS if encoding != dialect.encoding]
+    for encoding in [dialect.encoding, *fallbacks]:
+        try:
+            df = _parse_csv(file_path, dict(options, encoding=encoding))
+        except UnicodeDecodeError as e:
+            print(f"Decoding as {encoding} failed ({e.reason}), retrying")
+            error = e
+            continue
+        dialect.encoding = encoding
+        return df, dialect
+    raise error
+
+
+def _parse_csv(file_path: str, options: Dict[str, Any]) -> pd.DataFrame:
+    """Whole-file parse with the C engine, or the python engine if the C one rejects it"""
+    try:
+        with open_input(file_path) as f:
+            return pd.read_csv(f, quoting=1, engine="c", **options)
+    except UnicodeDecodeError:
+        raise
+    except Exception:
+        # Malformed quoting the C parser rejects outright
+        with open_input(file_path) as f:
+            return pd.read_csv(f, engine="python", **options)
+
+
+def _iter_csv_chunks(
+    file_path: str, chunksize: int, options: Dict[str, Any]
+) -> Iterator[pd.DataFrame]:
+    """CSV chunks read through open_input, keeping the stream open while iterating"""
+    with open_input(file_path) as f:
+        yield from pd.read_csv(f, quoting=1, engine="c", chunksize=chunksize, **options)
+
+
+def _iter_records(file_path: str, record_format: str, encoding: str) -> Iterator[Dict[str, str]]:
+    """Records from a PubMed XML or MEDLINE file, keeping the file open while iterating"""
+    with open_input(file_path) as f:
+        if record_format == "xml":
+            yield from iter_pubmed_xml(f)
+        else:
+            yield from iter_medline(io.TextIOWrapper(f, encoding=encoding, errors="replace"))
+
+
+def _read_records(
+    file_path: str,
+    record_format: str,
+    head: bytes,
+    columns: Optional[Sequence[ColumnSpec]],
+    chunksize: Optional[int],
+) -> Tuple[Union[pd.DataFrame, Iterator[pd.DataFrame]], CsvDialect]:
+    """Read PubMed XML or MEDLINE records into frames with the Zotero column names"""
+    start = time.perf_counter()
+    encoding = "utf-8" if record_format == "xml" else detect_encoding(head)
+    usecols = (project_columns(RECORD_FIELDS, columns) if columns else []) or list(RECORD_FIELDS)
+    dialect = CsvDialect(
+        encoding=encoding,
+        sep="",
+        columns=list(RECORD_FIELDS),
+        consistency=1.0,
+        detection_seconds=time.perf_counter() - start,
+        format=record_format,
+    )
+
+    frames = records_to_frames(
+        _iter_records(file_path, record_format, encoding),
+        chunksize,
+        columns=usecols,
+        dtypes=text_dtypes(usecols),
+    )
+    if chunksize:
+        return frames, dialect
+    return next(frames), dialect
+
+
+def _open_cache(
+    cache_dir: Optional[str], file_path: str, columns: Optional[Sequence[ColumnSpec]]
+) -> Tuple[Optional[SnapshotCache], str]:
+    """Snapshot cache and key for a file, or None if caching is off or unavailable"""
+    if not cache_dir or not HAS_PYARROW:
+        return None, ""
+    cache = SnapshotCache(cache_dir)
+    # The cache is only an optimisation: if its directory cannot be written
+    # (read-only, permissions) the file is read without it
+    try:
+        return cache, cache.key_for(file_path, columns)
+    except OSError as e:
+        print(f"Snapshot cache disabled: {e}")
+        return None, ""
+
+
+def _read_cached(
+    cache: SnapshotCache, key: str, chunksize: Optional[int]
+) -> Optional[Tuple[Union[pd.DataFrame, Iterator[pd.DataFrame]], CsvDialect]]:
+    """Frames of a cached snapshot, or None on a miss or an unreadable snapshot"""
+    try:
+        hit = cache.lookup(key)
+    except (OSError, pa.ArrowException) as e:
+        print(f"Ignoring unreadable snapshot: {e}")
+        return None
+    if hit is None:
+        return None
+    table, dialect = hit
+    if chunksize:
+        return _iter_table(table, chunksize), dialect
+    return table.to_pandas(), dialect
+
+
+def _store_cached(
+    cache: SnapshotCache,
+    key: str,
+    data: Union[pd.DataFrame, Iterator[pd.DataFrame]],
+    dialect: CsvDialect,
+) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+    """Snapshot freshly read data; streams are snapshotted as they are consumed"""
+    if not isinstance(data, pd.DataFrame):
+        return cache.store_stream(key, data, dialect)
+    try:
+        cache.store(key, data, dialect)
+    except (OSError, pa.ArrowException, ValueError, TypeError) as e:
+        print(f"Snapshot cache skipped: {e}")
+    return data
+
+
+def _read_export(
+    file_path: str, columns: Optional[Sequence[ColumnSpec]], chunksize: Optional[int]
+) -> Tuple[Union[pd.DataFrame, Iterator[pd.DataFrame]], CsvDialect]:
+    """Detect the compression and format of a file and read it"""
+    # Format and encoding are detected on the decompressed prefix
+    with open(file_path, "rb") as f:
+        compression = detect_compression(f.read(8))
+    with open_input(file_path) as f:
+        head = f.read(SNIFF_BYTES)
+    record_format = detect_record_format(head)
+
+    if record_format == "csv":
+        data, dialect = _read_csv(file_path, columns, chunksize)
+    else:
+        data, dialect = _read_records(file_path, record_format, head, columns, chunksize)
+    dialect.compression = compression
+    return data, dialect
+
+
+def read_pubmed_export(
+    file_path: str,
+    columns: Optional[Sequence[ColumnSpec]] = None,
+    chunksize: Optional[int] = None,
+    cache_dir: Optional[str] = None,
+) -> Tuple[Union[pd.DataFrame, Iterator[pd.DataFrame]], CsvDialect]:
+    """Load a Zotero/PubMed CSV, PubMed XML or MEDLINE file, reading only `columns`
+
+    gzip, bz2, xz and zstd files are decompressed while streaming, never to
+    disk. The format is recognised from the first decompressed bytes. With
+    cache_dir set (and pyarrow installed) the parsed columns are
+    snapshotted on first read and memory-mapped on later reads of the same
+    file content.
+    """
+    cache, key = _open_cache(cache_dir, file_path, columns)
+    if cache is not None:
+        cached = _read_cached(cache, key, chunksize)
+        if cached is not None:
+            return cached
+
+    data, dialect = _read_export(file_path, columns, chunksize)
+    if cache is not None:
+        data = _store_cached(cache, key, data, dialect)
+    return data, dialect
+
+
+def expand_inputs(spec: str) -> List[str]:
+    """Input files named by a path, a directory or a glob pattern, in sorted order"""
+    if os.path.isdir(spec):
+        paths = [
+            os.path.join(spec, name)
+            for name in os.listdir(spec)
+            if not name.startswith(".") and os.path.isfile(os.path.join(spec, name))
+        ]
+    elif glob.has_magic(spec):
+        paths = [path for path in glob.glob(spec, recursive=True) if os.path.isfile(path)]
+    else:
+        paths = [spec] if os.path.isfile(spec) else []
+    return sorted(paths)
+
+
+def normalize_title(title: str) -> str:
+    """Case-, accent- and punctuation-insensitive form of a title"""
+    text = unicodedata.normalize("NFKD", title)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return " ".join(re.findall(r"[a-z0-9]+", text))
+
+
+def record_keys(pmid: Any, doi: Any, title: Any, extra: Any = None) -> List[str]:
+    """Identifiers under which an article may appear in another export"""
+    keys = []
+
+    if isinstance(pmid, float) and pmid.is_integer():
+        # A numeric PMID column read elsewhere (e.g. a caller's own frame)
+        pmid = int(pmid)
+    if pd.isna(pmid) or not str(pmid).strip():
+        match = re.search(r"PMID:\s*(\d+)", str(extra)) if not pd.isna(extra) else None
+        pmid = match.group(1) if match else None
+    if pmid is not None and not pd.isna(pmid) and str(pmid).strip():
+        keys.append("pmid:" + str(pmid).strip())
+
+    if not pd.isna(doi) and str(doi).strip():
+        normalized_doi = re.sub(r"^(https?://(dx\.)?doi\.org/|doi:)", "", str(doi).strip().lower())
+        keys.append("doi:" + normalized_doi)
+
+    if not pd.isna(title):
+        normalized_title = normalize_title(str(title))
+        if len(normalized_title) >= MIN_TITLE_KEY_LENGTH:
+            digest = hashlib.blake2b(normalized_title.encode("utf-8"), digest_size=8).hexdigest()
+            keys.append("title:" + digest)
+
+    return keys
+
+
+class RecordDeduplicator:
+    """Drops records already seen under any of their PMID, DOI or title keys"""
+
+    def __init__(self) -> None:
+        self.seen: set = set()
+        self.kept = 0
+        self.dropped = 0
+
+    def filter(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Rows of df not seen before (in this frame or earlier ones)"""
+
+        def column(name: str) -> Iterable[Any]:
+            return df[name] if name in df.columns else [None] * len(df)
+
+        keep = []
+        for pmid, doi, title, extra in zip(
+            column("PMID"), column("DOI"), column("Title"), column("Extra")
+        ):
+            keys = record_keys(pmid, doi, title, extra)
+            duplicate = any(key in self.seen for key in keys)
+            if not duplicate:
+                self.seen.update(keys)
+            keep.append(not duplicate)
+
+        mask = np.array(keep, dtype=bool)
+        kept = int(mask.sum())
+        self.kept += kept
+        self.dropped += len(df) - kept
+        return df[mask]
+
+
+def _read_whole(args: Tuple[str, Optional[Sequence[ColumnSpec]], Optional[str]]) -> Any:
+    """Process-pool worker: read one file completely"""
+    file_path, columns, cache_dir = args
+    return read_pubmed_export(file_path, columns=columns, cache_dir=cache_dir)
+
+
+def _iter_deduplicated(
+    paths: Sequence[str],
+    columns: Optional[Sequence[ColumnSpec]],
+    chunksize: int,
+    cache_dir: Optional[str],
+    deduplicator: RecordDeduplicator,
+) -> Iterator[pd.DataFrame]:
+    """Stream the chunks of several files in turn, renumbered and de-duplicated"""
+    offset = 0
+    for file_path in paths:
+        chunks, _ = read_pubmed_export(
+            file_path, columns=columns, chunksize=chunksize, cache_dir=cache_dir
+        )
+        for chunk in chunks:
+            chunk = deduplicator.filter(chunk)
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            yield chunk
+
+
+def read_pubmed_inputs(
+    paths: Sequence[str],
+    columns: Optional[Sequence[ColumnSpec]] = None,
+    chunksize: Optional[int] = None,
+    cache_dir: Optional[str] = None,
+    jobs: Optional[int] = None,
+    deduplicator: Optional[RecordDeduplicator] = None,
+) -> Tuple[Union[pd.DataFrame, Iterator[pd.DataFrame]], List[CsvDialect]]:
+    """Load several exports as one corpus, dropping records that appear more than once
+
+    Files are parsed concurrently in a process pool (`jobs` workers) unless
+    streaming, in which case they are read one after another. The identifier
+    columns are always loaded so duplicates can be recognised by PMID, DOI or
+    normalised-title hash.
+    """
+    deduplicator = deduplicator or RecordDeduplicator()
+    wanted: Optional[List[ColumnSpec]] = None
+    if columns:
+        wanted = list(columns) + [c for c in IDENTIFIER_COLUMNS if c not in columns]
+
+    if chunksize:
+        dialects = []
+        for file_path in paths:
+            # Dialects are cheap to sniff up front; the data is streamed later
+            _, dialect = read_pubmed_export(file_path, columns=wanted, chunksize=1)
+            dialects.append(dialect)
+        stream = _iter_deduplicated(paths, wanted, chunksize, cache_dir, deduplicator)
+        return stream, dialects
+
+    jobs = min(jobs or os.cpu_count() or 1, len(paths))
+    tasks = [(file_path, wanted, cache_dir) for file_path in paths]
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_read_whole, tasks))
+    else:
+        results = [_read_whole(task) for task in tasks]
+
+    frames = [deduplicator.filter(df) for df, _ in results]
+    corpus = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return corpus, [dialect for _, dialect in results]
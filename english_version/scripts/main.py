@@ -1,498 +1,488 @@
 # PubMed_Gephi_Refined_v2.py - Advanced PubMed Network Builder
 # Includes Abstract and Author Keywords processing for higher accuracy
 
+import numpy as np
 import pandas as pd
 import re
-from collections import defaultdict, Counter
-import itertools
+import argparse
 import os
-from typing import List, Tuple, Optional, Any, Dict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from cooccurrence import CooccurrenceCounter
+from exporters import check_formats, write_network
+from incremental import NetworkState, frame_article_keys
+from matrices import DocumentTermPostings, write_matrices
+from shared_text import SharedTextFrame, SharedTextHandle
+from sketch import SketchedCooccurrenceCounter
+from taxonomy import DEFAULT_TAXONOMY, TaxonomyWatcher
+from term_cleaning import SEGMENT_SEPARATORS
+from ingest import (
+    ABSTRACT_COLUMNS,
+    DEFAULT_CACHE_DIR,
+    IDENTIFIER_COLUMNS,
+    ColumnSpec,
+    CsvDialect,
+    RecordDeduplicator,
+    expand_inputs,
+    iter_rows,
+    read_pubmed_export,
+    read_pubmed_inputs,
+)
+
+# Characters replaced by "_" in node Ids
+NODE_ID_PATTERN = re.compile(r"[^\w]")
 
 
 class PubMedRefinedNetworkV2:
-    def __init__(self) -> None:
-        # Strict medical stopwords (extensively expanded)
-        self.medical_stopwords = {
-            "study",
-            "studies",
-            "research",
-            "analysis",
-            "effect",
-            "effects",
-            "patient",
-            "patients",
-            "group",
-            "groups",
-            "method",
-            "methods",
-            "result",
-            "results",
-            "conclusion",
-            "conclusions",
-            "objective",
-            "background",
-            "aim",
-            "purpose",
-            "significance",
-            "review",
-            "article",
-            "paper",
-            "their",
-            "with",
-            "the",
-            "and",
-            "or",
-            "for",
-            "from",
-            "this",
-            "that",
-            "these",
-            "those",
-            "which",
-            "what",
-            "when",
-            "where",
-            "how",
-            "why",
-            "has",
-            "have",
-            "had",
-            "was",
-            "were",
-            "is",
-            "are",
-            "be",
-            "been",
-            "being",
-            "can",
-            "could",
-            "would",
-            "should",
-            "may",
-            "might",
-            "must",
-            "author",
-            "theory",
-            "model",
-            "system",
-            "process",
-            "approach",
-            "perspective",
-            "overview",
-            "summary",
-            "current",
-            "future",
-            "recent",
-            "new",
-            "novel",
-            "various",
-        }
-
-        # Precise category system based on research framework
-        self.refined_categories = {
-            # 1. Trigger Mechanisms (strictly defined)
-            "trigger_mechanisms": {
-                "description": "Trigger Mechanisms",
-                "keywords": [
-                    # Neural mechanisms
-                    "trigeminal",
-                    "trigeminovascular",
-                    "cortical spreading depression",
-                    "central sensitization",
-                    "neurogenic inflammation",
-                    "neural mechanism",
-                    # Vascular mechanisms
-                    "vascular",
-                    "cerebral blood flow",
-                    "vasodilation",
-                    "vasoconstriction",
-                    # Hormonal mechanisms
-                    "hormonal",
-                    "estrogen",
-                    "progesterone",
-                    "menstrual",
-                    "menopause",
-                    # Inflammatory mechanisms
-                    "inflammatory",
-                    "cytokines",
-                    "neuroinflammation",
-                    "mast cells",
-                    # Environmental triggers
-                    "stress",
-                    "sleep deprivation",
-                    "weather",
-                    "barometric",
-                    "light sensitivity",
-                    # NLP Discovered
-                    "occipital nerve",
-                    "vestibular",
-                    "brainstem",
-                ],
-            },
-            # 2. True Comorbidities (strict medical definitions)
-            "true_comorbidities": {
-                "description": "True Comorbidities",
-                "keywords": [
-                    # Psychiatric conditions
-                    "depression",
-                    "anxiety",
-                    "panic disorder",
-                    "bipolar",
-                    "ptsd",
-                    # Neurological conditions
-                    "epilepsy",
-                    "stroke",
-                    "restless legs",
-                    "parkinson",
-                    "alzheimer",
-                    # Pain conditions
-                    "fibromyalgia",
-                    "chronic pain",
-                    "neuropathic pain",
-                    # Autoimmune/Allergic conditions
-                    "allergic rhinitis",
-                    "asthma",
-                    "irritable bowel",
-                    "inflammatory bowel",
-                    # Sleep disorders
-                    "insomnia",
-                    "sleep apnea",
-                    "circadian rhythm",
-                    # Cardiovascular conditions
-                    "hypertension",
-                    "patent foramen ovale",
-                    "stroke risk",
-                    # NLP Discovered
-                    "vestibular migraine",
-                    "cluster headache",
-                    "tension type headache",
-                    "tth",
-                    "medication overuse headache",
-                    "moh",
-                    "restless legs syndrome",
-                    "rls",
-                ],
-            },
-            # 3. Social Impact
-            "social_impact": {
-                "description": "Social Impact",
-                "keywords": [
-                    "quality of life",
-                    "disability",
-                    "work productivity",
-                    "absenteeism",
-                    "presenteeism",
-                    "economic burden",
-                    "healthcare cost",
-                    "stigma",
-                    "social isolation",
-                    "family burden",
-                    "daily functioning",
-                    # NLP Discovered
-                    "emergency department",
-                    "headache days",
-                    "monthly migraine days",
-                    "hospitalization",
-                ],
-            },
-            # 4. Interventions
-            "interventions": {
-                "description": "Interventions",
-                "keywords": [
-                    # Medications
-                    "triptans",
-                    "cgrp",
-                    "erenumab",
-                    "fremanezumab",
-                    "galcanezumab",
-                    "propranolol",
-                    "topiramate",
-                    "amitriptyline",
-                    "valproate",
-                    "botulinum",
-                    # Non-pharmacological
-                    "cognitive behavioral therapy",
-                    "biofeedback",
-                    "acupuncture",
-                    "physical therapy",
-                    "relaxation",
-                    "mindfulness",
-                    "yoga",
-                    # Lifestyle modifications
-                    "diet",
-                    "exercise",
-                    "sleep hygiene",
-                    "stress management",
-                    "neuromodulation",
-                    "monoclonal antibodies",
-                    "gene therapy",
-                    # NLP Discovered
-                    "nerve stimulation",
-                    "transcranial magnetic",
-                    "tms",
-                    "pfo closure",
-                    "calcitonin gene-related",
-                    "cgrp receptor",
-                    "gepants",
-                    "lasmiditan",
-                ],
-            },
-        }
-
-        # Research methodology terms to exclude (separate category)
-        self.research_methods = {
-            "randomized controlled trial",
-            "cohort study",
-            "case control",
-            "cross sectional",
-            "systematic review",
-            "meta analysis",
-            "clinical trial",
-            "observational study",
-            "diagnostic criteria",
-            "assessment scale",
-            "statistical analysis",
-            "epidemiology",
-        }
-
-    def load_pubmed_data(self, file_path: str) -> Optional[pd.DataFrame]:
-        """Load PubMed data from CSV file"""
+    # Input columns build_refined_network reads; a tuple picks the first one present
+    INPUT_COLUMNS: Tuple[ColumnSpec, ...] = ("Manual Tags", "Keywords", ABSTRACT_COLUMNS)
+    # Limit terms per article (prevent single article from contributing too many nodes)
+    MAX_TERMS_PER_ARTICLE = 20  # Increased slightly for V2
+
+    def __init__(self, taxonomy_path: Optional[str] = None) -> None:
+        # Stopwords, categories and research methods come from the taxonomy file
+        # (config/taxonomy.json); edits are picked up by reload_taxonomy()
+        self.taxonomy = TaxonomyWatcher(taxonomy_path or DEFAULT_TAXONOMY)
+        self._apply_taxonomy()
+
+        # Dialect picked by the most recent load_pubmed_data call
+        self.last_dialect: Optional[CsvDialect] = None
+        # Duplicate tracking for the most recent multi-file load
+        self.deduplicator: Optional[RecordDeduplicator] = None
+
+    def _apply_taxonomy(self) -> None:
+        compiled = self.taxonomy.compiled
+        self.medical_stopwords = compiled.taxonomy.stopwords
+        self.refined_categories = compiled.taxonomy.categories
+        self.research_methods = compiled.taxonomy.research_methods
+        # Content-based inference words, tried in order after the category keywords
+        self.inference_words = compiled.taxonomy.inference_words
+        # Shared cleaning engine; remembers every raw segment it has cleaned
+        self.term_cleaner = compiled.term_cleaner
+        # Taxonomy compiled into one automaton; categories are memoised per term
+        self.categorizer = compiled.categorizer
+        # Category keywords, pre-cleaned, for the abstract branch
+        self.abstract_scanner = compiled.abstract_scanner
+
+    def reload_taxonomy(self) -> bool:
+        """Pick up edits to the taxonomy file; True if it changed"""
+        if not self.taxonomy.check():
+            return False
+        self._apply_taxonomy()
+        print(f"Taxonomy reloaded: {self.taxonomy.path}")
+        return True
+
+    def load_pubmed_data(
+        self,
+        file_path: str,
+        chunksize: Optional[int] = None,
+        columns: Optional[Sequence[ColumnSpec]] = None,
+        cache_dir: Optional[str] = None,
+        jobs: Optional[int] = None,
+    ) -> Optional[Union[pd.DataFrame, Iterator[pd.DataFrame]]]:
+        """Load PubMed data from CSV, PubMed XML or MEDLINE (frames when chunksize is set)
+
+        `file_path` may also be a directory or glob; the matching files are
+        parsed in parallel (`jobs` processes) and records seen in an earlier
+        file are dropped by PMID, DOI or title. Only the columns
+        build_refined_network reads are parsed unless `columns` names others.
+        With `cache_dir`, parsed columns are kept as a Feather snapshot and
+        memory-mapped on later runs over the same file.
+        """
         try:
-            # Try multiple encoding formats
-            for encoding in ["utf-8", "latin-1", "cp1252"]:
-                for sep in [",", "\t", ";"]:
-                    try:
-                        df = pd.read_csv(
-                            file_path, encoding=encoding, sep=sep, quoting=1, on_bad_lines="skip"
-                        )
-                        if len(df.columns) > 3:
-                            print(f"Successfully loaded: {encoding}, separator: '{sep}'")
-                            return df
-                    except Exception:
-                        continue
-            return pd.read_csv(file_path, engine="python", on_bad_lines="skip")
+            paths = expand_inputs(file_path)
+            if len(paths) > 1:
+                return self._load_pubmed_files(paths, chunksize, columns, cache_dir, jobs)
+
+            # Detect the format (and CSV dialect) from the file head, then parse once
+            df, dialect = read_pubmed_export(
+                paths[0] if paths else file_path,
+                columns=columns or self.INPUT_COLUMNS,
+                chunksize=chunksize,
+                cache_dir=cache_dir,
+            )
+            self.last_dialect = dialect
+            print(f"Detected dialect: {dialect.describe()}")
+
+            if dialect.format == "csv":
+                source = f"{dialect.encoding}, separator: '{dialect.sep}'"
+            else:
+                source = f"{dialect.format} records"
+            if chunksize:
+                print(f"Streaming: {source}, {chunksize} rows per chunk")
+            else:
+                print(f"Successfully loaded: {source}")
+            return df
         except Exception as e:
             print(f"Loading failed: {e}")
             return None
 
-    def strict_term_cleaning(self, term: Any) -> Optional[str]:
-        """Strictly clean medical terms"""
-        if pd.isna(term) or not term.strip():
-            return None
-
-        term = str(term).strip()
-
-        # 1. Remove all special markers
-        term = re.sub(r"^\*+|\*+$", "", term)  # Leading/trailing asterisks
-        term = re.sub(r"/\*.*", "", term)  # Content after slash-asterisk
-        term = re.sub(r"\[.*?\]|\(.*?\)", "", term)  # Brackets content
-
-        # 2. Convert to lowercase and split
-        term = term.lower()
-        words = term.split()
-
-        # 3. Strict filtering
-        filtered_words = []
-        for word in words:
-            # Length requirements
-            if len(word) < 3 or len(word) > 20:
-                continue
-            # Stopword filtering
-            if word in self.medical_stopwords:
-                continue
-            # Number filtering
-            if word.isdigit():
-                continue
-            # Special character check
-            if re.search(r"[^a-z\-]", word):
-                continue
-
-            filtered_words.append(word)
-
-        if not filtered_words:
-            return None
-
-        term = " ".join(filtered_words)
+    def _load_pubmed_files(
+        self,
+        paths: List[str],
+        chunksize: Optional[int],
+        columns: Optional[Sequence[ColumnSpec]],
+        cache_dir: Optional[str],
+        jobs: Optional[int],
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+        """Load several exports as one de-duplicated corpus"""
+        print(f"Loading {len(paths)} files...")
+        self.deduplicator = RecordDeduplicator()
+        df, dialects = read_pubmed_inputs(
+            paths,
+            columns=columns or self.INPUT_COLUMNS,
+            chunksize=chunksize,
+            cache_dir=cache_dir,
+            jobs=jobs,
+            deduplicator=self.deduplicator,
+        )
+        for path, dialect in zip(paths, dialects):
+            print(f"  - {os.path.basename(path)}: {dialect.describe()}")
+        self.last_dialect = dialects[-1]
+
+        if chunksize:
+            print(f"Streaming {len(paths)} files, {chunksize} rows per chunk")
+        else:
+            print(
+                f"Successfully loaded: {self.deduplicator.kept} records "
+                f"({self.deduplicator.dropped} duplicates removed)"
+            )
+        return df
 
-        # 4. Title case and return
-        return str(term.title())
+    def strict_term_cleaning(self, term: Any) -> Optional[str]:
+        """Strictly clean medical terms (see term_cleaning.TermCleaner)"""
+        cleaned: Optional[str] = self.term_cleaner.clean(term)
+        return cleaned
 
     def precise_categorization(self, term: str) -> str:
-        """Precisely categorize medical terms"""
-        term_lower = term.lower()
-
-        # First check if it's a research method (to be excluded)
-        for research_term in self.research_methods:
-            if research_term in term_lower:
-                return "research_methods"  # Separately marked, filtered later
-
-        # Exact match categorization
-        for category, info in self.refined_categories.items():
-            for keyword in info["keywords"]:
-                if keyword in term_lower:
-                    return category
-
-        # Content-based inference (stricter)
-        trigger_words = ["mechanism", "pathophysiology", "etiology", "trigger", "sensitization"]
-        comorbidity_words = ["comorbidity", "comorbid", "coexisting", "associated with"]
-        impact_words = ["burden", "cost", "productivity", "quality", "disability"]
-        intervention_words = ["therapy", "treatment", "medication", "management", "intervention"]
-
-        if any(word in term_lower for word in trigger_words):
-            return "trigger_mechanisms"
-        elif any(word in term_lower for word in comorbidity_words):
-            return "true_comorbidities"
-        elif any(word in term_lower for word in impact_words):
-            return "social_impact"
-        elif any(word in term_lower for word in intervention_words):
-            return "interventions"
-
-        return "unclassified"
+        """Precisely categorize medical terms (see categorizer.TermCategorizer)"""
+        category: str = self.categorizer.categorize(term)
+        return category
 
     def extract_high_quality_terms(  # noqa: C901
         self, tags_str: Any, abstract_text: Any = "", keywords_text: Any = ""
     ) -> List[str]:
-        """Extract high-quality medical terms from multiple fields"""
-        high_quality_terms = set()
+        """Extract high-quality medical terms from multiple fields
+
+        Terms come back in field order (tags, keywords, abstract) without
+        duplicates, so the per-article cap is reproducible.
+        """
+        # A dict keeps first-seen order, unlike a set
+        high_quality_terms: Dict[str, None] = {}
+        clean = self.term_cleaner.clean
 
         # 1. Process Manual Tags (existing logic)
         if not pd.isna(tags_str):
             tags_str = str(tags_str)
-            segments = re.split(r"[;,]", tags_str)
+            segments = SEGMENT_SEPARATORS.split(tags_str)
             for segment in segments:
-                cleaned_term = self.strict_term_cleaning(segment)
+                cleaned_term = clean(segment)
                 if cleaned_term:
                     category = self.precise_categorization(cleaned_term)
                     if category != "unclassified" and category != "research_methods":
-                        high_quality_terms.add(cleaned_term)
+                        high_quality_terms[cleaned_term] = None
 
         # 2. Process Author Keywords
         if not pd.isna(keywords_text):
             keywords_str = str(keywords_text)
-            kw_segments = re.split(r"[;,]", keywords_str)
+            kw_segments = SEGMENT_SEPARATORS.split(keywords_str)
             for kw in kw_segments:
-                cleaned = self.strict_term_cleaning(kw)
+                cleaned = clean(kw)
                 if cleaned:
                     category = self.precise_categorization(cleaned)
                     if category != "unclassified" and category != "research_methods":
-                        high_quality_terms.add(cleaned)
+                        high_quality_terms[cleaned] = None
 
         # 3. Process Abstract text (Simple Contextual Extraction)
         if not pd.isna(abstract_text):
-            abstract = str(abstract_text).lower()
-
-            # Check for presence of category keywords in abstract
-            for category, info in self.refined_categories.items():
-                for keyword in info["keywords"]:
-                    if keyword in abstract:
-                        # If a keyword is found in abstract, we add it as a term
-                        # This captures terms mentioned in text even if not in tags
-                        cleaned = self.strict_term_cleaning(keyword)
-                        if cleaned:
-                            high_quality_terms.add(cleaned)
+            # Category keywords mentioned in the abstract are added as terms; this
+            # captures terms mentioned in text even if not in tags
+            for cleaned in self.abstract_scanner.scan(str(abstract_text)):
+                high_quality_terms[cleaned] = None
 
         return list(high_quality_terms)
 
+    def extract_corpus_terms(self, df: pd.DataFrame) -> List[List[str]]:
+        """Capped term lists for every row of df, cleaning each distinct segment once
+
+        Manual Tags and Keywords are split and exploded column-wise, cleaned and
+        categorized once per distinct segment, and joined back to their rows.
+        Gives the same lists as extract_high_quality_terms per row.
+        """
+        blocks = self._field_terms(df) + self._abstract_terms(df)
+        result: List[List[str]] = [[] for _ in range(len(df))]
+        if not blocks:
+            return result
+
+        # Group by row while keeping field order within each row
+        all_rows = np.concatenate([rows for rows, _ in blocks]).astype(np.int64)
+        order = np.argsort(all_rows, kind="stable")
+        terms = np.concatenate([found for _, found in blocks])[order]
+        pairs = pd.DataFrame({"row": all_rows[order], "term": terms})
+        pairs = pairs.drop_duplicates()
+        pairs = pairs[pairs.groupby("row").cumcount() < self.MAX_TERMS_PER_ARTICLE]
+
+        for row, term in zip(pairs["row"].tolist(), pairs["term"].tolist()):
+            result[row].append(term)
+        return result
+
+    def _field_terms(self, df: pd.DataFrame) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Row positions and terms of Manual Tags then Author Keywords (steps 1-2)"""
+        exploded = []
+        for column in ("Manual Tags", "Keywords"):
+            if column in df.columns:
+                values = df[column].reset_index(drop=True).dropna().astype(str)
+                exploded.append(values.str.split(r"[;,]").explode())
+        if not exploded:
+            return []
+
+        segments = pd.concat(exploded)
+        distinct = pd.Series(segments.unique(), dtype=object)
+        accepted: Dict[str, Optional[str]] = {}
+        cleaned_segments = self.term_cleaner.clean_series(distinct)
+        for segment, cleaned in zip(distinct.tolist(), cleaned_segments):
+            if cleaned and self.precise_categorization(cleaned) not in (
+                "unclassified",
+                "research_methods",
+            ):
+                accepted[segment] = cleaned
+        mapped = segments.map(accepted).dropna()
+        return [(mapped.index.to_numpy(), mapped.to_numpy(dtype=object))]
+
+    def _abstract_terms(self, df: pd.DataFrame) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Row positions and category keywords mentioned in the abstract (step 3)"""
+        abstract_col = next((col for col in ABSTRACT_COLUMNS if col in df.columns), None)
+        if not abstract_col:
+            return []
+
+        blocks = []
+        abstracts = df[abstract_col].reset_index(drop=True).dropna().astype(str)
+        scan = self.abstract_scanner.scan
+        for position, abstract in zip(abstracts.index.tolist(), abstracts.tolist()):
+            found = scan(abstract)
+            if found:
+                blocks.append(
+                    (np.full(len(found), position, dtype=np.int64), np.array(found, dtype=object))
+                )
+        return blocks
+
     def build_refined_network(  # noqa: C901
-        self, df: pd.DataFrame, min_frequency: int = 3, min_weight: int = 2
+        self,
+        df: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        min_frequency: int = 3,
+        min_weight: int = 2,
+        postings: Optional[DocumentTermPostings] = None,
+        workers: Optional[int] = None,
+        memory_budget: Optional[int] = None,
+        approximate: bool = False,
     ) -> Tuple[pd.DataFrame, pd.DataFrame]:
-        """Build refined network"""
+        """Build refined network from a DataFrame or a stream of DataFrame chunks
+
+        If `postings` is given, each article's terms are also recorded there for
+        the sparse matrix export (matrices.write_matrices). With `workers` > 1,
+        each chunk is split into row ranges that are extracted and counted in a
+        process pool; the partial counts are merged in row order, so the result
+        is the same as the serial one. Once the pair table exceeds `memory_budget`
+        bytes it is spilled to temporary files and merged back at the end.
+
+        With `approximate`, pair counts first go into a fixed-size Count-Min
+        sketch and only pairs whose estimate reaches min_weight are then counted
+        exactly (see sketch.SketchedCooccurrenceCounter); the network is the same.
+        """
         print("Building refined network (V2 - with Abstract processing)...")
-
-        article_keywords = []
-
-        for idx, row in df.iterrows():
-            if isinstance(idx, int) and idx % 200 == 0 and idx > 0:
-                print(f"Processing: {idx}/{len(df)}")
-
-            # Identify Abstract column
-            abstract_col = None
-            for col in ["Abstract", "Abstract Note", "Description", "Summary"]:
-                if col in df.columns:
-                    abstract_col = col
-                    break
-
-            # Extract high-quality terms from ALL fields
-            manual_tags = self.extract_high_quality_terms(
-                tags_str=row.get("Manual Tags", ""),
-                abstract_text=row.get(abstract_col, "") if abstract_col else "",
-                keywords_text=row.get(
-                    "Keywords", ""
-                ),  # Assuming 'Keywords' column exists, if not it will be empty string
+        self.reload_taxonomy()
+
+        # A single frame is just a stream with one chunk
+        chunks = [df] if isinstance(df, pd.DataFrame) else df
+        total = len(df) if isinstance(df, pd.DataFrame) else None
+
+        # Node and pair counts are folded in per article, so memory follows the
+        # vocabulary rather than the number of articles
+        if approximate:
+            counts: CooccurrenceCounter = SketchedCooccurrenceCounter(memory_budget=memory_budget)
+            if workers and workers > 1:
+                print("Approximate counting runs in a single process; ignoring workers")
+                workers = None
+        else:
+            counts = CooccurrenceCounter(memory_budget=memory_budget)
+
+        if workers and workers > 1:
+            # Each worker gets its own copy of the builder (and its taxonomy) once;
+            # a chunk's text goes into shared memory, and workers are only told
+            # which row range to decode from it
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(self,)
+            ) as pool:
+                # Progress counts rows, since index labels need not be integers
+                offset = 0
+                for chunk in chunks:
+                    ranges = _row_ranges(len(chunk), workers)
+                    with SharedTextFrame.create(chunk) as shared:
+                        tasks = [
+                            (shared.handle, start, stop, postings is not None)
+                            for start, stop in ranges
+                        ]
+                        results = list(pool.map(_count_shard, tasks))
+                    for (_, stop), (partial, partial_postings) in zip(ranges, results):
+                        counts.merge(partial)
+                        if postings is not None:
+                            postings.extend(partial_postings)
+                        if stop:
+                            done = offset + stop
+                            print(f"Processing: {done}/{total}" if total else f"Processing: {done}")
+                    offset += len(chunk)
+        else:
+            for chunk in chunks:
+                self._count_chunk(chunk, counts, postings, total)
+
+        print(f"Valid articles: {counts.articles}")
+        # The last partial batch is still buffered; spills and the sketch's
+        # totals only cover it once it is folded in
+        counts.fold()
+        if counts.spilled_runs:
+            print(f"Pair counts spilled to disk: {counts.spilled_runs} runs")
+
+        note = ""
+        if isinstance(counts, SketchedCooccurrenceCounter):
+            sketch = counts.sketch
+            note = (
+                f" (approximate: pair estimates within +{sketch.error_bound:,.1f} at "
+                f"{1 - sketch.delta:.1%} confidence, kept edges counted exactly)"
             )
 
-            # Limit terms per article (prevent single article from contributing too many nodes)
-            if len(manual_tags) > 20:  # Increased slightly for V2
-                manual_tags = manual_tags[:20]
+        return self._assemble_network(counts, min_frequency, min_weight, note)
+
+    def _count_chunk(
+        self,
+        chunk: pd.DataFrame,
+        counts: CooccurrenceCounter,
+        postings: Optional[DocumentTermPostings] = None,
+        total: Optional[int] = None,
+        progress: bool = True,
+    ) -> None:
+        """Extract one chunk's terms and fold them into counts (and postings)"""
+        # Distinct tags are cleaned once per chunk instead of once per article
+        chunk_terms = self.extract_corpus_terms(chunk)
+        for idx, manual_tags in zip(chunk.index, chunk_terms):
+            if progress and isinstance(idx, int) and idx % 200 == 0 and idx > 0:
+                print(f"Processing: {idx}/{total}" if total else f"Processing: {idx}")
 
             if manual_tags:
-                article_keywords.append(manual_tags)
-
-        print(f"Valid articles: {len(article_keywords)}")
-
-        # Calculate node frequency
-        node_frequency: Counter[str] = Counter()
-        for keywords in article_keywords:
-            node_frequency.update(keywords)
-
+                counts.add(manual_tags)
+
+        if postings is not None:
+            # Identifiers and years are only read for the rows that produced terms
+            counted = [position for position, terms in enumerate(chunk_terms) if terms]
+            rows = chunk.iloc[counted]
+            for keys, (year,), position in zip(
+                frame_article_keys(rows), iter_rows(rows, ["Publication Year"]), counted
+            ):
+                postings.add(chunk_terms[position], keys[0], year)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Worker processes only need the taxonomy; duplicate tracking stays here
+        state = self.__dict__.copy()
+        state["deduplicator"] = None
+        return state
+
+    def update_refined_network(
+        self,
+        state: NetworkState,
+        df: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        min_frequency: int = 3,
+        min_weight: int = 2,
+        retracted: Iterable[str] = (),
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Fold unseen articles into persisted counts, drop retracted ones, and rebuild
+
+        Terms are only extracted for articles whose identifiers are not already
+        in `state`; the thresholds are then re-applied to the merged counts.
+        """
+        print("Updating refined network (V2 - incremental)...")
+        self.reload_taxonomy()
+
+        chunks = [df] if isinstance(df, pd.DataFrame) else df
+        new_articles = 0
+        seen_articles = 0
+
+        for chunk in chunks:
+            # Pick the unseen rows first (including repeats within this chunk),
+            # then extract terms for those rows only
+            unseen: List[int] = []
+            unseen_keys: List[List[str]] = []
+            pending: set = set()
+            for position, keys in enumerate(frame_article_keys(chunk)):
+                if state.has_article(keys) or any(key in pending for key in keys):
+                    seen_articles += 1
+                    continue
+                pending.update(keys)
+                unseen.append(position)
+                unseen_keys.append(keys)
+
+            if unseen:
+                chunk_terms = self.extract_corpus_terms(chunk.iloc[unseen])
+                for keys, terms in zip(unseen_keys, chunk_terms):
+                    state.add_article(keys, terms)
+                new_articles += len(unseen)
+
+        removed = sum(state.remove_article(article_id) for article_id in retracted)
+
+        print(
+            f"New articles: {new_articles}, already processed: {seen_articles}, "
+            f"retracted: {removed}"
+        )
+        print(f"Valid articles: {state.counts.articles}")
+
+        return self._assemble_network(state.counts, min_frequency, min_weight)
+
+    def _assemble_network(
+        self,
+        counts: CooccurrenceCounter,
+        min_frequency: int,
+        min_weight: int,
+        note: str = "",
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Apply the thresholds to raw counts and build the node and edge frames"""
         # Strict filtering: only keep high-frequency terms
-        filtered_terms = {
-            term: freq for term, freq in node_frequency.items() if freq >= min_frequency
-        }
-
-        print(f"Filtered terms: {len(filtered_terms)} (original: {len(node_frequency)})")
-
-        # Calculate edge weights (only consider filtered terms)
-        edge_weights: Dict[Tuple[str, str], int] = defaultdict(int)
-        for keywords in article_keywords:
-            # Only consider filtered terms
-            filtered_keywords = [kw for kw in keywords if kw in filtered_terms]
-            for kw1, kw2 in itertools.combinations(sorted(filtered_keywords), 2):
-                edge_weights[(kw1, kw2)] += 1
-
-        # Create node data
-        nodes_data = []
-        for term, freq in filtered_terms.items():
-            category = self.precise_categorization(term)
-            nodes_data.append(
-                {
-                    "Id": re.sub(r"[^\w]", "_", term.lower())[:30],
-                    "Label": term,
-                    "Category": category,
-                    "Frequency": freq,
-                    "Category_Description": self.refined_categories.get(category, {}).get(
-                        "description", "Other"
-                    ),
-                }
-            )
-
-        # Create edge data (apply weight threshold)
-        edges_data = []
-        for (term1, term2), weight in edge_weights.items():
-            if weight >= min_weight:  # Weight threshold
-                source_id = next(
-                    (node["Id"] for node in nodes_data if node["Label"] == term1), None
-                )
-                target_id = next(
-                    (node["Id"] for node in nodes_data if node["Label"] == term2), None
-                )
-
-                if source_id and target_id:
-                    edges_data.append(
-                        {
-                            "Source": source_id,
-                            "Target": target_id,
-                            "Weight": weight,
-                            "Type": "Undirected",
-                            "Source_Label": term1,
-                            "Target_Label": term2,
-                        }
-                    )
-
-        nodes_df = pd.DataFrame(nodes_data)
-        edges_df = pd.DataFrame(edges_data)
-
-        print(f"Final network size: {len(nodes_df)} nodes, {len(edges_df)} edges")
+        filtered_terms = counts.filtered_terms(min_frequency)
+
+        print(f"Filtered terms: {len(filtered_terms)} (original: {len(counts.node_frequency)})")
+
+        # Create node data, column by column
+        labels = list(filtered_terms)
+        categories = [self.precise_categorization(term) for term in labels]
+        node_ids = [NODE_ID_PATTERN.sub("_", term.lower())[:30] for term in labels]
+        nodes_df = pd.DataFrame(
+            {
+                "Id": node_ids,
+                "Label": labels,
+                "Category": categories,
+                "Frequency": list(filtered_terms.values()),
+                "Category_Description": [
+                    self.refined_categories.get(category, {}).get("description", "Other")
+                    for category in categories
+                ],
+            }
+        )
+
+        # Create edge data: pairs between filtered terms, thresholded on the
+        # upper triangle of the co-occurrence matrix; endpoints resolve through a
+        # label -> Id index instead of scanning the node list
+        sources, targets, weights = counts.edges(min_weight, filtered_terms)
+        label_to_id = dict(zip(labels, node_ids))
+        edges_df = pd.DataFrame(
+            {
+                "Source": [label_to_id[term] for term in sources],
+                "Target": [label_to_id[term] for term in targets],
+                "Weight": weights,
+                "Type": ["Undirected"] * len(weights),
+                "Source_Label": sources,
+                "Target_Label": targets,
+            }
+        )
+
+        print(f"Final network size: {len(nodes_df)} nodes, {len(edges_df)} edges{note}")
 
         return nodes_df, edges_df
 
@@ -522,41 +512,275 @@ class PubMedRefinedNetworkV2:
         # High-frequency terms
         print("\nTop 20 high-frequency terms:")
         top_terms = nodes_df.nlargest(20, "Frequency")
-        for idx, row in top_terms.iterrows():
-            desc = self.refined_categories.get(row["Category"], {}).get("description", "Other")
+        for idx, (label, frequency, category) in zip(
+            top_terms.index, iter_rows(top_terms, ["Label", "Frequency", "Category"])
+        ):
+            desc = self.refined_categories.get(category, {}).get("description", "Other")
             print(
-                f"  {int(idx) + 1:2d}. {row['Label']:25s} (frequency: {row['Frequency']:2d}, category: {desc})"  # type: ignore
+                f"  {int(idx) + 1:2d}. {label:25s} "  # type: ignore
+                f"(frequency: {frequency:2d}, category: {desc})"
             )
 
 
-def main() -> None:
+# Builder used by worker processes, set once per worker by _init_worker
+_worker_builder: Optional[PubMedRefinedNetworkV2] = None
+
+
+def _init_worker(builder: PubMedRefinedNetworkV2) -> None:
+    global _worker_builder
+    _worker_builder = builder
+
+
+def _count_shard(
+    task: Tuple[SharedTextHandle, int, int, bool],
+) -> Tuple[CooccurrenceCounter, Optional[DocumentTermPostings]]:
+    """Counts (and postings) of one row range, computed in a worker process"""
+    handle, start, stop, record_postings = task
+    shared = SharedTextFrame.attach(handle)
+    try:
+        shard = shared.frame(start, stop)
+    finally:
+        shared.close()
+
+    counts = CooccurrenceCounter()
+    postings = DocumentTermPostings() if record_postings else None
+    builder: PubMedRefinedNetworkV2 = _worker_builder  # type: ignore[assignment]
+    builder._count_chunk(shard, counts, postings, progress=False)
+    # Folding here keeps the merge in the parent cheap
+    counts.fold()
+    return counts, postings
+
+
+def _row_ranges(n_rows: int, parts: int) -> List[Tuple[int, int]]:
+    """Split range(n_rows) into up to `parts` contiguous, near-equal ranges"""
+    parts = max(1, min(parts, n_rows))
+    bounds = [n_rows * i // parts for i in range(parts + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Command-line options (all optional; defaults reproduce the standard run)"""
+    parser = argparse.ArgumentParser(description="Build the refined PubMed term network")
+    parser.add_argument(
+        "--input",
+        default=None,
+        help="Zotero/PubMed CSV, PubMed XML or MEDLINE (.nbib) file, a directory, "
+        "or a quoted glob such as 'data/raw/*.csv' (default: data/raw/PubMed.csv)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Processes used to parse multiple input files (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes used for term extraction and counting (default: 1)",
+    )
+    parser.add_argument(
+        "--pair-memory",
+        type=int,
+        default=None,
+        help="Memory budget in MB for the term-pair table; beyond it pair counts are "
+        "spilled to temporary files and merged at the end (default: no limit)",
+    )
+    parser.add_argument(
+        "--approximate",
+        action="store_true",
+        help="Pre-filter term pairs with a fixed-size Count-Min sketch and count only "
+        "those that can reach the edge threshold (for very large corpora; the articles' "
+        "term ids are kept in temporary files for the second pass)",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Stream the input in chunks of this many rows to bound memory use",
+    )
+    parser.add_argument(
+        "--state",
+        default=None,
+        help="Incremental mode: merge only unseen articles into the counts persisted "
+        "in this file (created on first use) and rebuild the network from them",
+    )
+    parser.add_argument(
+        "--retract",
+        default=None,
+        help="With --state: file of PMIDs/DOIs (one per line) whose contributions "
+        "are subtracted",
+    )
+    parser.add_argument(
+        "--formats",
+        default="csv",
+        help="Comma-separated output formats: csv, csv.gz, parquet, feather for the "
+        "detailed node/edge tables, gexf, graphml for a single network file, sqlite for "
+        "an indexed network.sqlite with article postings (default: csv)",
+    )
+    parser.add_argument(
+        "--no-gephi",
+        action="store_true",
+        help="Skip the gephi_nodes.csv/gephi_edges.csv projections",
+    )
+    parser.add_argument(
+        "--matrices",
+        action="store_true",
+        help="Also save doc_term.npz and cooccurrence.npz (SciPy CSR) with the "
+        "matrix_index.npz term/article sidecar",
+    )
+    parser.add_argument(
+        "--taxonomy",
+        default=None,
+        help="Taxonomy file (JSON, or YAML with PyYAML) with stopwords, categories and "
+        "research methods (default: english_version/config/taxonomy.json)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always parse the CSV instead of reusing the snapshot in data/cache/",
+    )
+    args = parser.parse_args(argv)
+    try:
+        args.formats = check_formats([fmt.strip() for fmt in args.formats.split(",") if fmt])
+    except (ValueError, ImportError) as e:
+        parser.error(str(e))
+    return args
+
+
+def _load_inputs(
+    converter: PubMedRefinedNetworkV2,
+    file_path: str,
+    args: argparse.Namespace,
+    cache_dir: Optional[str],
+) -> Optional[Union[pd.DataFrame, Iterable[pd.DataFrame]]]:
+    """Articles read with the columns the requested outputs need (None if none loaded)"""
+    # Incremental runs also need the identifier columns to recognise seen articles
+    columns = None
+    if args.state:
+        columns = list(converter.INPUT_COLUMNS) + list(IDENTIFIER_COLUMNS)
+    elif args.matrices or "sqlite" in args.formats:
+        # Matrix rows and postings are labelled with the article ID and publication year
+        columns = list(converter.INPUT_COLUMNS) + list(IDENTIFIER_COLUMNS)
+        columns.append("Publication Year")
+
+    print("Loading PubMed data...")
+    df = converter.load_pubmed_data(
+        file_path, chunksize=args.chunksize, columns=columns, cache_dir=cache_dir, jobs=args.jobs
+    )
+
+    if df is None or (isinstance(df, pd.DataFrame) and df.empty):
+        print("Data loading failed")
+        return None
+    if isinstance(df, pd.DataFrame):
+        print(f"Data size: {len(df)} rows × {len(df.columns)} columns")
+    return df
+
+
+def _update_network(
+    converter: PubMedRefinedNetworkV2,
+    df: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+    args: argparse.Namespace,
+    postings: Optional[DocumentTermPostings],
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Network after folding df into the saved state, which is then saved again"""
+    state = NetworkState.load(args.state) if os.path.exists(args.state) else NetworkState()
+    retracted: List[str] = []
+    if args.retract:
+        with open(args.retract, encoding="utf-8") as f:
+            retracted = [line.strip() for line in f if line.strip() and line[0] != "#"]
+    nodes_df, edges_df = converter.update_refined_network(
+        state, df, min_frequency=3, min_weight=2, retracted=retracted
+    )
+    state.save(args.state)
+    print(f"Network state saved: {args.state} ({len(state.articles)} articles)")
+    if postings is not None:
+        # The state keeps each article's terms but not its publication year
+        for article_id, terms in state.iter_articles():
+            if terms:
+                postings.add(terms, article_id)
+    return nodes_df, edges_df
+
+
+def _write_outputs(
+    nodes_df: pd.DataFrame,
+    edges_df: pd.DataFrame,
+    args: argparse.Namespace,
+    postings: Optional[DocumentTermPostings],
+) -> None:
+    """Save the network files to the 'processed' directory"""
+    output_dir = "../data/processed"
+    if not os.path.exists("../data"):
+        # Handle running from root
+        output_dir = "english_version/data/processed"
+
+    written = write_network(
+        nodes_df,
+        edges_df,
+        output_dir,
+        formats=args.formats,
+        gephi=not args.no_gephi,
+        postings=postings,
+    )
+    if args.matrices:
+        written += write_matrices(postings, nodes_df, output_dir)
+    for path in written:
+        print(f"  - {os.path.basename(path)}")
+
+    print(f"\n[SUCCESS] Network files generated in {output_dir}!")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
     """Main function"""
-    converter = PubMedRefinedNetworkV2()
+    args = parse_args(argv)
 
     # File path - Standardized for 'raw' directory
     file_path = r"../data/raw/PubMed.csv"
 
-    if not os.path.exists(file_path):
+    if args.input:
+        file_path = args.input
+    elif not os.path.exists(file_path):
         # Fallback if running from root
         file_path = r"english_version/data/raw/PubMed.csv"
 
-    if not os.path.exists(file_path):
+    paths = expand_inputs(file_path)
+    if not paths:
         print(f"File not found: {file_path}")
         print("Please place your PubMed CSV file in the 'english_version/data/raw/' directory")
+        print("or pass --input <file, directory or glob>")
         return
 
-    # Load data
-    print("Loading PubMed data...")
-    df = converter.load_pubmed_data(file_path)
+    # Parsed-input snapshots live in the project's data/cache/
+    cache_dir = None if args.no_cache else DEFAULT_CACHE_DIR
 
-    if df is None or df.empty:
-        print("Data loading failed")
+    try:
+        converter = PubMedRefinedNetworkV2(taxonomy_path=args.taxonomy)
+    except (OSError, ValueError, ImportError) as e:
+        print(f"Taxonomy loading failed: {e}")
         return
 
-    print(f"Data size: {len(df)} rows × {len(df.columns)} columns")
+    # Load data
+    df = _load_inputs(converter, file_path, args, cache_dir)
+    if df is None:
+        return
 
     # Build refined network (with thresholds)
-    nodes_df, edges_df = converter.build_refined_network(df, min_frequency=3, min_weight=2)
+    postings = DocumentTermPostings() if args.matrices or "sqlite" in args.formats else None
+    if args.state:
+        nodes_df, edges_df = _update_network(converter, df, args, postings)
+    else:
+        nodes_df, edges_df = converter.build_refined_network(
+            df,
+            min_frequency=3,
+            min_weight=2,
+            postings=postings,
+            workers=args.workers,
+            memory_budget=args.pair_memory * (1 << 20) if args.pair_memory else None,
+            approximate=args.approximate,
+        )
+
+    if args.chunksize and converter.deduplicator is not None:
+        print(f"Duplicate records removed: {converter.deduplicator.dropped}")
 
     if nodes_df.empty:
         print("Network construction failed")
@@ -565,32 +789,7 @@ def main() -> None:
     # Analyze network
     converter.analyze_refined_network(nodes_df, edges_df)
 
-    # Save files to 'processed' directory
-    output_dir = "../data/processed"
-    if not os.path.exists("../data"):
-        # Handle running from root
-        output_dir = "english_version/data/processed"
-
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Gephi files
-    nodes_df[["Id", "Label", "Category", "Frequency"]].to_csv(
-        os.path.join(output_dir, "gephi_nodes.csv"), index=False, encoding="utf-8-sig"
-    )
-
-    edges_df[["Source", "Target", "Weight", "Type"]].to_csv(
-        os.path.join(output_dir, "gephi_edges.csv"), index=False, encoding="utf-8-sig"
-    )
-
-    # Detailed files (for analysis)
-    nodes_df.to_csv(
-        os.path.join(output_dir, "detailed_nodes.csv"), index=False, encoding="utf-8-sig"
-    )
-    edges_df.to_csv(
-        os.path.join(output_dir, "detailed_edges.csv"), index=False, encoding="utf-8-sig"
-    )
-
-    print(f"\n[SUCCESS] Network files generated in {output_dir}!")
+    _write_outputs(nodes_df, edges_df, args, postings)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,209 @@
+# matrices.py - Sparse matrix export of the refined network
+# Records each article's term ids while the network is built and saves the
+# article x term and term x term matrices as SciPy-compatible CSR .npz files
+
+import os
+from array import array
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from cooccurrence import PAIR_MASK, PAIR_SHIFT, pair_counts
+
+# Output files written by write_matrices
+DOC_TERM_FILE = "doc_term.npz"
+COOCCURRENCE_FILE = "cooccurrence.npz"
+MATRIX_INDEX_FILE = "matrix_index.npz"
+
+
+class CsrMatrix(NamedTuple):
+    """CSR arrays in scipy.sparse layout"""
+
+    data: np.ndarray
+    indices: np.ndarray
+    indptr: np.ndarray
+    shape: Tuple[int, int]
+
+    def to_scipy(self) -> Any:
+        """The same matrix as a scipy.sparse.csr_matrix (requires scipy)"""
+        from scipy import sparse
+
+        return sparse.csr_matrix((self.data, self.indices, self.indptr), shape=self.shape)
+
+
+def parse_year(value: Any) -> int:
+    """Four-digit publication year from a year/date cell; 0 when missing"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return 0
+    text = str(value).strip()
+    digits = text[:4]
+    return int(digits) if len(digits) == 4 and digits.isdigit() else 0
+
+
+class DocumentTermPostings:
+    """Per-article term ids collected while the network is built"""
+
+    def __init__(self) -> None:
+        # Every extracted term (before thresholds) -> column id
+        self.vocabulary: Dict[str, int] = {}
+        self.terms: List[str] = []
+        # Row i holds indices[indptr[i]:indptr[i + 1]]
+        self.indices = array("i")
+        self.indptr = array("q", [0])
+        self.article_ids: List[str] = []
+        self.years = array("i")
+
+    def __len__(self) -> int:
+        return len(self.article_ids)
+
+    def add(self, terms: Iterable[str], article_id: str = "", year: Any = None) -> None:
+        """Append one article's (distinct) terms as a row"""
+        for term in terms:
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                term_id = self.vocabulary[term] = len(self.terms)
+                self.terms.append(term)
+            self.indices.append(term_id)
+        self.indptr.append(len(self.indices))
+        self.article_ids.append(article_id)
+        self.years.append(parse_year(year))
+
+    def extend(self, other: "DocumentTermPostings") -> None:
+        """Append another collection's rows, re-mapping its term ids to ours"""
+        lookup = array("i")
+        for term in other.terms:
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                term_id = self.vocabulary[term] = len(self.terms)
+                self.terms.append(term)
+            lookup.append(term_id)
+
+        offset = len(self.indices)
+        mapped = np.frombuffer(lookup, dtype=np.int32)[np.frombuffer(other.indices, dtype=np.int32)]
+        self.indices.frombytes(mapped.astype(np.int32).tobytes())
+        indptr = np.frombuffer(other.indptr, dtype=np.int64)[1:] + offset
+        self.indptr.frombytes(indptr.tobytes())
+        self.article_ids.extend(other.article_ids)
+        self.years.extend(other.years)
+
+
+def _index_dtype(nnz: int) -> type:
+    return np.int32 if nnz < np.iinfo(np.int32).max else np.int64
+
+
+def _to_csr(
+    rows: np.ndarray, cols: np.ndarray, data: np.ndarray, shape: Tuple[int, int]
+) -> CsrMatrix:
+    """CSR arrays from coordinates without duplicates"""
+    order = np.lexsort((cols, rows))
+    dtype = _index_dtype(len(data))
+    indptr: np.ndarray = np.zeros(shape[0] + 1, dtype=dtype)
+    np.cumsum(np.bincount(rows, minlength=shape[0]), out=indptr[1:])
+    return CsrMatrix(
+        data=data[order].astype(np.int32),
+        indices=cols[order].astype(dtype),
+        indptr=indptr,
+        shape=shape,
+    )
+
+
+def document_term_matrix(postings: DocumentTermPostings, columns: List[str]) -> CsrMatrix:
+    """Binary article x term matrix over the given terms (others are dropped)"""
+    # Map recorded term ids to output columns; -1 for terms not in the network
+    lookup = np.full(len(postings.terms), -1, dtype=np.int64)
+    for col, term in enumerate(columns):
+        term_id = postings.vocabulary.get(term)
+        if term_id is not None:
+            lookup[term_id] = col
+
+    indices = lookup[np.frombuffer(postings.indices, dtype=np.int32)]
+    indptr = np.frombuffer(postings.indptr, dtype=np.int64)
+    rows = np.repeat(np.arange(len(postings), dtype=np.int64), np.diff(indptr))
+    keep = indices >= 0
+    return _to_csr(
+        rows[keep],
+        indices[keep],
+        np.ones(int(keep.sum()), dtype=np.int32),
+        (len(postings), len(columns)),
+    )
+
+
+def cooccurrence_matrix(doc_term: CsrMatrix) -> CsrMatrix:
+    """Symmetric term x term counts; the diagonal holds term frequencies
+
+    Off-diagonal entries are the raw pair counts, before the min_weight
+    threshold that the edge list applies.
+    """
+    n_terms = doc_term.shape[1]
+    pairs, weights = pair_counts(doc_term.indices, doc_term.indptr, n_terms)
+    upper, lower = pairs >> PAIR_SHIFT, pairs & PAIR_MASK
+    diagonal = np.arange(n_terms, dtype=np.int64)
+    frequency = np.bincount(doc_term.indices, minlength=n_terms)
+
+    return _to_csr(
+        np.concatenate([upper, lower, diagonal]),
+        np.concatenate([lower, upper, diagonal]),
+        np.concatenate([weights, weights, frequency]),
+        (n_terms, n_terms),
+    )
+
+
+def save_npz(path: str, matrix: CsrMatrix) -> str:
+    """Write a matrix in the layout scipy.sparse.load_npz reads"""
+    np.savez(
+        path,
+        format=np.array(b"csr"),
+        shape=np.array(matrix.shape),
+        data=matrix.data,
+        indices=matrix.indices,
+        indptr=matrix.indptr,
+    )
+    return path
+
+
+def load_npz(path: str) -> CsrMatrix:
+    """Read a matrix written by save_npz (or scipy.sparse.save_npz) without scipy"""
+    with np.load(path) as npz:
+        return CsrMatrix(
+            data=npz["data"],
+            indices=npz["indices"],
+            indptr=npz["indptr"],
+            shape=tuple(int(n) for n in npz["shape"]),  # type: ignore[arg-type]
+        )
+
+
+def write_matrices(
+    postings: DocumentTermPostings, nodes_df: pd.DataFrame, output_dir: str
+) -> List[str]:
+    """Save doc_term.npz, cooccurrence.npz and the matrix_index.npz sidecar
+
+    Matrix columns follow the rows of nodes_df. The sidecar holds the term
+    Id/Label/Category/Frequency per column and the article ID and publication
+    year (0 if unknown) per document row, as plain numpy arrays.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    labels: List[str] = nodes_df["Label"].tolist() if not nodes_df.empty else []
+
+    doc_term = document_term_matrix(postings, labels)
+    written = [
+        save_npz(os.path.join(output_dir, DOC_TERM_FILE), doc_term),
+        save_npz(os.path.join(output_dir, COOCCURRENCE_FILE), cooccurrence_matrix(doc_term)),
+    ]
+
+    def column(name: str, dtype: Optional[type] = None) -> np.ndarray:
+        values = nodes_df[name].tolist() if name in nodes_df else []
+        return np.array(values, dtype=dtype) if dtype else np.array(values, dtype=str)
+
+    index_path = os.path.join(output_dir, MATRIX_INDEX_FILE)
+    np.savez(
+        index_path,
+        term_id=column("Id"),
+        term_label=np.array(labels, dtype=str),
+        term_category=column("Category"),
+        term_frequency=column("Frequency", np.int64),
+        article_id=np.array(postings.article_ids, dtype=str),
+        article_year=np.frombuffer(postings.years, dtype=np.int32),
+    )
+    written.append(index_path)
+    return written
@@ -0,0 +1,204 @@
+# network_db.py - SQLite store for the refined network
+# Nodes, edges and article -> term postings in one indexed database file, so
+# neighbourhood and weight-threshold questions are answered by SQL, not grep
+#
+# Query from the command line:
+#   python network_db.py ../data/processed/network.sqlite Erenumab --min-weight 5
+
+import argparse
+import os
+import sqlite3
+from typing import Any, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from matrices import DocumentTermPostings, document_term_matrix
+
+SCHEMA = """
+CREATE TABLE nodes (
+    node INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    label TEXT NOT NULL,
+    category TEXT,
+    frequency INTEGER,
+    category_description TEXT
+);
+CREATE TABLE edges (
+    source INTEGER NOT NULL REFERENCES nodes(node),
+    target INTEGER NOT NULL REFERENCES nodes(node),
+    weight INTEGER NOT NULL
+);
+CREATE TABLE articles (
+    article INTEGER PRIMARY KEY,
+    article_id TEXT,
+    year INTEGER
+);
+CREATE TABLE postings (
+    article INTEGER NOT NULL REFERENCES articles(article),
+    node INTEGER NOT NULL REFERENCES nodes(node),
+    PRIMARY KEY (article, node)
+) WITHOUT ROWID;
+"""
+
+# Built after the bulk insert, which is faster than maintaining them row by row
+INDEXES = """
+CREATE INDEX nodes_label ON nodes(label COLLATE NOCASE);
+CREATE INDEX nodes_id ON nodes(id);
+CREATE INDEX nodes_category ON nodes(category);
+CREATE INDEX edges_source ON edges(source, weight);
+CREATE INDEX edges_target ON edges(target, weight);
+CREATE INDEX edges_weight ON edges(weight);
+CREATE INDEX postings_node ON postings(node, article);
+CREATE INDEX articles_year ON articles(year);
+"""
+
+# Undirected edges are stored once; the view lists them from both ends
+NEIGHBOUR_VIEW = """
+CREATE VIEW neighbours AS
+SELECT source AS node, target AS neighbour, weight FROM edges
+UNION ALL
+SELECT target AS node, source AS neighbour, weight FROM edges;
+"""
+
+
+def _int(value: Any) -> Optional[int]:
+    return None if pd.isna(value) else int(value)
+
+
+def write_sqlite(
+    nodes_df: pd.DataFrame,
+    edges_df: pd.DataFrame,
+    path: str,
+    postings: Optional[DocumentTermPostings] = None,
+) -> str:
+    """Write nodes, edges (and postings if recorded) to a fresh SQLite database
+
+    Rows go in with executemany inside one transaction; indexes are created
+    afterwards. The file is built next to `path` and moved into place at the end.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        # Nothing to recover if the build is interrupted: the tmp file is discarded
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(SCHEMA)
+
+        nodes = nodes_df.reindex(
+            columns=["Id", "Label", "Category", "Frequency", "Category_Description"]
+        )
+        # Ids are truncated and may collide, so edges are matched on their labels
+        # when the detailed edge table carries them
+        by_label = {"Source_Label", "Target_Label"} <= set(edges_df.columns)
+        key_column = "Label" if by_label else "Id"
+        node_keys = {key: i for i, key in enumerate(nodes[key_column])}
+
+        with conn:
+            conn.executemany(
+                "INSERT INTO nodes VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (i, node_id, label, category, _int(freq), description)
+                    for i, (node_id, label, category, freq, description) in enumerate(
+                        nodes.itertuples(index=False, name=None)
+                    )
+                ),
+            )
+            edge_columns = ["Source_Label", "Target_Label"] if by_label else ["Source", "Target"]
+            edges = edges_df.reindex(columns=edge_columns + ["Weight"])
+            conn.executemany(
+                "INSERT INTO edges VALUES (?, ?, ?)",
+                (
+                    (node_keys[source], node_keys[target], int(weight))
+                    for source, target, weight in edges.itertuples(index=False, name=None)
+                ),
+            )
+
+            if postings is not None:
+                conn.executemany(
+                    "INSERT INTO articles VALUES (?, ?, ?)",
+                    (
+                        (i, article_id, year or None)
+                        for i, (article_id, year) in enumerate(
+                            zip(postings.article_ids, postings.years)
+                        )
+                    ),
+                )
+                # Only terms that made it into the network are posted
+                doc_term = document_term_matrix(postings, nodes["Label"].tolist())
+                rows = np.repeat(
+                    np.arange(doc_term.shape[0], dtype=np.int64), np.diff(doc_term.indptr)
+                )
+                conn.executemany(
+                    "INSERT INTO postings VALUES (?, ?)",
+                    zip(rows.tolist(), doc_term.indices.tolist()),
+                )
+
+        conn.executescript(INDEXES + NEIGHBOUR_VIEW)
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, path)
+    return path
+
+
+def neighbours(
+    db: Union[sqlite3.Connection, str], term: str, min_weight: int = 1
+) -> List[Tuple[str, str, int]]:
+    """(label, category, weight) of the nodes connected to a term, heaviest first
+
+    `term` matches a node Label (case-insensitively) or Id.
+    """
+    conn = sqlite3.connect(db) if isinstance(db, str) else db
+    try:
+        nodes = [
+            node
+            for (node,) in conn.execute(
+                "SELECT node FROM nodes WHERE label = ? COLLATE NOCASE OR id = ?", (term, term)
+            )
+        ]
+        rows: List[Tuple[str, str, int]] = []
+        # Edges are stored once, so look the node up on both ends (one index each)
+        for node in nodes:
+            rows += conn.execute(
+                """
+                SELECT n.label, n.category, e.weight
+                FROM edges AS e JOIN nodes AS n ON n.node = e.target
+                WHERE e.source = ? AND e.weight >= ?
+                UNION ALL
+                SELECT n.label, n.category, e.weight
+                FROM edges AS e JOIN nodes AS n ON n.node = e.source
+                WHERE e.target = ? AND e.weight >= ?
+                """,
+                (node, min_weight, node, min_weight),
+            ).fetchall()
+        return sorted(rows, key=lambda row: (-row[2], row[0]))
+    finally:
+        if isinstance(db, str):
+            conn.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Print a term's neighbours from a network database"""
+    parser = argparse.ArgumentParser(description="Query a network.sqlite database")
+    parser.add_argument("database", help="Path to network.sqlite")
+    parser.add_argument("term", help="Node label or Id")
+    parser.add_argument("--min-weight", type=int, default=1, help="Minimum edge weight")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.database):
+        print(f"Database not found: {args.database}")
+        return
+
+    rows = neighbours(args.database, args.term, args.min_weight)
+    print(f"{args.term}: {len(rows)} neighbours with weight >= {args.min_weight}")
+    for label, category, weight in rows:
+        print(f"  {label:<40} {category or '':<22} {weight}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+# pubmed_formats.py - Streaming readers for native PubMed formats
+# PubMed/MEDLINE XML and MEDLINE (.nbib) text, mapped to the Zotero-style columns
+
+import codecs
+import xml.etree.ElementTree as ET
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Union
+
+import pandas as pd
+
+# Columns produced for every record, named after the Zotero CSV export
+RECORD_FIELDS = (
+    "PMID",
+    "DOI",
+    "Title",
+    "Publication Year",
+    "Abstract Note",
+    "Manual Tags",
+    "Keywords",
+)
+
+# Tags are joined the way Zotero writes its Manual Tags column
+TAG_SEPARATOR = "; "
+
+Source = Union[str, IO[bytes]]
+
+
+def detect_record_format(head: bytes) -> str:
+    """Classify a file from its first bytes: 'xml', 'medline' or 'csv'"""
+    text = head.lstrip(codecs.BOM_UTF8).lstrip()
+    if text.startswith(b"<"):
+        return "xml"
+    if text.startswith(b"PMID-") or text.startswith(b"PMID -"):
+        return "medline"
+    return "csv"
+
+
+def _text(elem: Optional[ET.Element]) -> str:
+    """All text inside an element, including inline markup such as <i>"""
+    if elem is None:
+        return ""
+    return "".join(elem.itertext()).strip()
+
+
+def _mesh_heading(heading: ET.Element) -> str:
+    """Format a MeshHeading like a MEDLINE MH line: *Descriptor/*qualifier"""
+    descriptor = heading.find("DescriptorName")
+    if descriptor is None:
+        return ""
+    label = _text(descriptor)
+    if descriptor.get("MajorTopicYN") == "Y":
+        label = "*" + label
+    for qualifier in heading.findall("QualifierName"):
+        major = "*" if qualifier.get("MajorTopicYN") == "Y" else ""
+        label += f"/{major}{_text(qualifier)}"
+    return label
+
+
+def _publication_year(article: Optional[ET.Element]) -> str:
+    if article is None:
+        return ""
+    pub_date = article.find("Journal/JournalIssue/PubDate")
+    if pub_date is None:
+        return ""
+    year = pub_date.findtext("Year")
+    if year:
+        return year.strip()
+    # e.g. <MedlineDate>2019 Nov-Dec</MedlineDate>
+    return (pub_date.findtext("MedlineDate") or "")[:4]
+
+
+def _doi(record: ET.Element, article: Optional[ET.Element]) -> str:
+    for article_id in record.iterfind("PubmedData/ArticleIdList/ArticleId"):
+        if article_id.get("IdType") == "doi":
+            return _text(article_id)
+    if article is not None:
+        for location in article.iterfind("ELocationID"):
+            if location.get("EIdType") == "doi":
+                return _text(location)
+    return ""
+
+
+def _xml_record(record: ET.Element) -> Dict[str, str]:
+    """Map one <PubmedArticle> to the record fields"""
+    citation = record.find("MedlineCitation")
+    if citation is None:
+        return dict.fromkeys(RECORD_FIELDS, "")
+    article = citation.find("Article")
+
+    abstract_parts = []
+    if article is not None:
+        for part in article.iterfind("Abstract/AbstractText"):
+            text = _text(part)
+            label = part.get("Label")
+            abstract_parts.append(f"{label}: {text}" if label and text else text)
+
+    mesh = [_mesh_heading(h) for h in citation.iterfind("MeshHeadingList/MeshHeading")]
+    keywords = [_text(k) for k in citation.iterfind("KeywordList/Keyword")]
+
+    return {
+        "PMID": _text(citation.find("PMID")),
+        "DOI": _doi(record, article),
+        "Title": _text(article.find("ArticleTitle")) if article is not None else "",
+        "Publication Year": _publication_year(article),
+        "Abstract Note": " ".join(p for p in abstract_parts if p),
+        "Manual Tags": TAG_SEPARATOR.join(m for m in mesh if m),
+        "Keywords": TAG_SEPARATOR.join(k for k in keywords if k),
+    }
+
+
+def iter_pubmed_xml(source: Source) -> Iterator[Dict[str, str]]:
+    """Stream records from a PubMed XML file (baseline/update files or efetch output)
+
+    Each <PubmedArticle> is released as soon as it has been converted, so
+    memory stays flat regardless of file size.
+    """
+    root = None
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            continue
+        if elem.tag == "PubmedArticle":
+            yield _xml_record(elem)
+        if elem.tag in ("PubmedArticle", "PubmedBookArticle", "DeleteCitation"):
+            # Drop the finished subtree and the root's reference to it
+            elem.clear()
+            if root is not None:
+                root.clear()
+
+
+# MEDLINE tags mapped to record fields; list-valued tags are joined with TAG_SEPARATOR
+MEDLINE_FIELDS = {
+    "PMID": "PMID",
+    "TI": "Title",
+    "AB": "Abstract Note",
+    "MH": "Manual Tags",
+    "OT": "Keywords",
+}
+
+
+def _medline_record(fields: Dict[str, List[str]]) -> Dict[str, str]:
+    """Map parsed MEDLINE tags to the record fields"""
+    record = dict.fromkeys(RECORD_FIELDS, "")
+    for tag, column in MEDLINE_FIELDS.items():
+        if tag in fields:
+            joiner = TAG_SEPARATOR if tag in ("MH", "OT") else " "
+            record[column] = joiner.join(fields[tag])
+
+    # DOI is carried in AID/LID lines as "10.xxxx/yyy [doi]"
+    for tag in ("AID", "LID"):
+        for value in fields.get(tag, []):
+            if value.endswith("[doi]"):
+                record["DOI"] = value[: -len("[doi]")].strip()
+                break
+        if record["DOI"]:
+            break
+
+    if "DP" in fields:
+        record["Publication Year"] = fields["DP"][0][:4]
+    return record
+
+
+def iter_medline(lines: Iterable[str]) -> Iterator[Dict[str, str]]:
+    """Stream records from MEDLINE/.nbib text lines
+
+    Records are separated by blank lines; a line is either "TAG - value" or
+    a six-space continuation of the previous value.
+    """
+    fields: Dict[str, List[str]] = {}
+    last_tag = None
+
+    for raw_line in lines:
+        line = raw_line.rstrip("\r\n")
+        if not line.strip():
+            if fields:
+                yield _medline_record(fields)
+            fields, last_tag = {}, None
+            continue
+
+        if line.startswith("      ") and last_tag is not None:
+            values = fields[last_tag]
+            values[-1] = f"{values[-1]} {line.strip()}"
+            continue
+
+        if len(line) > 4 and line[4:6] == "- ":
+            last_tag = line[:4].rstrip()
+            fields.setdefault(last_tag, []).append(line[6:].strip())
+
+    if fields:
+        yield _medline_record(fields)
+
+
+def records_to_frames(
+    records: Iterable[Dict[str, str]],
+    chunksize: Optional[int],
+    columns: Optional[List[str]] = None,
+    dtypes: Optional[Dict[str, str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Batch records into DataFrames of chunksize rows (one frame if chunksize is None)"""
+    columns = columns or list(RECORD_FIELDS)
+    batch: List[Dict[str, str]] = []
+    offset = 0
+
+    def frame() -> pd.DataFrame:
+        df = pd.DataFrame.from_records(batch, columns=columns)
+        df.index = pd.RangeIndex(offset, offset + len(df))
+        # Empty strings mean "absent", matching what read_csv gives for blank cells
+        df = df.where(df != "")
+        return df.astype(dtypes) if dtypes else df
+
+    for record in records:
+        batch.append(record)
+        if chunksize and len(batch) >= chunksize:
+            yield frame()
+            offset += len(batch)
+            batch = []
+
+    if batch or not offset:
+        yield frame()
@@ -0,0 +1,144 @@
+# shared_text.py - DataFrame text columns in shared memory for worker processes
+# Columns are encoded once into a single shared-memory block (per column: a
+# null mask, int64 offsets and a contiguous UTF-8 blob). Workers attach by name
+# and decode only the rows they process, so handing out work costs the same
+# whatever the size of the corpus
+
+from multiprocessing import shared_memory
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class SharedColumn(NamedTuple):
+    """Byte positions of one column's parts inside the block"""
+
+    name: str
+    mask: int
+    offsets: int
+    data: int
+
+
+class SharedTextHandle(NamedTuple):
+    """Picklable reference to a SharedTextFrame: block name and layout"""
+
+    name: str
+    n_rows: int
+    columns: Tuple[SharedColumn, ...]
+
+
+def _encode(values: List[Any]) -> Tuple[np.ndarray, np.ndarray, bytes]:
+    """Null mask, offsets and UTF-8 blob of a column (values stored as str())"""
+    missing = np.array(pd.isna(values), dtype=bool) if values else np.zeros(0, dtype=bool)
+    encoded = [
+        b"" if is_missing else str(value).encode("utf-8")
+        for value, is_missing in zip(values, missing.tolist())
+    ]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(item) for item in encoded], out=offsets[1:])
+    return missing, offsets, b"".join(encoded)
+
+
+def _buffer(shm: shared_memory.SharedMemory) -> memoryview:
+    """Memory of an open block"""
+    if shm.buf is None:
+        raise ValueError(f"Shared memory block {shm.name} is closed")
+    return shm.buf
+
+
+class SharedTextFrame:
+    """Columns of a DataFrame held as UTF-8 text in one shared-memory block
+
+    Create it in the parent with `create` (a context manager that frees the
+    block on exit), pass `handle` to workers, and `attach` there.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, handle: SharedTextHandle, owner: bool):
+        self._shm = shm
+        self.handle = handle
+        self._owner = owner
+
+    @classmethod
+    def create(cls, df: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> "SharedTextFrame":
+        """Copy the given columns (default: all) of df into a new block
+
+        Non-null values are stored as their str(); missing values stay missing.
+        """
+        names = list(df.columns if columns is None else columns)
+        n_rows = len(df)
+        encoded = [_encode(df[name].tolist()) for name in names]
+
+        # Per column: offsets (kept 8-byte aligned), null mask, UTF-8 blob
+        layout = []
+        position = 0
+        for name, (_, offsets, blob) in zip(names, encoded):
+            layout.append(
+                SharedColumn(
+                    name=str(name),
+                    mask=position + offsets.nbytes,
+                    offsets=position,
+                    data=position + offsets.nbytes + n_rows,
+                )
+            )
+            position += offsets.nbytes + n_rows + len(blob)
+            position += -position % 8
+
+        shm = shared_memory.SharedMemory(create=True, size=max(position, 1))
+        buf = _buffer(shm)
+        for column, (missing, offsets, blob) in zip(layout, encoded):
+            buf[column.offsets : column.mask] = offsets.tobytes()
+            buf[column.mask : column.data] = missing.astype(np.uint8).tobytes()
+            buf[column.data : column.data + len(blob)] = blob
+        return cls(shm, SharedTextHandle(shm.name, n_rows, tuple(layout)), owner=True)
+
+    @classmethod
+    def attach(cls, handle: SharedTextHandle) -> "SharedTextFrame":
+        """Open a block created by another process"""
+        return cls(shared_memory.SharedMemory(name=handle.name), handle, owner=False)
+
+    def __len__(self) -> int:
+        return self.handle.n_rows
+
+    def column(self, name: str, start: int = 0, stop: Optional[int] = None) -> List[Optional[str]]:
+        """Decoded values of rows [start, stop) of a column (None where missing)"""
+        column = next(c for c in self.handle.columns if c.name == name)
+        n_rows = self.handle.n_rows
+        stop = n_rows if stop is None else min(stop, n_rows)
+        if start >= stop:
+            return []
+
+        # Views into the block must be released before close(), so only copies
+        # of the needed bytes are kept
+        buf = _buffer(self._shm)
+        offsets = np.frombuffer(buf, dtype=np.int64, count=n_rows + 1, offset=column.offsets)
+        bounds = (offsets[start : stop + 1] - offsets[start]).tolist()
+        first, last = int(offsets[start]), int(offsets[stop])
+        del offsets
+        missing = bytes(buf[column.mask + start : column.mask + stop])
+        blob = bytes(buf[column.data + first : column.data + last])
+
+        return [
+            None if missing[i] else blob[bounds[i] : bounds[i + 1]].decode("utf-8")
+            for i in range(stop - start)
+        ]
+
+    def frame(self, start: int = 0, stop: Optional[int] = None) -> pd.DataFrame:
+        """Rows [start, stop) as a DataFrame of object columns, indexed from start"""
+        stop = self.handle.n_rows if stop is None else min(stop, self.handle.n_rows)
+        data = {c.name: self.column(c.name, start, stop) for c in self.handle.columns}
+        return pd.DataFrame(
+            {name: pd.Series(values, dtype=object) for name, values in data.items()}
+        ).set_axis(pd.RangeIndex(start, max(start, stop)))
+
+    def close(self) -> None:
+        """Detach; the creating process also frees the block"""
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> "SharedTextFrame":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
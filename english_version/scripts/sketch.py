@@ -0,0 +1,145 @@
+# sketch.py - Approximate term-pair counting for exploratory runs
+# A first pass streams every article's pairs into a fixed-size Count-Min
+# sketch; a second pass over the articles' term ids, kept in temporary files,
+# counts exactly only the pairs whose estimate reaches min_weight. Estimates never undercount, so no
+# edge above the threshold is missed and the kept weights are exact
+
+import math
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from cooccurrence import CooccurrenceCounter, pair_counts
+
+
+class CountMinSketch:
+    """Count-Min sketch of int64 keys: `depth` rows of `width` counters
+
+    With probability at least 1 - delta, every estimate exceeds the true count
+    by at most epsilon * total, where epsilon = e / width and delta = e^-depth.
+    """
+
+    def __init__(self, width: int = 1 << 20, depth: int = 4, seed: int = 0) -> None:
+        if width < 2 or width & (width - 1):
+            raise ValueError(f"Sketch width must be a power of two, got {width}")
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self.table = np.zeros((depth, width), dtype=np.uint32)
+        # Multiply-shift hashing: row r maps key k to the top bits of a_r * k + b_r
+        rng = np.random.default_rng(seed)
+        self._multipliers = rng.integers(1, 1 << 63, size=depth, dtype=np.uint64) | np.uint64(1)
+        self._offsets = rng.integers(0, 1 << 63, size=depth, dtype=np.uint64)
+        self._shift = np.uint64(64 - (width.bit_length() - 1))
+
+    def _buckets(self, keys: np.ndarray, row: int) -> np.ndarray:
+        hashed = keys.astype(np.uint64) * self._multipliers[row] + self._offsets[row]
+        buckets: np.ndarray = (hashed >> self._shift).astype(np.intp)
+        return buckets
+
+    def add(self, keys: np.ndarray, counts: np.ndarray) -> None:
+        """Add positive counts for distinct keys"""
+        counts = np.asarray(counts, dtype=np.uint32)
+        for row in range(self.depth):
+            np.add.at(self.table[row], self._buckets(keys, row), counts)
+        self.total += int(counts.sum())
+
+    def estimate(self, keys: np.ndarray) -> np.ndarray:
+        """Upper estimates of the counts of keys"""
+        estimates = np.full(len(keys), np.iinfo(np.uint32).max, dtype=np.uint32)
+        for row in range(self.depth):
+            np.minimum(estimates, self.table[row][self._buckets(keys, row)], out=estimates)
+        return estimates.astype(np.int64)
+
+    @property
+    def epsilon(self) -> float:
+        return math.e / self.width
+
+    @property
+    def delta(self) -> float:
+        return math.exp(-self.depth)
+
+    @property
+    def error_bound(self) -> float:
+        """Largest overestimate, holding with probability 1 - delta"""
+        return self.epsilon * self.total
+
+    @property
+    def nbytes(self) -> int:
+        return self.table.nbytes
+
+
+class SketchedCooccurrenceCounter(CooccurrenceCounter):
+    """CooccurrenceCounter that keeps only pairs able to reach min_weight
+
+    Node frequencies are exact. Pair counts go into a CountMinSketch while
+    articles are added, and each folded batch of term ids is written to a
+    temporary file (4 bytes per term) for the second pass, which runs on the
+    first read of the pairs for a given min_weight and reads one batch at a
+    time. Articles cannot be subtracted or counts merged in.
+    """
+
+    def __init__(
+        self,
+        width: int = 1 << 20,
+        depth: int = 4,
+        backend: Optional[str] = None,
+        memory_budget: Optional[int] = None,
+    ) -> None:
+        super().__init__(backend=backend, memory_budget=memory_budget)
+        self.sketch = CountMinSketch(width, depth)
+        # Files of the folded batches' CSR rows of term ids, re-read by the second pass
+        self._batches: List[str] = []
+        # min_weight of the last second pass (None before it ran)
+        self._verified: Optional[int] = None
+
+    def add_ids(self, ids: Iterable[int], weight: int = 1) -> None:
+        if weight != 1:
+            raise ValueError("Approximate counts can only add articles")
+        super().add_ids(ids, weight)
+
+    def add_counts(
+        self,
+        terms: Sequence[str],
+        frequency: npt.ArrayLike,
+        pairs: npt.ArrayLike,
+    ) -> List[int]:
+        raise ValueError("Approximate counts are built from articles, not merged counts")
+
+    def _fold_pairs(self, indices: np.ndarray, indptr: np.ndarray, weights: np.ndarray) -> None:
+        self.sketch.add(*pair_counts(indices, indptr, len(self.terms), backend=self.backend))
+        path = self._spill_path(f"rows-{len(self._batches)}")
+        np.save(f"{path}.indices.npy", indices)
+        np.save(f"{path}.indptr.npy", indptr)
+        self._batches.append(path)
+        self._verified = None
+
+    def verify(self, min_weight: int) -> None:
+        """Second pass: count exactly the pairs whose estimate reaches min_weight"""
+        self.fold()
+        min_weight = max(min_weight, 1)
+        if self._verified is not None and self._verified <= min_weight:
+            return
+        self._clear_pairs()
+
+        for path in self._batches:
+            indices = np.load(f"{path}.indices.npy", mmap_mode="r")
+            # A pair never occurs more often than its rarer term, so terms below
+            # min_weight are dropped from the rows before pairs are expanded
+            frequent = self._frequency[indices] >= min_weight
+            kept = np.zeros(len(indices) + 1, dtype=np.int64)
+            np.cumsum(frequent, out=kept[1:])
+            indptr = kept[np.load(f"{path}.indptr.npy")]
+            keys, counts = pair_counts(
+                indices[frequent], indptr, len(self.terms), backend=self.backend
+            )
+            keep = self.sketch.estimate(keys) >= min_weight
+            self._add_pairs(keys[keep], counts[keep])
+        self._verified = min_weight
+
+    def iter_pairs(
+        self, min_weight: int = 1, block_size: int = 1 << 20
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        self.verify(min_weight)
+        yield from super().iter_pairs(min_weight, block_size)
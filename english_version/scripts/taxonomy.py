@@ -0,0 +1,135 @@
+# taxonomy.py - External term taxonomy (stopwords, categories, research methods)
+# Taxonomy files live in english_version/config/ as JSON (or YAML when PyYAML
+# is installed). Compiling one takes well under a millisecond, so it is done on
+# every load, and TaxonomyWatcher picks up edits in a long-running process
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Set, Tuple
+
+from categorizer import AbstractScanner, TermCategorizer
+from term_cleaning import TermCleaner
+
+try:
+    import yaml
+
+    HAS_YAML = True
+except ImportError:  # pragma: no cover - depends on environment
+    HAS_YAML = False
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config")
+DEFAULT_TAXONOMY = os.path.normpath(os.path.join(CONFIG_DIR, "taxonomy.json"))
+DISCOVERY_TAXONOMY = os.path.normpath(os.path.join(CONFIG_DIR, "discovery_taxonomy.json"))
+
+
+@dataclass
+class Taxonomy:
+    """Parsed taxonomy file"""
+
+    version: int
+    stopwords: Set[str]
+    categories: Dict[str, Dict[str, Any]]
+    research_methods: List[str] = field(default_factory=list)
+    # (category, words) in priority order
+    inference_words: List[Tuple[str, List[str]]] = field(default_factory=list)
+    name: str = ""
+    path: str = ""
+    digest: str = ""
+
+
+def _parse(raw: bytes, path: str) -> Dict[str, Any]:
+    if path.endswith((".yaml", ".yml")):
+        if not HAS_YAML:
+            raise ImportError(f"YAML taxonomy {path} requires: pip install pyyaml")
+        data = yaml.safe_load(raw)
+    else:
+        data = json.loads(raw.decode("utf-8"))
+    if not isinstance(data, dict):
+        raise ValueError(f"Taxonomy {path} must be a mapping")
+    return data
+
+
+def parse_taxonomy(raw: bytes, path: str = "") -> Taxonomy:
+    """Validate a taxonomy file's content"""
+    data = _parse(raw, path)
+
+    categories = data.get("categories")
+    if not isinstance(categories, dict) or not categories:
+        raise ValueError(f"Taxonomy {path} needs a non-empty 'categories' mapping")
+    for category, info in categories.items():
+        if not isinstance(info, dict) or not isinstance(info.get("keywords"), list):
+            raise ValueError(f"Taxonomy {path}: category '{category}' needs a 'keywords' list")
+        info.setdefault("description", category)
+
+    inference = data.get("inference_words") or {}
+    return Taxonomy(
+        version=int(data.get("version", 1)),
+        stopwords=set(data.get("stopwords") or ()),
+        categories=categories,
+        research_methods=list(data.get("research_methods") or ()),
+        inference_words=[(category, list(words)) for category, words in inference.items()],
+        name=str(data.get("name", "")),
+        path=path,
+        digest=hashlib.blake2b(raw, digest_size=16).hexdigest(),
+    )
+
+
+def read_taxonomy(path: str = DEFAULT_TAXONOMY) -> Taxonomy:
+    with open(path, "rb") as f:
+        return parse_taxonomy(f.read(), path)
+
+
+class CompiledTaxonomy:
+    """A taxonomy with its cleaning engine, categorizer and abstract scanner"""
+
+    def __init__(self, taxonomy: Taxonomy) -> None:
+        self.taxonomy = taxonomy
+        self.term_cleaner = TermCleaner(taxonomy.stopwords)
+        self.categorizer = TermCategorizer(
+            taxonomy.research_methods, taxonomy.categories, taxonomy.inference_words
+        )
+        self.abstract_scanner = AbstractScanner(taxonomy.categories, self.term_cleaner.clean)
+
+
+def compile_taxonomy(path: str = DEFAULT_TAXONOMY) -> CompiledTaxonomy:
+    """Load and compile a taxonomy file"""
+    return CompiledTaxonomy(read_taxonomy(path))
+
+
+class TaxonomyWatcher:
+    """Compiled taxonomy that is recompiled when its file changes on disk"""
+
+    def __init__(self, path: str = DEFAULT_TAXONOMY) -> None:
+        self.path = path
+        self.compiled = compile_taxonomy(path)
+        self._stamp = self._stat()
+
+    def _stat(self) -> Tuple[int, int]:
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def check(self) -> bool:
+        """Recompile if the file was modified; True if the taxonomy changed
+
+        A broken edit is reported and the previous taxonomy kept.
+        """
+        try:
+            stamp = self._stat()
+        except OSError as e:
+            print(f"Taxonomy file unavailable, keeping the loaded one: {e}")
+            return False
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+
+        try:
+            compiled = compile_taxonomy(self.path)
+        except (OSError, ValueError, ImportError) as e:
+            print(f"Taxonomy reload failed, keeping the loaded one: {e}")
+            return False
+        if compiled.taxonomy.digest == self.compiled.taxonomy.digest:
+            return False
+        self.compiled = compiled
+        return True
@@ -0,0 +1,126 @@
+# term_cleaning.py - Cached term-cleaning engine
+# The same tag segments ("Humans", "Migraine Disorders") recur in most
+# articles, so each raw segment is cleaned once and the result remembered
+
+import re
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+# Patterns applied in order by strict term cleaning
+MARKER_PATTERNS = (
+    re.compile(r"^\*+|\*+$"),  # Leading/trailing asterisks
+    re.compile(r"/\*.*"),  # Content after slash-asterisk
+    re.compile(r"\[.*?\]|\(.*?\)"),  # Brackets content
+)
+# Words containing anything but lowercase letters and hyphens are dropped
+INVALID_WORD = re.compile(r"[^a-z\-]")
+# Separators between tag/keyword segments
+SEGMENT_SEPARATORS = re.compile(r"[;,]")
+
+MIN_WORD_LENGTH = 3
+MAX_WORD_LENGTH = 20
+DEFAULT_MEMO_SIZE = 100_000
+
+
+class TermCleaner:
+    """Strict term cleaning with precompiled patterns and a bounded memo
+
+    `stopwords` is held by reference; call `cache_clear()` after changing it.
+    """
+
+    def __init__(self, stopwords: Iterable[str], memo_size: int = DEFAULT_MEMO_SIZE) -> None:
+        self.stopwords = stopwords
+        self.memo_size = memo_size
+        # Raw segment -> cleaned term (None if nothing survives); oldest entries
+        # are evicted first once memo_size is reached
+        self._memo: Dict[str, Optional[str]] = {}
+
+    def cache_clear(self) -> None:
+        self._memo.clear()
+
+    def _remember(self, segment: str, cleaned: Optional[str]) -> None:
+        if len(self._memo) >= self.memo_size:
+            del self._memo[next(iter(self._memo))]
+        self._memo[segment] = cleaned
+
+    def clean(self, term: Any) -> Optional[str]:
+        """Cleaned, title-cased term, or None if nothing usable is left"""
+        if not isinstance(term, str):
+            if term is None or pd.isna(term):
+                return None
+            term = str(term)
+
+        try:
+            return self._memo[term]
+        except KeyError:
+            pass
+
+        cleaned = self._clean(term)
+        self._remember(term, cleaned)
+        return cleaned
+
+    def _clean(self, term: str) -> Optional[str]:
+        term = term.strip()
+        if not term:
+            return None
+
+        # 1. Remove all special markers
+        for pattern in MARKER_PATTERNS:
+            term = pattern.sub("", term)
+
+        # 2. Lowercase, split and filter words
+        stopwords = self.stopwords
+        words = [
+            word
+            for word in term.lower().split()
+            if MIN_WORD_LENGTH <= len(word) <= MAX_WORD_LENGTH
+            and word not in stopwords
+            and not word.isdigit()
+            and not INVALID_WORD.search(word)
+        ]
+        if not words:
+            return None
+
+        # 3. Title case
+        return " ".join(words).title()
+
+    def clean_series(self, segments: pd.Series) -> pd.Series:
+        """Clean a whole Series of raw segments, aligned with its index
+
+        Only the distinct values are cleaned, with vectorised `.str` operations;
+        the results also seed the memo used by `clean`.
+        """
+        values = segments.dropna().astype(str)
+        unique = pd.Series(values.unique(), dtype=object)
+        if unique.empty:
+            return pd.Series(None, index=segments.index, dtype=object)
+
+        text = unique.str.strip()
+        for pattern in MARKER_PATTERNS:
+            text = text.str.replace(pattern, "", regex=True)
+
+        # One row per word, labelled with the position of its unique value
+        words = text.str.lower().str.split().explode().dropna()
+        lengths = words.str.len()
+        keep = (
+            (lengths >= MIN_WORD_LENGTH)
+            & (lengths <= MAX_WORD_LENGTH)
+            & ~words.isin(list(self.stopwords))
+            & ~words.str.isdigit()
+            & ~words.str.contains(INVALID_WORD, regex=True)
+        )
+        joined = words[keep].groupby(level=0, sort=False).agg(" ".join).str.title()
+        cleaned = [
+            None if pd.isna(term) else term for term in joined.reindex(unique.index).tolist()
+        ]
+
+        mapping = dict(zip(unique.tolist(), cleaned))
+        for segment, term in mapping.items():
+            self._remember(segment, term)
+
+        # Map back positionally, so duplicate index labels are fine
+        result = np.full(len(segments), None, dtype=object)
+        result[segments.notna().to_numpy()] = [mapping[value] for value in values.tolist()]
+        return pd.Series(result, index=segments.index, dtype=object)
@@ -3,161 +3,40 @@
 
 import pandas as pd
 import re
-from collections import defaultdict, Counter
-import itertools
+from collections import Counter
 import os
+import sys
+from pathlib import Path
+
 import yake  # Requires: pip install yake
 
+# Shared helpers live in english_version/scripts
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from categorizer import TermCategorizer  # noqa: E402
+from cooccurrence import CooccurrenceCounter  # noqa: E402
+from ingest import DEFAULT_CACHE_DIR, iter_rows, read_pubmed_export, resolve_column  # noqa: E402
+from taxonomy import DISCOVERY_TAXONOMY, read_taxonomy  # noqa: E402
+
+# Abstract column names, in priority order (includes lowercase/plural variants)
+ABSTRACT_COLUMNS = ("Abstract", "Abstract Note", "Description", "Summary", "abstract", "Abstracts")
+
 
 class PubMedNLPNetwork:
-    def __init__(self):
-        # Strict medical stopwords
-        self.medical_stopwords = {
-            "study",
-            "studies",
-            "research",
-            "analysis",
-            "effect",
-            "effects",
-            "patient",
-            "patients",
-            "group",
-            "groups",
-            "method",
-            "methods",
-            "result",
-            "results",
-            "conclusion",
-            "conclusions",
-            "objective",
-            "background",
-            "aim",
-            "purpose",
-            "significance",
-            "review",
-            "article",
-            "paper",
-            "their",
-            "with",
-            "the",
-            "and",
-            "or",
-            "for",
-            "from",
-            "this",
-            "that",
-            "these",
-            "those",
-            "which",
-            "what",
-            "when",
-            "where",
-            "how",
-            "why",
-            "has",
-            "have",
-            "had",
-            "was",
-            "were",
-            "is",
-            "are",
-            "be",
-            "been",
-            "being",
-            "can",
-            "could",
-            "would",
-            "should",
-            "may",
-            "might",
-            "must",
-            "author",
-            "theory",
-            "model",
-            "system",
-            "process",
-            "approach",
-            "perspective",
-            "overview",
-            "summary",
-            "current",
-            "future",
-            "recent",
-            "new",
-            "novel",
-            "various",
-            "data",
-            "using",
-            "used",
-            "found",
-            "showed",
-            "suggest",
-            "associated",
-            "clinical",
-            "significant",
-            "significantly",
-            "compared",
-            "control",
-            "treatment",
-            "year",
-            "years",
-        }
-
-        # Categories (Same as V2)
-        self.refined_categories = {
-            "trigger_mechanisms": {
-                "description": "Trigger Mechanisms",
-                "keywords": [
-                    "trigeminal",
-                    "cortical spreading depression",
-                    "sensitization",
-                    "vascular",
-                    "hormonal",
-                    "estrogen",
-                    "stress",
-                    "inflammation",
-                ],
-            },
-            "true_comorbidities": {
-                "description": "True Comorbidities",
-                "keywords": [
-                    "depression",
-                    "anxiety",
-                    "epilepsy",
-                    "stroke",
-                    "fibromyalgia",
-                    "insomnia",
-                    "hypertension",
-                ],
-            },
-            "social_impact": {
-                "description": "Social Impact",
-                "keywords": [
-                    "quality of life",
-                    "disability",
-                    "productivity",
-                    "cost",
-                    "burden",
-                    "stigma",
-                ],
-            },
-            "interventions": {
-                "description": "Interventions",
-                "keywords": [
-                    "triptans",
-                    "cgrp",
-                    "erenumab",
-                    "botulinum",
-                    "acupuncture",
-                    "therapy",
-                    "medication",
-                ],
-            },
-        }
-
-    def load_pubmed_data(self, file_path):
+    # Input columns build_nlp_network reads; a tuple picks the first one present
+    INPUT_COLUMNS = ("Title", "Manual Tags", ABSTRACT_COLUMNS)
+
+    def __init__(self, taxonomy_path=None):
+        # Stopwords and categories (same categories as V2, fewer keywords) are kept
+        # in config/discovery_taxonomy.json
+        taxonomy = read_taxonomy(taxonomy_path or DISCOVERY_TAXONOMY)
+        self.medical_stopwords = taxonomy.stopwords
+        self.refined_categories = taxonomy.categories
+        self.categorizer = TermCategorizer((), taxonomy.categories)
+
+    def load_pubmed_data(self, file_path, cache_dir=None):
         try:
-            return pd.read_csv(file_path, engine="python", on_bad_lines="skip")
+            df, _ = read_pubmed_export(file_path, columns=self.INPUT_COLUMNS, cache_dir=cache_dir)
+            return df
         except Exception as e:
             print(f"Loading failed: {e}")
             return None
@@ -197,23 +76,14 @@ class PubMedNLPNetwork:
 
     def categorize_term(self, term):
         """Categorize a term based on keyword matching"""
-        term_lower = term.lower()
-        for cat, info in self.refined_categories.items():
-            for kw in info["keywords"]:
-                if kw in term_lower:
-                    return cat
-        return "unclassified"
+        return self.categorizer.categorize(term)
 
     def build_nlp_network(self, df):  # noqa: C901
         print("Building NLP network (V3)...")
         print(f"Available columns: {df.columns.tolist()}")
 
         # Identify Abstract column
-        abstract_col = None
-        for col in ["Abstract", "Abstract Note", "Description", "Summary", "abstract", "Abstracts"]:
-            if col in df.columns:
-                abstract_col = col
-                break
+        abstract_col = resolve_column(df.columns, ABSTRACT_COLUMNS)
 
         if not abstract_col:
             print("WARNING: No Abstract column found!")
@@ -223,22 +93,20 @@ class PubMedNLPNetwork:
         all_terms = []
         discovered_terms = Counter()
 
-        for idx, row in df.iterrows():
+        # Columns are resolved once; rows are plain tuples rather than Series
+        rows = iter_rows(df, [ABSTRACT_COLUMNS, "Title", "Manual Tags"])
+        for idx, (abstract, title, manual_tags) in zip(df.index, rows):
             if idx % 100 == 0:
                 print(f"Processing: {idx}/{len(df)}")
 
-            abstract = ""
-            if abstract_col:
-                abstract = row.get(abstract_col, "")
-
             # Fallback if abstract is missing or empty
             if pd.isna(abstract) or str(abstract).strip() == "":
                 # Construct text from Title and Manual Tags if available
                 parts = []
-                if "Title" in df.columns and not pd.isna(row.get("Title")):
-                    parts.append(str(row.get("Title")))
-                if "Manual Tags" in df.columns and not pd.isna(row.get("Manual Tags")):
-                    parts.append(str(row.get("Manual Tags")).replace(";", " "))
+                if not pd.isna(title):
+                    parts.append(str(title))
+                if not pd.isna(manual_tags):
+                    parts.append(str(manual_tags).replace(";", " "))
 
                 if parts:
                     abstract = " ".join(parts)
@@ -262,28 +130,20 @@ class PubMedNLPNetwork:
 
         # Build Nodes and Edges
         print("Constructing graph...")
-        node_freq = Counter()
-        edge_weights = defaultdict(int)
-
+        counts = CooccurrenceCounter()
+        term_to_cat = {}
         for terms in all_terms:
-            labels = [t["Label"] for t in terms]
-            node_freq.update(labels)
-
-            for t1, t2 in itertools.combinations(sorted(labels), 2):
-                edge_weights[(t1, t2)] += 1
+            counts.add(t["Label"] for t in terms)
+            # Re-map categories for final nodes
+            for t in terms:
+                term_to_cat[t["Label"]] = t["Category"]
 
         # Filter
         min_freq = 5
         final_nodes = []
         seen_nodes = set()
 
-        # Re-map categories for final nodes
-        term_to_cat = {}
-        for terms in all_terms:
-            for t in terms:
-                term_to_cat[t["Label"]] = t["Category"]
-
-        for term, freq in node_freq.items():
+        for term, freq in counts.node_frequency.items():
             if freq >= min_freq:
                 final_nodes.append(
                     {
@@ -295,17 +155,16 @@ class PubMedNLPNetwork:
                 )
                 seen_nodes.add(term)
 
-        final_edges = []
-        for (t1, t2), w in edge_weights.items():
-            if t1 in seen_nodes and t2 in seen_nodes and w >= 2:
-                final_edges.append(
-                    {
-                        "Source": re.sub(r"[^\w]", "_", t1.lower()),
-                        "Target": re.sub(r"[^\w]", "_", t2.lower()),
-                        "Weight": w,
-                        "Type": "Undirected",
-                    }
-                )
+        # Pair counts come from the same sparse co-occurrence engine as main.py
+        final_edges = [
+            {
+                "Source": re.sub(r"[^\w]", "_", t1.lower()),
+                "Target": re.sub(r"[^\w]", "_", t2.lower()),
+                "Weight": w,
+                "Type": "Undirected",
+            }
+            for t1, t2, w in zip(*counts.edges(min_weight=2, terms=seen_nodes))
+        ]
 
         return pd.DataFrame(final_nodes), pd.DataFrame(final_edges), discovered_terms
 
@@ -325,7 +184,8 @@ def main():
         print(f"Input file not found at: {file_path}")
         return
 
-    df = converter.load_pubmed_data(file_path)
+    # Parsed-input snapshots are shared with main.py (data/cache/)
+    df = converter.load_pubmed_data(file_path, cache_dir=DEFAULT_CACHE_DIR)
     nodes, edges, discovered = converter.build_nlp_network(df)
 
     output_dir = "../../data/discovery"
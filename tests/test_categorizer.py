@@ -0,0 +1,152 @@
+"""
+Tests for the keyword automaton and term categorizer (categorizer.py)
+
+Usage:
+    pytest tests/test_categorizer.py -v
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "english_version" / "scripts"))
+
+from categorizer import (  # noqa: E402
+    HAS_AHOCORASICK,
+    AbstractScanner,
+    KeywordAutomaton,
+    TermCategorizer,
+)
+from main import PubMedRefinedNetworkV2  # noqa: E402
+
+BACKENDS = ["python"] + (["ahocorasick"] if HAS_AHOCORASICK else [])
+
+
+def _reference(builder, term):
+    """The original scan-every-keyword precise_categorization"""
+    term_lower = term.lower()
+    if any(research_term in term_lower for research_term in builder.research_methods):
+        return "research_methods"
+    for category, info in builder.refined_categories.items():
+        if any(keyword in term_lower for keyword in info["keywords"]):
+            return category
+    for category, words in builder.inference_words:
+        if any(word in term_lower for word in words):
+            return category
+    return "unclassified"
+
+
+@pytest.fixture(scope="module")
+def builder():
+    return PubMedRefinedNetworkV2()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+class TestKeywordAutomaton:
+    """Lowest-rank match over overlapping patterns"""
+
+    def test_overlapping_patterns(self, backend):
+        automaton = KeywordAutomaton(
+            [("he", 3), ("she", 2), ("his", 1), ("hers", 4)], backend=backend
+        )
+        assert automaton.best_rank("ushers") == 2
+        assert automaton.best_rank("ahishers") == 1
+        assert automaton.best_rank("hers") == 3
+        assert automaton.best_rank("xyz") is None
+        assert automaton.best_rank("") is None
+
+    def test_duplicate_pattern_keeps_best_rank(self, backend):
+        automaton = KeywordAutomaton([("stress", 5), ("stress", 1)], backend=backend)
+        assert automaton.best_rank("chronic stress") == 1
+
+    def test_no_patterns(self, backend):
+        assert KeywordAutomaton([], backend=backend).best_rank("anything") is None
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+class TestTermCategorizer:
+    """Same categories as the original priority scan"""
+
+    def test_matches_reference(self, builder, backend):
+        categorizer = TermCategorizer(
+            builder.research_methods,
+            builder.refined_categories,
+            builder.inference_words,
+            backend=backend,
+        )
+        vocabulary = list(builder.research_methods) + [
+            word for _, words in builder.inference_words for word in words
+        ]
+        for info in builder.refined_categories.values():
+            vocabulary += info["keywords"]
+
+        rng = random.Random(0)
+        terms = vocabulary + ["Random Unknown Term", "xyz123", ""]
+        for _ in range(2000):
+            words = rng.sample(vocabulary, rng.randint(1, 3)) + ["filler"] * rng.randint(0, 1)
+            rng.shuffle(words)
+            terms.append(" ".join(words).title())
+
+        for term in terms:
+            assert categorizer.categorize(term) == _reference(builder, term), term
+
+    def test_memo(self, builder, backend):
+        categorizer = TermCategorizer(
+            builder.research_methods, builder.refined_categories, memo_size=2, backend=backend
+        )
+        assert categorizer.categorize("Cohort Study Of Stress") == "research_methods"
+        categorizer.categorize("Stress")
+        categorizer.categorize("Anxiety")
+        assert list(categorizer._memo) == ["Stress", "Anxiety"]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+class TestAbstractScanner:
+    """Cleaned keyword hits in declaration order"""
+
+    def test_matches_keyword_loop(self, builder, backend):
+        scanner = AbstractScanner(
+            builder.refined_categories, builder.term_cleaner.clean, backend=backend
+        )
+        keywords = [k for info in builder.refined_categories.values() for k in info["keywords"]]
+
+        rng = random.Random(1)
+        filler = "patients with migraine were followed for twelve months".split()
+        for _ in range(300):
+            words = rng.sample(keywords, rng.randint(0, 4)) + rng.sample(filler, 4)
+            rng.shuffle(words)
+            abstract = " ".join(words).capitalize() + "."
+
+            expected = {}
+            for keyword in keywords:
+                if keyword in abstract.lower():
+                    cleaned = builder.strict_term_cleaning(keyword)
+                    if cleaned:
+                        expected[cleaned] = None
+            assert scanner.scan(abstract) == list(expected), abstract
+
+    def test_overlapping_keywords(self, builder, backend):
+        scanner = AbstractScanner(
+            {"a": {"keywords": ["sleep disorders", "sleep"]}, "b": {"keywords": ["stress"]}},
+            builder.term_cleaner.clean,
+            backend=backend,
+        )
+        assert scanner.scan("Stress and SLEEP DISORDERS") == ["Sleep Disorders", "Sleep", "Stress"]
+        assert scanner.scan("nothing here") == []
+
+    def test_keywords_inside_and_across_matches(self, backend):
+        keywords = ["visual aura", "aura", "aura symptoms", "symptoms", "ms", "c++"]
+        scanner = AbstractScanner({"a": {"keywords": keywords}}, str.upper, backend=backend)
+        assert scanner.scan("Visual aura symptoms") == [
+            "VISUAL AURA",
+            "AURA",
+            "AURA SYMPTOMS",
+            "SYMPTOMS",
+            "MS",
+        ]
+        assert scanner.scan("auras in c++") == ["AURA", "C++"]
+        assert AbstractScanner({}, str.upper, backend=backend).scan("aura") == []
@@ -0,0 +1,191 @@
+"""
+Tests for the sparse co-occurrence engine (cooccurrence.py)
+
+Usage:
+    pytest tests/test_cooccurrence.py -v
+"""
+
+import itertools
+import random
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "english_version" / "scripts"))
+
+import numpy as np  # noqa: E402
+
+from cooccurrence import HAS_SCIPY, CooccurrenceCounter, merge_runs, pair_counts  # noqa: E402
+
+BACKENDS = ["numpy"] + (["scipy"] if HAS_SCIPY else [])
+VOCABULARY = ["Migraine", "Aura", "Erenumab", "Cgrp", "Sleep", "Stress", "Triptan", "Vertigo"]
+
+
+def _articles(n, seed=7):
+    rng = random.Random(seed)
+    return [rng.sample(VOCABULARY, rng.randint(0, 6)) for _ in range(n)]
+
+
+def _reference(articles):
+    """Pair counts the way they were counted before the engine existed"""
+    weights = defaultdict(int)
+    for terms in articles:
+        for pair in itertools.combinations(sorted(terms), 2):
+            weights[pair] += 1
+    return dict(weights)
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    return request.param
+
+
+class TestPairCounts:
+    """Tests for the Xᵀ·X upper triangle"""
+
+    def test_matches_combinations(self, backend):
+        """Test that counts equal the per-article combinations loop"""
+        articles = _articles(300)
+        counter = CooccurrenceCounter(backend=backend)
+        for terms in articles:
+            counter.add(terms)
+
+        assert counter.edge_weights == _reference(articles)
+
+    def test_row_weights(self, backend):
+        """Test that weighted rows scale their pairs and zero totals are dropped"""
+        keys, counts = pair_counts([0, 1, 2, 0, 1], [0, 3, 5], 3, [2, -2], backend=backend)
+
+        assert keys.tolist() == [(0 << 32) | 2, (1 << 32) | 2]
+        assert counts.tolist() == [2, 2]
+
+    def test_empty(self, backend):
+        """Test that no rows give no pairs"""
+        keys, counts = pair_counts([], [0], 0, backend=backend)
+
+        assert len(keys) == 0 and len(counts) == 0
+
+
+class TestCooccurrenceCounter:
+    """Tests for the buffered counter"""
+
+    def test_batches_fold_the_same(self, backend, monkeypatch):
+        """Test that folding in small batches gives the same counts"""
+        monkeypatch.setattr(CooccurrenceCounter, "BATCH_SIZE", 7)
+        articles = _articles(100)
+        counter = CooccurrenceCounter(backend=backend)
+        for terms in articles:
+            counter.add(terms)
+
+        assert counter.edge_weights == _reference(articles)
+
+    def test_subtract(self, backend):
+        """Test that subtracting articles leaves the counts of the rest"""
+        articles = _articles(60)
+        counter = CooccurrenceCounter(backend=backend)
+        for terms in articles:
+            counter.add(terms)
+        for terms in articles[::2]:
+            counter.subtract(terms)
+
+        assert counter.edge_weights == _reference(articles[1::2])
+        assert counter.articles == 30
+
+    def test_edges_threshold_and_terms(self, backend):
+        """Test min_weight and endpoint filtering, with pairs ordered alphabetically"""
+        articles = _articles(200)
+        counter = CooccurrenceCounter(backend=backend)
+        for terms in articles:
+            counter.add(terms)
+        keep = {"Aura", "Migraine", "Stress", "Vertigo"}
+
+        sources, targets, weights = counter.edges(min_weight=20, terms=keep)
+
+        expected = sorted(
+            (t1, t2, w)
+            for (t1, t2), w in _reference(articles).items()
+            if w >= 20 and t1 in keep and t2 in keep
+        )
+        assert list(zip(sources, targets, weights)) == expected
+
+    def test_add_counts(self):
+        """Test that raw counts (as saved in a state) merge with counted ones"""
+        counter = CooccurrenceCounter()
+        counter.add(["Aura", "Migraine"])
+        ids = counter.add_counts(["Migraine", "Aura", "Sleep"], [2, 1, 1], [[0, 1, 2], [1, 2, 1]])
+
+        assert ids == [1, 0, 2]
+        assert counter.node_frequency == {"Aura": 2, "Migraine": 3, "Sleep": 1}
+        assert counter.edge_weights == {("Aura", "Migraine"): 3, ("Aura", "Sleep"): 1}
+
+    def test_counts_on_ids(self):
+        """Test that subtracting every article leaves no terms or pairs"""
+        counter = CooccurrenceCounter()
+        ids = counter.intern(["Aura", "Migraine", "Aura"])
+        counter.add_ids(ids)
+        counter.add_ids(ids, -1)
+
+        assert ids == [0, 1, 0]
+        assert counter.frequencies().tolist() == [0, 0]
+        assert counter.node_frequency == {} and counter.edge_weights == {}
+
+
+class TestSpilling:
+    """Tests for pair counts spilled to disk past the memory budget"""
+
+    def test_merge_runs(self):
+        """Test that overlapping sorted runs merge into summed, sorted blocks"""
+        runs = [
+            (np.array([1, 4, 6, 9], dtype=np.int64), np.array([1, 1, 1, 1], dtype=np.int64)),
+            (np.array([2, 4, 9], dtype=np.int64), np.array([5, 2, 3], dtype=np.int64)),
+            (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)),
+        ]
+        blocks = list(merge_runs(runs, block_size=2))
+
+        assert np.concatenate([keys for keys, _ in blocks]).tolist() == [1, 2, 4, 6, 9]
+        assert np.concatenate([counts for _, counts in blocks]).tolist() == [1, 5, 3, 1, 4]
+
+    def test_spilled_counts_match(self, backend, monkeypatch):
+        """Test that a tiny budget spills runs without changing the counts"""
+        monkeypatch.setattr(CooccurrenceCounter, "BATCH_SIZE", 5)
+        articles = _articles(200)
+        counter = CooccurrenceCounter(backend=backend, memory_budget=64)
+        for terms in articles:
+            counter.add(terms)
+
+        assert counter.edge_weights == _reference(articles)
+        assert counter.spilled_runs > 1
+
+    def test_min_weight_across_runs(self, monkeypatch):
+        """Test that the threshold applies to totals, not to counts per run"""
+        monkeypatch.setattr(CooccurrenceCounter, "BATCH_SIZE", 5)
+        articles = _articles(200)
+        counter = CooccurrenceCounter(memory_budget=64)
+        for terms in articles:
+            counter.add(terms)
+
+        blocks = list(counter.iter_pairs(min_weight=30, block_size=3))
+        expected = {pair for pair, w in _reference(articles).items() if w >= 30}
+        labels = {
+            tuple(sorted((counter.terms[i], counter.terms[j])))
+            for first, second, _ in blocks
+            for i, j in zip(first.tolist(), second.tolist())
+        }
+        assert expected and labels == expected
+
+    def test_subtract_after_spill(self, monkeypatch):
+        """Test that removals cancel counts that were already written to disk"""
+        monkeypatch.setattr(CooccurrenceCounter, "BATCH_SIZE", 5)
+        articles = _articles(60)
+        counter = CooccurrenceCounter(memory_budget=64)
+        for terms in articles:
+            counter.add(terms)
+        for terms in articles[10:]:
+            counter.subtract(terms)
+
+        assert counter.spilled_runs > 0
+        assert counter.edge_weights == _reference(articles[:10])
@@ -0,0 +1,206 @@
+"""
+Tests for the network output stage (exporters.py)
+
+Usage:
+    pytest tests/test_exporters.py -v
+"""
+
+import os
+import sqlite3
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "english_version" / "scripts"))
+
+from exporters import check_formats, write_gexf, write_graphml, write_network  # noqa: E402
+from matrices import DocumentTermPostings  # noqa: E402
+from network_db import neighbours  # noqa: E402
+
+
+@pytest.fixture
+def network():
+    nodes_df = pd.DataFrame(
+        {
+            "Id": ["stress", "anxiety", "erenumab"],
+            "Label": ["Stress", "Anxiety", "Erenumab"],
+            "Category": ["trigger_mechanisms", "true_comorbidities", "interventions"],
+            "Frequency": [5, 4, 3],
+            "Category_Description": ["Trigger Mechanisms", "True Comorbidities", "Interventions"],
+        }
+    )
+    edges_df = pd.DataFrame(
+        {
+            "Source": ["anxiety", "anxiety"],
+            "Target": ["stress", "erenumab"],
+            "Weight": [4, 2],
+            "Type": ["Undirected", "Undirected"],
+            "Source_Label": ["Anxiety", "Anxiety"],
+            "Target_Label": ["Stress", "Erenumab"],
+        }
+    )
+    return nodes_df, edges_df
+
+
+class TestWriteNetwork:
+    """Detailed tables per format and optional Gephi projections"""
+
+    def test_default_writes_classic_csv_files(self, network, tmp_path):
+        nodes_df, edges_df = network
+        written = write_network(nodes_df, edges_df, str(tmp_path))
+
+        assert [os.path.basename(p) for p in written] == [
+            "gephi_nodes.csv",
+            "gephi_edges.csv",
+            "detailed_nodes.csv",
+            "detailed_edges.csv",
+        ]
+        gephi_edges = pd.read_csv(tmp_path / "gephi_edges.csv", encoding="utf-8-sig")
+        assert list(gephi_edges.columns) == ["Source", "Target", "Weight", "Type"]
+        pd.testing.assert_frame_equal(
+            pd.read_csv(tmp_path / "detailed_nodes.csv", encoding="utf-8-sig"), nodes_df
+        )
+
+    def test_gzip_csv_without_gephi(self, network, tmp_path):
+        nodes_df, edges_df = network
+        written = write_network(nodes_df, edges_df, str(tmp_path), formats=["csv.gz"], gephi=False)
+
+        assert sorted(os.listdir(tmp_path)) == ["detailed_edges.csv.gz", "detailed_nodes.csv.gz"]
+        pd.testing.assert_frame_equal(pd.read_csv(written[1]), edges_df)
+
+    @pytest.mark.parametrize("fmt", ["parquet", "feather"])
+    def test_columnar_round_trip(self, network, tmp_path, fmt):
+        pytest.importorskip("pyarrow")
+        nodes_df, edges_df = network
+        write_network(nodes_df, edges_df, str(tmp_path), formats=[fmt], gephi=False)
+
+        reader = pd.read_parquet if fmt == "parquet" else pd.read_feather
+        pd.testing.assert_frame_equal(
+            reader(tmp_path / f"detailed_edges.{fmt}"), edges_df, check_dtype=False
+        )
+
+    def test_empty_edges(self, network, tmp_path):
+        nodes_df, _ = network
+        write_network(nodes_df, pd.DataFrame(), str(tmp_path))
+        gephi_edges = pd.read_csv(tmp_path / "gephi_edges.csv", encoding="utf-8-sig")
+        assert list(gephi_edges.columns) == ["Source", "Target", "Weight", "Type"]
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            check_formats(["xlsx"])
+
+
+class TestGraphFormats:
+    """Streaming GEXF/GraphML writers"""
+
+    def test_gexf(self, network, tmp_path):
+        nodes_df, edges_df = network
+        path = write_gexf(nodes_df, edges_df, str(tmp_path / "network.gexf"))
+
+        ns = {"g": "http://gexf.net/1.3", "viz": "http://gexf.net/1.3/viz"}
+        graph = ET.parse(path).getroot().find("g:graph", ns)
+        assert graph.get("defaultedgetype") == "undirected"
+        types = {
+            a.get("title"): a.get("type") for a in graph.iterfind("g:attributes/g:attribute", ns)
+        }
+        assert types == {
+            "Category": "string",
+            "Frequency": "integer",
+            "Category_Description": "string",
+        }
+
+        node = graph.find("g:nodes/g:node[@id='stress']", ns)
+        assert node.get("label") == "Stress"
+        values = {v.get("for"): v.get("value") for v in node.iterfind("g:attvalues/g:attvalue", ns)}
+        assert values["frequency"] == "5"
+        assert values["category"] == "trigger_mechanisms"
+        assert node.find("viz:color", ns).attrib == {"r": "255", "g": "193", "b": "7"}
+
+        edges = graph.findall("g:edges/g:edge", ns)
+        assert [(e.get("source"), e.get("target"), e.get("weight")) for e in edges] == [
+            ("anxiety", "stress", "4"),
+            ("anxiety", "erenumab", "2"),
+        ]
+
+    def test_graphml(self, network, tmp_path):
+        nodes_df, edges_df = network
+        path = write_graphml(nodes_df, edges_df, str(tmp_path / "network.graphml"))
+
+        ns = {"g": "http://graphml.graphdrawing.org/xmlns"}
+        root = ET.parse(path).getroot()
+        keys = {k.get("attr.name"): k.get("attr.type") for k in root.iterfind("g:key", ns)}
+        assert keys["Frequency"] == "int"
+        assert keys["Weight"] == "double"
+
+        node = root.find("g:graph/g:node[@id='erenumab']", ns)
+        data = {d.get("key"): d.text for d in node.iterfind("g:data", ns)}
+        assert data == {
+            "label": "Erenumab",
+            "category": "interventions",
+            "frequency": "3",
+            "category_description": "Interventions",
+        }
+        assert len(root.findall("g:graph/g:edge", ns)) == 2
+
+    def test_escaping_and_write_network(self, network, tmp_path):
+        nodes_df, edges_df = network
+        nodes_df.loc[0, "Label"] = 'Stress & "strain" <acute>'
+        written = write_network(
+            nodes_df, edges_df, str(tmp_path), formats=["gexf", "graphml"], gephi=False
+        )
+
+        assert [os.path.basename(p) for p in written] == ["network.gexf", "network.graphml"]
+        ns = {"g": "http://gexf.net/1.3"}
+        node = ET.parse(written[0]).getroot().find("g:graph/g:nodes/g:node", ns)
+        assert node.get("label") == 'Stress & "strain" <acute>'
+
+
+class TestSqliteStore:
+    """Indexed SQLite backend"""
+
+    def test_write_and_query(self, network, tmp_path):
+        nodes_df, edges_df = network
+        postings = DocumentTermPostings()
+        postings.add(["Stress", "Anxiety"], "pmid:1", 2023)
+        postings.add(["Anxiety", "Erenumab", "Vascular"], "pmid:2", None)
+
+        written = write_network(
+            nodes_df, edges_df, str(tmp_path), formats=["sqlite"], gephi=False, postings=postings
+        )
+        assert [os.path.basename(p) for p in written] == ["network.sqlite"]
+
+        assert neighbours(written[0], "anxiety") == [
+            ("Stress", "trigger_mechanisms", 4),
+            ("Erenumab", "interventions", 2),
+        ]
+        assert neighbours(written[0], "Erenumab", min_weight=2) == [
+            ("Anxiety", "true_comorbidities", 2)
+        ]
+        assert neighbours(written[0], "Anxiety", min_weight=5) == []
+
+        conn = sqlite3.connect(written[0])
+        try:
+            # Terms outside the network (Vascular) are not posted
+            posted = conn.execute(
+                "SELECT a.article_id, a.year, n.label FROM postings AS p "
+                "JOIN articles AS a USING (article) JOIN nodes AS n USING (node) "
+                "ORDER BY a.article, n.label"
+            ).fetchall()
+            indexes = {
+                row[0]
+                for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+            }
+        finally:
+            conn.close()
+        assert posted == [
+            ("pmid:1", 2023, "Anxiety"),
+            ("pmid:1", 2023, "Stress"),
+            ("pmid:2", None, "Anxiety"),
+            ("pmid:2", None, "Erenumab"),
+        ]
+        assert {"edges_source", "edges_target", "nodes_label", "postings_node"} <= indexes
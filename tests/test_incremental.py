@@ -0,0 +1,196 @@
+"""
+Tests for incremental network updates (incremental.py)
+
+Usage:
+    pytest tests/test_incremental.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "english_version" / "scripts"))
+
+from incremental import (  # noqa: E402
+    NetworkState,
+    frame_article_keys,
+    normalize_article_id,
+)
+from main import PubMedRefinedNetworkV2  # noqa: E402
+
+
+def _sorted(nodes_df, edges_df):
+    """Order-independent form of a network for comparisons"""
+    return (
+        nodes_df.sort_values("Id").reset_index(drop=True),
+        edges_df.sort_values(["Source", "Target"]).reset_index(drop=True),
+    )
+
+
+@pytest.fixture
+def builder():
+    return PubMedRefinedNetworkV2()
+
+
+@pytest.fixture
+def corpus():
+    return pd.DataFrame(
+        {
+            "PMID": ["1", "2", "3", "4"],
+            "Title": [
+                "Depression and anxiety in migraine",
+                "Stress as a migraine trigger",
+                "CGRP antibodies and quality of life",
+                "Anxiety, stress and depression in chronic migraine",
+            ],
+            "Manual Tags": [
+                "Depression; Anxiety; Stress",
+                "Stress; Anxiety; Vascular",
+                "CGRP; Erenumab; Depression",
+                "Anxiety; Stress; Depression; Vascular",
+            ],
+            "Abstract Note": [None, "Hormonal changes.", None, None],
+            "Keywords": [None, None, "disability", None],
+        }
+    )
+
+
+class TestNetworkState:
+    """Raw counts persisted between runs"""
+
+    def test_single_update_matches_full_build(self, builder, corpus):
+        expected = _sorted(*builder.build_refined_network(corpus, min_frequency=1, min_weight=1))
+        state = NetworkState()
+        actual = _sorted(
+            *builder.update_refined_network(state, corpus, min_frequency=1, min_weight=1)
+        )
+
+        for exp, act in zip(expected, actual):
+            pd.testing.assert_frame_equal(exp, act)
+
+    def test_two_runs_with_saved_state(self, builder, corpus, tmp_path):
+        path = str(tmp_path / "state" / "network_state.json.gz")
+        first = NetworkState()
+        builder.update_refined_network(first, corpus.iloc[:2], min_frequency=1, min_weight=1)
+        first.save(path)
+
+        # The second export overlaps the first one
+        second = NetworkState.load(path)
+        actual = _sorted(
+            *builder.update_refined_network(second, corpus.iloc[1:], min_frequency=2, min_weight=2)
+        )
+        expected = _sorted(*builder.build_refined_network(corpus, min_frequency=2, min_weight=2))
+
+        assert len(second.articles) == 4
+        for exp, act in zip(expected, actual):
+            pd.testing.assert_frame_equal(exp, act)
+
+    def test_seen_articles_are_not_reextracted(self, builder, corpus, monkeypatch):
+        state = NetworkState()
+        builder.update_refined_network(state, corpus, min_frequency=1, min_weight=1)
+
+        calls = []
+        original = builder.extract_corpus_terms
+        monkeypatch.setattr(
+            builder,
+            "extract_corpus_terms",
+            lambda df: calls.append(len(df)) or original(df),
+        )
+        builder.update_refined_network(state, corpus, min_frequency=1, min_weight=1)
+        assert calls == []
+
+        # Only the unseen article is extracted; a repeat within the export is skipped
+        extra = corpus.iloc[[0, 0]].assign(PMID="5", Title="A new article on stress")
+        builder.update_refined_network(state, extra, min_frequency=1, min_weight=1)
+        assert calls == [1]
+        assert state.article_terms("pmid:5") == state.article_terms("pmid:1")
+
+    def test_retraction_subtracts_contribution(self, builder, corpus, tmp_path):
+        state = NetworkState()
+        builder.update_refined_network(state, corpus, min_frequency=1, min_weight=1)
+        state.save(str(tmp_path / "state.json.gz"))
+        state = NetworkState.load(str(tmp_path / "state.json.gz"))
+
+        actual = _sorted(
+            *builder.update_refined_network(
+                state, corpus.iloc[:0], min_frequency=1, min_weight=1, retracted=["3"]
+            )
+        )
+        expected = _sorted(
+            *builder.build_refined_network(corpus.drop(index=2), min_frequency=1, min_weight=1)
+        )
+        for exp, act in zip(expected, actual):
+            pd.testing.assert_frame_equal(exp, act)
+
+        # A retracted article is not re-added by a later export
+        builder.update_refined_network(state, corpus, min_frequency=1, min_weight=1)
+        assert "pmid:3" not in state.articles
+        assert "Erenumab" not in state.counts.node_frequency
+
+    def test_retraction_with_float_pmids(self, builder, corpus):
+        """Test that PMIDs read as floats (a blank cell, no pyarrow) can be retracted"""
+        corpus["PMID"] = [1.0, None, 3.0, 4.0]
+        state = NetworkState()
+        builder.update_refined_network(state, corpus, min_frequency=1, min_weight=1)
+        assert "pmid:3" in state.articles
+
+        builder.update_refined_network(
+            state, corpus.iloc[:0], min_frequency=1, min_weight=1, retracted=["3"]
+        )
+        assert "pmid:3" not in state.articles
+        assert "Erenumab" not in state.counts.node_frequency
+
+    def test_terms_stored_as_ids(self, builder, corpus, tmp_path):
+        state = NetworkState()
+        builder.update_refined_network(state, corpus, min_frequency=1, min_weight=1)
+        terms = {article_id: state.article_terms(article_id) for article_id in state.articles}
+
+        # One flat int32 buffer indexed by offsets, shared vocabulary with the counts
+        assert state.term_ids.typecode == "i"
+        assert len(state.term_ids) == sum(len(t) for t in terms.values())
+        assert all(term in state.counts.vocabulary for t in terms.values() for term in t)
+
+        state.save(str(tmp_path / "state.json.gz"))
+        loaded = NetworkState.load(str(tmp_path / "state.json.gz"))
+        assert dict(loaded.iter_articles()) == terms
+
+
+class TestArticleIds:
+    """Identifiers used to recognise articles across runs"""
+
+    def test_article_keys(self):
+        row = pd.DataFrame(
+            {"PMID": ["12"], "DOI": ["10.1/X"], "Title": [None], "Manual Tags": ["Stress"]}
+        )
+        assert frame_article_keys(row) == [["pmid:12", "doi:10.1/x"]]
+
+    def test_article_keys_content_fallback(self):
+        (keys,) = frame_article_keys(pd.DataFrame({"Manual Tags": ["Stress"], "Keywords": [None]}))
+        assert len(keys) == 1 and keys[0].startswith("content:")
+        # Columns are read in sorted order, so their order in the file does not matter
+        reordered = pd.DataFrame({"Keywords": [None], "Manual Tags": ["Stress"]})
+        assert frame_article_keys(reordered) == [keys]
+
+    def test_normalize_article_id(self):
+        assert normalize_article_id("123") == "pmid:123"
+        assert normalize_article_id("PMID: 123") == "pmid:123"
+        assert normalize_article_id("https://doi.org/10.1/ABC") == "doi:10.1/abc"
+        assert normalize_article_id("doi:10.1/abc") == "doi:10.1/abc"
+
+    def test_frame_article_keys(self):
+        df = pd.DataFrame(
+            {
+                "PMID": ["12", None, None],
+                "DOI": [None, "10.1/X", None],
+                "Manual Tags": ["Stress", "Aura", "Sleep"],
+                "Keywords": [None, None, "insomnia"],
+            }
+        )
+        keys = frame_article_keys(df)
+        assert keys[:2] == [["pmid:12"], ["doi:10.1/x"]]
+        assert keys[2] == frame_article_keys(df.iloc[2:])[0]
+        assert keys[2][0].startswith("content:")
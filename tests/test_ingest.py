@@ -0,0 +1,438 @@
+"""
+Tests for the input ingestion helpers (ingest.py)
+
+Usage:
+    pytest tests/test_ingest.py -v
+"""
+
+import bz2
+import gzip
+import lzma
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "english_version" / "scripts"))
+
+import ingest  # noqa: E402
+from ingest import (  # noqa: E402
+    ABSTRACT_COLUMNS,
+    SNIFF_BYTES,
+    RecordDeduplicator,
+    SnapshotCache,
+    detect_compression,
+    detect_encoding,
+    expand_inputs,
+    iter_rows,
+    project_columns,
+    read_pubmed_export,
+    read_pubmed_inputs,
+    record_keys,
+    resolve_column,
+    sniff_csv_dialect,
+    vote_separator,
+)
+from main import PubMedRefinedNetworkV2  # noqa: E402
+
+FIXTURE_CSV = project_root / "tests" / "fixtures" / "sample_pubmed.csv"
+
+
+def _write_frame(path, sep=",", encoding="utf-8"):
+    """Write a small Zotero-like export with the given dialect"""
+    pd.DataFrame(
+        {
+            "Key": ["A1", "A2"],
+            "Title": ["Migräne and stress", "Café au lait; a study"],
+            "Manual Tags": ["Migraine; Stress", "Depression; Anxiety"],
+            "Abstract Note": ["Stress, anxiety and depression.", "Vascular mechanisms."],
+            "Keywords": ["stress", "anxiety"],
+        }
+    ).to_csv(path, sep=sep, index=False, encoding=encoding)
+    return path
+
+
+class TestDialectSniffing:
+    """Detection of encoding and separator from the file head"""
+
+    def test_detect_encoding_bom(self):
+        assert detect_encoding(b"\xef\xbb\xbfKey,Title") == "utf-8-sig"
+        assert detect_encoding(b"\xff\xfeK\x00") == "utf-16"
+
+    def test_detect_encoding_fallback(self):
+        assert detect_encoding("Migräne".encode("utf-8")) == "utf-8"
+        assert detect_encoding("Migräne".encode("latin-1")) == "latin-1"
+
+    def test_detect_encoding_split_multibyte(self):
+        """A character cut at the sample boundary is not a decode error"""
+        assert detect_encoding("Migräne".encode("utf-8")[:5]) == "utf-8"
+
+    def test_vote_separator_semicolon_with_commas_in_fields(self):
+        text = 'a;b;c;d\n"x, y";2;3;4\n"z, w";5;6;7\n'
+        sep, columns, consistency = vote_separator(text, truncated=False)
+        assert sep == ";"
+        assert columns == ["a", "b", "c", "d"]
+        assert consistency == 1.0
+
+    def test_vote_separator_ignores_truncated_record(self):
+        text = "a\tb\tc\td\n1\t2\t3\t4\n5\t6"
+        sep, _, consistency = vote_separator(text, truncated=True)
+        assert sep == "\t"
+        assert consistency == 1.0
+
+    def test_sniff_fixture(self):
+        dialect = sniff_csv_dialect(str(FIXTURE_CSV))
+        assert dialect.sep == ","
+        assert dialect.encoding == "utf-8"
+        assert "Manual Tags" in dialect.columns
+        assert dialect.detection_seconds >= 0
+
+    def test_sniff_reads_only_sample(self, tmp_path):
+        path = _write_frame(tmp_path / "export.csv", sep="\t")
+        dialect = sniff_csv_dialect(str(path), sample_size=40)
+        assert dialect.sep == "\t"
+        assert dialect.columns[:2] == ["Key", "Title"]
+
+
+class TestColumnProjection:
+    """Reading only the columns the network builder needs"""
+
+    def test_project_columns_alternatives(self):
+        header = ["Key", "Title", "Abstract Note", "Summary", "Manual Tags", "Url"]
+        wanted = ["Manual Tags", "Keywords", ABSTRACT_COLUMNS]
+        assert project_columns(header, wanted) == ["Abstract Note", "Manual Tags"]
+
+    def test_read_projects_fixture(self):
+        df, dialect = read_pubmed_export(str(FIXTURE_CSV), columns=["Title", ABSTRACT_COLUMNS])
+        assert list(df.columns) == ["Title", "Abstract Note"]
+        assert len(dialect.columns) > len(df.columns)
+
+    def test_read_unmatched_columns_reads_all(self, tmp_path):
+        path = _write_frame(tmp_path / "export.csv")
+        df, _ = read_pubmed_export(str(path), columns=["Not A Column"])
+        assert "Manual Tags" in df.columns
+
+    def test_resolve_column(self):
+        columns = ["Title", "Summary", "Abstract Note"]
+        assert resolve_column(columns, ABSTRACT_COLUMNS) == "Abstract Note"
+        assert resolve_column(columns, "Title") == "Title"
+        assert resolve_column(columns, "Keywords") is None
+
+    def test_iter_rows_matches_iterrows(self):
+        df = pd.DataFrame(
+            {"Title": ["A", None, "C"], "Summary": ["x", "y", None], "Year": [2020, 2021, 2022]},
+            index=[10, 11, 12],
+        )
+        rows = list(iter_rows(df, ["Year", ABSTRACT_COLUMNS, "Missing", "Title"]))
+        expected = [(row["Year"], row["Summary"], None, row["Title"]) for _, row in df.iterrows()]
+        assert rows == expected
+        assert list(iter_rows(df.iloc[:0], ["Title"])) == []
+
+    def test_default_load_drops_unused_columns(self):
+        df = PubMedRefinedNetworkV2().load_pubmed_data(str(FIXTURE_CSV))
+        assert set(df.columns) == {"Manual Tags", "Abstract Note"}
+
+
+class TestSnapshotCache:
+    """Feather snapshots reused for unchanged inputs"""
+
+    @pytest.fixture(autouse=True)
+    def _requires_pyarrow(self):
+        pytest.importorskip("pyarrow")
+
+    def test_second_read_hits_snapshot(self, tmp_path):
+        path = _write_frame(tmp_path / "export.csv")
+        cache_dir = str(tmp_path / "cache")
+        columns = ["Manual Tags", ABSTRACT_COLUMNS]
+
+        first, dialect = read_pubmed_export(str(path), columns=columns, cache_dir=cache_dir)
+        second, cached = read_pubmed_export(str(path), columns=columns, cache_dir=cache_dir)
+
+        assert not dialect.from_cache
+        assert cached.from_cache
+        assert cached.sep == dialect.sep
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_changed_file_misses(self, tmp_path):
+        path = _write_frame(tmp_path / "export.csv")
+        cache_dir = str(tmp_path / "cache")
+        read_pubmed_export(str(path), columns=["Manual Tags"], cache_dir=cache_dir)
+
+        mtime_ns = path.stat().st_mtime_ns
+        _write_frame(path, sep=";")
+        os.utime(path, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+        df, dialect = read_pubmed_export(str(path), columns=["Manual Tags"], cache_dir=cache_dir)
+        assert not dialect.from_cache
+        assert dialect.sep == ";"
+
+    def test_projection_is_part_of_key(self, tmp_path):
+        path = _write_frame(tmp_path / "export.csv")
+        cache = SnapshotCache(str(tmp_path / "cache"))
+        assert cache.key_for(str(path), ["Title"]) != cache.key_for(str(path), ["Keywords"])
+
+    def test_chunked_stream_populates_snapshot(self, tmp_path):
+        path = _write_frame(tmp_path / "export.csv")
+        cache_dir = str(tmp_path / "cache")
+
+        chunks, _ = read_pubmed_export(
+            str(path), columns=["Title"], chunksize=1, cache_dir=cache_dir
+        )
+        streamed = pd.concat(list(chunks))
+        cached_chunks, dialect = read_pubmed_export(
+            str(path), columns=["Title"], chunksize=1, cache_dir=cache_dir
+        )
+        cached = list(cached_chunks)
+
+        assert dialect.from_cache
+        assert [chunk.index[0] for chunk in cached] == [0, 1]
+        pd.testing.assert_frame_equal(streamed, pd.concat(cached))
+
+    @pytest.mark.parametrize("chunksize", [None, 1])
+    def test_unwritable_cache_falls_back(self, tmp_path, chunksize):
+        """Test that a cache directory that cannot be created does not stop the load"""
+        path = _write_frame(tmp_path / "export.csv")
+        blocked = tmp_path / "not-a-directory"
+        blocked.write_text("")
+
+        data, dialect = read_pubmed_export(
+            str(path), columns=["Title"], chunksize=chunksize, cache_dir=str(blocked / "cache")
+        )
+        df = data if chunksize is None else pd.concat(list(data))
+
+        assert df["Title"].tolist() == ["Migräne and stress", "Café au lait; a study"]
+        assert not dialect.from_cache
+
+    def test_partially_consumed_stream_is_not_published(self, tmp_path):
+        path = _write_frame(tmp_path / "export.csv")
+        cache_dir = str(tmp_path / "cache")
+
+        chunks, _ = read_pubmed_export(
+            str(path), columns=["Title"], chunksize=1, cache_dir=cache_dir
+        )
+        next(chunks)
+        chunks.close()
+
+        _, dialect = read_pubmed_export(str(path), columns=["Title"], cache_dir=cache_dir)
+        assert not dialect.from_cache
+
+
+class TestCompressedInput:
+    """Compressed inputs decoded while streaming"""
+
+    COMPRESSORS = {"gzip": gzip.compress, "bz2": bz2.compress, "xz": lzma.compress}
+
+    def _compressed_copy(self, source, tmp_path, method):
+        path = tmp_path / f"{source.name}.{method}"
+        path.write_bytes(self.COMPRESSORS[method](source.read_bytes()))
+        return path
+
+    def test_detect_compression(self):
+        assert detect_compression(gzip.compress(b"x")) == "gzip"
+        assert detect_compression(bz2.compress(b"x")) == "bz2"
+        assert detect_compression(lzma.compress(b"x")) == "xz"
+        assert detect_compression(b"\x28\xb5\x2f\xfd\x00") == "zstd"
+        assert detect_compression(b"Key,Title") is None
+
+    @pytest.mark.parametrize("method", ["gzip", "bz2", "xz"])
+    def test_compressed_csv_matches_plain(self, tmp_path, method):
+        plain, _ = read_pubmed_export(str(FIXTURE_CSV), columns=["Manual Tags"])
+        path = self._compressed_copy(FIXTURE_CSV, tmp_path, method)
+        df, dialect = read_pubmed_export(str(path), columns=["Manual Tags"])
+
+        assert dialect.compression == method
+        assert dialect.sep == ","
+        assert "Manual Tags" in dialect.columns
+        pd.testing.assert_frame_equal(plain, df)
+
+    def test_compressed_latin1_detects_encoding(self, tmp_path):
+        path = _write_frame(tmp_path / "export.csv", sep=";", encoding="latin-1")
+        packed = self._compressed_copy(path, tmp_path, "gzip")
+        chunks, dialect = read_pubmed_export(str(packed), columns=["Title"], chunksize=1)
+
+        assert dialect.encoding == "latin-1"
+        assert pd.concat(list(chunks))["Title"].tolist()[0] == "Migräne and stress"
+
+    def test_compressed_xml(self, tmp_path):
+        xml = project_root / "tests" / "fixtures" / "sample_pubmed.xml"
+        path = self._compressed_copy(xml, tmp_path, "xz")
+        df, dialect = read_pubmed_export(str(path), columns=["PMID"])
+
+        assert dialect.format == "xml"
+        assert df["PMID"].tolist() == ["38000001", "38000002"]
+
+    def test_zstd(self, tmp_path):
+        zstandard = pytest.importorskip("zstandard")
+        path = tmp_path / "export.csv.zst"
+        path.write_bytes(zstandard.ZstdCompressor().compress(FIXTURE_CSV.read_bytes()))
+        df, dialect = read_pubmed_export(str(path), columns=["Manual Tags"])
+
+        assert dialect.compression == "zstd"
+        assert len(df) > 0
+
+
+def _write_slice(path, rows):
+    """Write a yearly export slice; rows are (pmid, doi, title, tags) tuples"""
+    pd.DataFrame(
+        {
+            "Key": [f"K{i}" for i in range(len(rows))],
+            "Title": [row[2] for row in rows],
+            "DOI": [row[1] for row in rows],
+            "Extra": [f"PMID: {row[0]}" if row[0] else "" for row in rows],
+            "Manual Tags": [row[3] for row in rows],
+        }
+    ).to_csv(path, index=False)
+    return path
+
+
+class TestMultiFileInput:
+    """Directory/glob inputs with cross-file de-duplication"""
+
+    @pytest.fixture
+    def slices(self, tmp_path):
+        raw = tmp_path / "raw"
+        raw.mkdir()
+        _write_slice(
+            raw / "pubmed_2022.csv",
+            [
+                ("101", "10.1/a", "Migraine and depression in adolescents", "Depression"),
+                ("102", "", "Erenumab for chronic migraine prevention", "Erenumab"),
+            ],
+        )
+        _write_slice(
+            raw / "pubmed_2023.csv",
+            [
+                # Same PMID as 101
+                ("101", "", "Migraine & Depression in Adolescents", "Depression"),
+                # No PMID, same DOI (different spelling) as nothing before: kept
+                (
+                    "",
+                    "https://doi.org/10.1/C",
+                    "Acupuncture versus sham for migraine",
+                    "Acupuncture",
+                ),
+                # No identifiers except a title matching 102
+                ("", "", "Erenumab for Chronic Migraine Prevention.", "Erenumab"),
+            ],
+        )
+        return raw
+
+    def test_expand_inputs(self, slices):
+        expected = [str(slices / "pubmed_2022.csv"), str(slices / "pubmed_2023.csv")]
+        assert expand_inputs(str(slices)) == expected
+        assert expand_inputs(str(slices / "pubmed_*.csv")) == expected
+        assert expand_inputs(str(slices / "pubmed_2022.csv")) == expected[:1]
+        assert expand_inputs(str(slices / "missing.csv")) == []
+
+    def test_record_keys(self):
+        keys = record_keys(
+            None, "https://doi.org/10.1/ABC", "A title long enough to count", "PMID: 42"
+        )
+        assert keys[0] == "pmid:42"
+        assert keys[1] == "doi:10.1/abc"
+        assert keys[2].startswith("title:")
+        assert record_keys(None, None, "Migraine.") == []
+        assert record_keys(111.0, None, None) == record_keys("111", None, None) == ["pmid:111"]
+
+    @pytest.mark.parametrize("pyarrow", [False, True])
+    def test_blank_pmid_cell_still_deduplicates(self, tmp_path, monkeypatch, pyarrow):
+        """Test that a PMID column with a blank cell is not read as float"""
+        if pyarrow and not ingest.HAS_PYARROW:
+            pytest.skip("pyarrow is not installed")
+        monkeypatch.setattr(ingest, "HAS_PYARROW", pyarrow)
+        # The titles differ, so only the PMID identifies the repeated article
+        (tmp_path / "a.csv").write_text(
+            "Key,PMID,Title,Manual Tags\nA1,111,Migraine in adolescents,Depression\n"
+        )
+        (tmp_path / "b.csv").write_text(
+            "Key,PMID,Title,Manual Tags\n"
+            "B1,,Erenumab for chronic migraine,Erenumab\n"
+            "B2,111,Adolescent migraine revisited,Depression\n"
+        )
+        dedup = RecordDeduplicator()
+        df, _ = read_pubmed_inputs(
+            expand_inputs(str(tmp_path)), columns=["Manual Tags"], jobs=1, deduplicator=dedup
+        )
+
+        assert df["Manual Tags"].tolist() == ["Depression", "Erenumab"]
+        assert dedup.dropped == 1
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_read_inputs_deduplicates(self, slices, jobs):
+        dedup = RecordDeduplicator()
+        paths = expand_inputs(str(slices))
+        df, dialects = read_pubmed_inputs(
+            paths, columns=["Manual Tags"], jobs=jobs, deduplicator=dedup
+        )
+
+        assert len(dialects) == 2
+        assert df["Manual Tags"].tolist() == ["Depression", "Erenumab", "Acupuncture"]
+        assert list(df.index) == [0, 1, 2]
+        assert (dedup.kept, dedup.dropped) == (3, 2)
+
+    def test_read_inputs_chunked(self, slices):
+        dedup = RecordDeduplicator()
+        chunks, _ = read_pubmed_inputs(
+            expand_inputs(str(slices)), columns=["Manual Tags"], chunksize=2, deduplicator=dedup
+        )
+        df = pd.concat(list(chunks))
+
+        assert df["Manual Tags"].tolist() == ["Depression", "Erenumab", "Acupuncture"]
+        assert list(df.index) == [0, 1, 2]
+        assert dedup.dropped == 2
+
+    def test_builder_loads_directory(self, slices):
+        builder = PubMedRefinedNetworkV2()
+        df = builder.load_pubmed_data(str(slices), jobs=1)
+
+        assert len(df) == 3
+        assert builder.deduplicator.dropped == 2
+
+
+class TestLoadPubmedData:
+    """Single-pass loading through the detected dialect"""
+
+    def test_load_semicolon_latin1(self, tmp_path):
+        path = _write_frame(tmp_path / "export.csv", sep=";", encoding="latin-1")
+        builder = PubMedRefinedNetworkV2()
+        df = builder.load_pubmed_data(str(path), columns=["Title", "Manual Tags"])
+
+        assert df is not None
+        assert len(df) == 2
+        assert df.loc[0, "Title"] == "Migräne and stress"
+        assert builder.last_dialect.sep == ";"
+        assert builder.last_dialect.encoding == "latin-1"
+
+    def test_late_non_utf8_byte(self, tmp_path):
+        """Test that a latin-1 byte beyond the sniffed head still loads every row"""
+        path = tmp_path / "export.csv"
+        rows = [f"Article {i},Migraine; Aura" for i in range(3000)]
+        text = "\n".join(["Title,Manual Tags", *rows, "Céphalée,Migräne"])
+        path.write_bytes(text.encode("latin-1"))
+        assert path.stat().st_size > SNIFF_BYTES
+
+        df, dialect = read_pubmed_export(str(path))
+        assert len(df) == 3001
+        assert df["Manual Tags"].iloc[-1] == "Migräne"
+        assert dialect.encoding == "latin-1"
+
+        chunks, _ = read_pubmed_export(str(path), chunksize=1000)
+        assert sum(len(chunk) for chunk in chunks) == 3001
+
+    def test_load_utf8_sig(self, tmp_path):
+        path = _write_frame(tmp_path / "export.csv", encoding="utf-8-sig")
+        builder = PubMedRefinedNetworkV2()
+        df = builder.load_pubmed_data(str(path), columns=["Key", "Title"])
+
+        assert df is not None
+        assert df.columns[0] == "Key"
+        assert builder.last_dialect.has_bom
+
+    def test_load_fixture(self):
+        df = PubMedRefinedNetworkV2().load_pubmed_data(str(FIXTURE_CSV))
+        assert df is not None
+        assert "Manual Tags" in df.columns
+        assert len(df) > 0
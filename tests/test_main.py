@@ -19,7 +19,9 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root / "english_version" / "scripts"))
 
 # Import the class after path is set
+import main  # noqa: E402
 from main import PubMedRefinedNetworkV2  # noqa: E402
+from matrices import DocumentTermPostings  # noqa: E402
 
 
 class TestPubMedRefinedNetworkV2:
@@ -178,6 +180,40 @@ class TestPubMedRefinedNetworkV2:
         assert network_builder.extract_high_quality_terms("") == []
         assert network_builder.extract_high_quality_terms(None) == []
 
+    def test_extract_high_quality_terms_ordered(self, network_builder):
+        """Terms keep field order (tags, keywords, abstract) without duplicates"""
+        terms = network_builder.extract_high_quality_terms(
+            "Stress; Anxiety; Stress", abstract_text="depression", keywords_text="CGRP, anxiety"
+        )
+        assert terms == ["Stress", "Anxiety", "Cgrp", "Depression"]
+
+    def test_extract_corpus_terms_matches_per_row(self, network_builder, sample_data):
+        """Corpus-level extraction equals per-row extraction, including the cap"""
+        tags = "; ".join(f"Erenumab {chr(97 + i)}abc" for i in range(25))
+        df = pd.concat(
+            [
+                sample_data,
+                pd.DataFrame(
+                    {
+                        "Manual Tags": [tags, None, "Study; Meta Analysis"],
+                        "Abstract Note": ["anxiety and stress", None, None],
+                        "Keywords": [None, "Stress, stress", ""],
+                    }
+                ),
+            ]
+        ).set_index(pd.Index([10, 10, 11, 12, 13, 14]))
+
+        corpus_terms = network_builder.extract_corpus_terms(df)
+        per_row = [
+            network_builder.extract_high_quality_terms(
+                row["Manual Tags"], row["Abstract Note"], row["Keywords"]
+            )[: network_builder.MAX_TERMS_PER_ARTICLE]
+            for _, row in df.iterrows()
+        ]
+        assert corpus_terms == per_row
+        assert len(corpus_terms[3]) == 20
+        assert corpus_terms[5] == []
+
     # ==================== NETWORK BUILDING TESTS ====================
 
     def test_build_refined_network_structure(self, network_builder, sample_data):
@@ -234,6 +270,96 @@ class TestPubMedRefinedNetworkV2:
         for category in nodes_df["Category"]:
             assert category in valid_categories, f"Invalid category: {category}"
 
+    def test_build_refined_network_chunked_matches_full(self, network_builder, sample_data):
+        """Test that streaming chunks produce the same network as one frame"""
+        nodes_full, edges_full = network_builder.build_refined_network(
+            sample_data, min_frequency=1, min_weight=1
+        )
+        chunks = (sample_data.iloc[i : i + 2] for i in range(0, len(sample_data), 2))
+        nodes_chunked, edges_chunked = network_builder.build_refined_network(
+            chunks, min_frequency=1, min_weight=1
+        )
+
+        pd.testing.assert_frame_equal(
+            nodes_full.sort_values("Id").reset_index(drop=True),
+            nodes_chunked.sort_values("Id").reset_index(drop=True),
+        )
+        pd.testing.assert_frame_equal(
+            edges_full.sort_values(["Source", "Target"]).reset_index(drop=True),
+            edges_chunked.sort_values(["Source", "Target"]).reset_index(drop=True),
+        )
+
+    def test_build_refined_network_workers_match_serial(self, network_builder, sample_data):
+        """Test that the process pool gives the serial network and postings"""
+        crowded = pd.DataFrame(
+            {"Manual Tags": ["; ".join(f"Headache Type {chr(97 + i)}" for i in range(26))]}
+        )
+        corpus = pd.concat([sample_data] * 4 + [crowded], ignore_index=True)
+        corpus["PMID"] = [str(i) for i in range(len(corpus))]
+
+        serial_postings, pooled_postings = DocumentTermPostings(), DocumentTermPostings()
+        serial = network_builder.build_refined_network(
+            corpus, min_frequency=1, min_weight=1, postings=serial_postings
+        )
+        pooled = network_builder.build_refined_network(
+            corpus, min_frequency=1, min_weight=1, postings=pooled_postings, workers=3
+        )
+
+        for expected, actual in zip(serial, pooled):
+            pd.testing.assert_frame_equal(expected, actual)
+        assert pooled_postings.terms == serial_postings.terms
+        assert pooled_postings.indices == serial_postings.indices
+        assert pooled_postings.indptr == serial_postings.indptr
+        assert pooled_postings.article_ids == serial_postings.article_ids
+
+    def test_build_refined_network_workers_string_index(self, network_builder, sample_data):
+        """Test that pooled progress does not depend on integer index labels"""
+        corpus = pd.concat([sample_data] * 4, ignore_index=True)
+        corpus.index = [f"ITEM{i}" for i in range(len(corpus))]
+
+        serial = network_builder.build_refined_network(corpus, min_frequency=1, min_weight=1)
+        pooled = network_builder.build_refined_network(
+            corpus, min_frequency=1, min_weight=1, workers=2
+        )
+
+        for expected, actual in zip(serial, pooled):
+            pd.testing.assert_frame_equal(expected, actual)
+
+    def test_build_refined_network_reports_spills(self, network_builder, sample_data, capsys):
+        """Test that spills made while folding the last batch are reported"""
+        network_builder.build_refined_network(
+            sample_data, min_frequency=1, min_weight=1, memory_budget=1
+        )
+        assert "Pair counts spilled to disk: 1 runs" in capsys.readouterr().out
+
+    def test_build_refined_network_approximate(
+        self, network_builder, sample_data, capsys, monkeypatch
+    ):
+        """Test that the sketch pre-filter keeps the exact network and reports its bound"""
+        corpus = pd.concat([sample_data] * 5, ignore_index=True)
+        counters = []
+
+        class RecordingCounter(main.SketchedCooccurrenceCounter):
+            # Narrow enough for this small corpus to have a visible error bound
+            def __init__(self, **kwargs):
+                super().__init__(width=1 << 8, **kwargs)
+                counters.append(self)
+
+        monkeypatch.setattr(main, "SketchedCooccurrenceCounter", RecordingCounter)
+
+        exact = network_builder.build_refined_network(corpus, min_frequency=2, min_weight=3)
+        approximate = network_builder.build_refined_network(
+            corpus, min_frequency=2, min_weight=3, approximate=True
+        )
+
+        for expected, actual in zip(exact, approximate):
+            pd.testing.assert_frame_equal(expected, actual)
+        (sketch,) = [counter.sketch for counter in counters]
+        assert sketch.total > 0 and sketch.error_bound >= 0.1
+        assert sketch.error_bound == sketch.epsilon * sketch.total
+        bound = f"edges (approximate: pair estimates within +{sketch.error_bound:,.1f} at "
+        assert bound in capsys.readouterr().out
+
     # ==================== INTEGRATION TESTS ====================
 
     def test_full_pipeline_sample_data(self, network_builder, sample_data):
@@ -275,6 +401,34 @@ class TestPubMedRefinedNetworkV2:
                 assert edge["Source"] in node_ids, f"Edge source {edge['Source']} not in nodes"
                 assert edge["Target"] in node_ids, f"Edge target {edge['Target']} not in nodes"
 
+    def test_edge_ids_match_labels(self, network_builder, sample_data):
+        """Test that edge endpoints carry the Id of their labelled node"""
+        nodes_df, edges_df = network_builder.build_refined_network(
+            sample_data, min_frequency=1, min_weight=1
+        )
+
+        label_to_id = dict(zip(nodes_df["Label"], nodes_df["Id"]))
+        for source, target, source_label, target_label in zip(
+            edges_df["Source"],
+            edges_df["Target"],
+            edges_df["Source_Label"],
+            edges_df["Target_Label"],
+        ):
+            assert source == label_to_id[source_label]
+            assert target == label_to_id[target_label]
+
+    def test_empty_network_columns(self, network_builder, sample_data):
+        """Test that thresholds removing everything still give the expected columns"""
+        nodes_df, edges_df = network_builder.build_refined_network(
+            sample_data, min_frequency=10_000, min_weight=10_000
+        )
+
+        assert nodes_df.empty and edges_df.empty
+        assert {"Id", "Label", "Category", "Frequency"} <= set(nodes_df.columns)
+        assert {"Source", "Target", "Weight", "Source_Label", "Target_Label"} <= set(
+            edges_df.columns
+        )
+
 
 # ==================== PERFORMANCE TESTS ====================
 
@@ -348,3 +502,13 @@ def test_load_pubmed_data_missing_file():
     df = builder.load_pubmed_data("nonexistent_file.csv")
 
     assert df is None
+
+
+def test_load_pubmed_data_chunked(sample_csv_file):
+    """Test streaming a CSV file in chunks"""
+    builder = PubMedRefinedNetworkV2()
+    chunks = builder.load_pubmed_data(str(sample_csv_file), chunksize=2)
+
+    assert chunks is not None
+    sizes = [len(chunk) for chunk in chunks]
+    assert sizes == [2, 1]
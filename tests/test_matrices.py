@@ -0,0 +1,118 @@
+"""
+Tests for the sparse matrix export (matrices.py)
+
+Usage:
+    pytest tests/test_matrices.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "english_version" / "scripts"))
+
+from main import PubMedRefinedNetworkV2  # noqa: E402
+from matrices import (  # noqa: E402
+    DocumentTermPostings,
+    cooccurrence_matrix,
+    document_term_matrix,
+    load_npz,
+    parse_year,
+    write_matrices,
+)
+
+
+@pytest.fixture
+def corpus():
+    return pd.DataFrame(
+        {
+            "PMID": ["1", "2", "3", "4"],
+            "Publication Year": [2021, 2022, None, 2024],
+            "Manual Tags": [
+                "Depression; Anxiety; Stress",
+                "Stress; Anxiety; Vascular",
+                "CGRP; Erenumab; Depression",
+                "Anxiety; Stress; Depression; Vascular",
+            ],
+            "Abstract Note": [None, "Hormonal changes.", None, None],
+            "Keywords": [None, None, "disability", None],
+        }
+    )
+
+
+@pytest.fixture
+def built(corpus):
+    postings = DocumentTermPostings()
+    nodes_df, edges_df = PubMedRefinedNetworkV2().build_refined_network(
+        corpus, min_frequency=2, min_weight=2, postings=postings
+    )
+    return postings, nodes_df, edges_df
+
+
+class TestMatrices:
+    """Document-term and co-occurrence matrices"""
+
+    def test_doc_term_matches_node_frequency(self, built):
+        postings, nodes_df, _ = built
+        doc_term = document_term_matrix(postings, nodes_df["Label"].tolist())
+
+        assert doc_term.shape == (4, len(nodes_df))
+        column_sums = np.bincount(doc_term.indices, minlength=doc_term.shape[1])
+        assert column_sums.tolist() == nodes_df["Frequency"].tolist()
+        assert postings.article_ids == ["pmid:1", "pmid:2", "pmid:3", "pmid:4"]
+        assert list(postings.years) == [2021, 2022, 0, 2024]
+
+    def test_cooccurrence_matches_edges(self, built):
+        postings, nodes_df, edges_df = built
+        labels = nodes_df["Label"].tolist()
+        dense = np.zeros((len(labels), len(labels)), dtype=int)
+        cooc = cooccurrence_matrix(document_term_matrix(postings, labels))
+        for row in range(cooc.shape[0]):
+            for k in range(cooc.indptr[row], cooc.indptr[row + 1]):
+                dense[row, cooc.indices[k]] = cooc.data[k]
+
+        assert (dense == dense.T).all()
+        assert np.diag(dense).tolist() == nodes_df["Frequency"].tolist()
+        position = {label: i for i, label in enumerate(labels)}
+        for edge in edges_df.itertuples():
+            assert dense[position[edge.Source_Label], position[edge.Target_Label]] == edge.Weight
+
+    def test_write_and_load(self, built, tmp_path):
+        postings, nodes_df, _ = built
+        written = write_matrices(postings, nodes_df, str(tmp_path))
+        assert sorted(Path(p).name for p in written) == [
+            "cooccurrence.npz",
+            "doc_term.npz",
+            "matrix_index.npz",
+        ]
+
+        doc_term = load_npz(str(tmp_path / "doc_term.npz"))
+        with np.load(tmp_path / "matrix_index.npz") as index:
+            assert index["term_label"].tolist() == nodes_df["Label"].tolist()
+            assert index["article_year"].tolist() == [2021, 2022, 0, 2024]
+            # Slice by category without pandas
+            columns = np.flatnonzero(index["term_category"] == "true_comorbidities")
+        assert len(columns) > 0
+        assert doc_term.indptr[-1] == len(doc_term.data)
+
+    def test_scipy_load_npz(self, built, tmp_path):
+        sparse = pytest.importorskip("scipy.sparse")
+        postings, nodes_df, _ = built
+        write_matrices(postings, nodes_df, str(tmp_path))
+
+        doc_term = sparse.load_npz(tmp_path / "doc_term.npz")
+        cooc = sparse.load_npz(tmp_path / "cooccurrence.npz")
+        assert (abs((doc_term.T @ doc_term) - cooc)).sum() == 0
+
+    def test_parse_year(self):
+        assert parse_year("2023 Jan 5") == 2023
+        assert parse_year(2019) == 2019
+        # Year columns with gaps are parsed as floats
+        assert parse_year(2019.0) == 2019
+        assert parse_year(None) == 0
+        assert parse_year("n.d.") == 0
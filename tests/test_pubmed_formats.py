@@ -0,0 +1,115 @@
+"""
+Tests for the native PubMed XML and MEDLINE readers (pubmed_formats.py)
+
+Usage:
+    pytest tests/test_pubmed_formats.py -v
+"""
+
+import io
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "english_version" / "scripts"))
+
+from ingest import read_pubmed_export  # noqa: E402
+from main import PubMedRefinedNetworkV2  # noqa: E402
+from pubmed_formats import (  # noqa: E402
+    detect_record_format,
+    iter_medline,
+    iter_pubmed_xml,
+    records_to_frames,
+)
+
+FIXTURES = project_root / "tests" / "fixtures"
+XML_FIXTURE = FIXTURES / "sample_pubmed.xml"
+MEDLINE_FIXTURE = FIXTURES / "sample_pubmed.nbib"
+
+
+class TestFormatDetection:
+    """Recognising the input format from the first bytes"""
+
+    def test_detect_formats(self):
+        assert detect_record_format(b'<?xml version="1.0" ?>') == "xml"
+        assert detect_record_format(b"\nPMID- 123\nTI  - x") == "medline"
+        assert detect_record_format(b"\xef\xbb\xbfKey,Title") == "csv"
+
+
+class TestPubmedXml:
+    """iterparse-based XML reader"""
+
+    def test_fields(self):
+        records = list(iter_pubmed_xml(str(XML_FIXTURE)))
+        assert len(records) == 2
+
+        first = records[0]
+        assert first["PMID"] == "38000001"
+        assert first["DOI"] == "10.1234/headache.2024.001"
+        assert first["Title"] == "CGRP inhibitors in chronic migraine."
+        assert first["Publication Year"] == "2024"
+        assert first["Abstract Note"].startswith("BACKGROUND: Erenumab")
+        assert first["Manual Tags"] == "Humans; Migraine Disorders/*drug therapy; *Quality of Life"
+        assert first["Keywords"] == "CGRP; Erenumab"
+
+        second = records[1]
+        assert second["Publication Year"] == "2023"
+        assert second["DOI"] == ""
+        assert second["Keywords"] == ""
+
+    def test_stream_from_file_object(self):
+        """Articles stream in document order from an open binary file"""
+        xml = b"<PubmedArticleSet>"
+        xml += b"".join(
+            b"<PubmedArticle><MedlineCitation><PMID>%d</PMID></MedlineCitation></PubmedArticle>" % i
+            for i in range(50)
+        )
+        xml += b"</PubmedArticleSet>"
+        pmids = [record["PMID"] for record in iter_pubmed_xml(io.BytesIO(xml))]
+        assert pmids == [str(i) for i in range(50)]
+
+
+class TestMedline:
+    """Line-oriented MEDLINE reader"""
+
+    def test_fields_match_xml(self):
+        with open(MEDLINE_FIXTURE, encoding="utf-8") as f:
+            medline = list(iter_medline(f))
+        xml = list(iter_pubmed_xml(str(XML_FIXTURE)))
+
+        assert len(medline) == 2
+        for from_medline, from_xml in zip(medline, xml):
+            for field in ("PMID", "DOI", "Publication Year", "Manual Tags", "Keywords"):
+                assert from_medline[field] == from_xml[field]
+
+    def test_continuation_lines(self):
+        with open(MEDLINE_FIXTURE, encoding="utf-8") as f:
+            first = next(iter_medline(f))
+        assert first["Abstract Note"].endswith("Quality of life and disability improved.")
+
+
+class TestRecordFrames:
+    """Records batched into frames for the network builder"""
+
+    def test_chunked_frames(self):
+        records = iter_pubmed_xml(str(XML_FIXTURE))
+        frames = list(records_to_frames(records, chunksize=1, columns=["PMID", "Keywords"]))
+        assert [list(f.index) for f in frames] == [[0], [1]]
+        assert list(frames[0].columns) == ["PMID", "Keywords"]
+        # Empty fields come back as missing values, like blank CSV cells
+        assert frames[1]["Keywords"].isna().all()
+
+    def test_read_pubmed_export_dispatches(self):
+        df, dialect = read_pubmed_export(str(MEDLINE_FIXTURE), columns=["PMID", "Manual Tags"])
+        assert dialect.format == "medline"
+        assert list(df.columns) == ["PMID", "Manual Tags"]
+        assert len(df) == 2
+
+    def test_network_from_xml(self):
+        builder = PubMedRefinedNetworkV2()
+        df = builder.load_pubmed_data(str(XML_FIXTURE))
+        nodes_df, _ = builder.build_refined_network(df, min_frequency=1, min_weight=1)
+
+        assert builder.last_dialect.format == "xml"
+        assert "Erenumab" in set(nodes_df["Label"])
+        assert "Anxiety" in set(nodes_df["Label"])
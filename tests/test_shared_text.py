@@ -0,0 +1,95 @@
+"""
+Tests for shared-memory text columns (shared_text.py)
+
+Usage:
+    pytest tests/test_shared_text.py -v
+"""
+
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "english_version" / "scripts"))
+
+from shared_text import SharedTextFrame  # noqa: E402
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame(
+        {
+            "Manual Tags": ["Migraine; Aura", None, "Céphalée; Stress", "", "Sleep"],
+            "Abstract Note": ["Long text " * 50, "Ünïcode ✓", None, float("nan"), "x"],
+            "PMID": [101, 102, 103, 104, 105],
+        }
+    )
+
+
+def _decode_in_worker(task):
+    handle, start, stop = task
+    shared = SharedTextFrame.attach(handle)
+    try:
+        return shared.frame(start, stop).to_dict("list")
+    finally:
+        shared.close()
+
+
+class TestSharedTextFrame:
+    """Tests for the UTF-8 blob + offsets block"""
+
+    def test_round_trip(self, frame):
+        """Test that values come back as str() and missing values as None"""
+        with SharedTextFrame.create(frame) as shared:
+            decoded = shared.frame()
+
+        assert list(decoded.columns) == list(frame.columns)
+        assert decoded["Manual Tags"].tolist() == [
+            "Migraine; Aura",
+            None,
+            "Céphalée; Stress",
+            "",
+            "Sleep",
+        ]
+        assert decoded["Abstract Note"].tolist()[1:4] == ["Ünïcode ✓", None, None]
+        assert decoded["PMID"].tolist() == ["101", "102", "103", "104", "105"]
+
+    def test_row_ranges(self, frame):
+        """Test that a slice decodes only its rows, indexed from its start"""
+        with SharedTextFrame.create(frame) as shared:
+            part = shared.frame(2, 4)
+            beyond = shared.frame(4, 10)
+
+        assert part.index.tolist() == [2, 3]
+        assert part["Manual Tags"].tolist() == ["Céphalée; Stress", ""]
+        assert beyond["PMID"].tolist() == ["105"]
+
+    def test_workers_attach_by_name(self, frame):
+        """Test that other processes read the block from its handle alone"""
+        with SharedTextFrame.create(frame, columns=["Manual Tags", "PMID"]) as shared:
+            tasks = [(shared.handle, 0, 2), (shared.handle, 2, 5)]
+            with ProcessPoolExecutor(max_workers=2) as pool:
+                first, second = pool.map(_decode_in_worker, tasks)
+
+        assert first == {"Manual Tags": ["Migraine; Aura", None], "PMID": ["101", "102"]}
+        assert second["PMID"] == ["103", "104", "105"]
+
+    def test_block_freed_on_exit(self, frame):
+        """Test that leaving the context unlinks the block"""
+        with SharedTextFrame.create(frame) as shared:
+            name = shared.handle.name
+
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+    def test_empty_frame(self, frame):
+        """Test that a frame without rows keeps its columns"""
+        with SharedTextFrame.create(frame.iloc[:0]) as shared:
+            decoded = shared.frame()
+
+        assert decoded.empty and list(decoded.columns) == list(frame.columns)
@@ -0,0 +1,116 @@
+"""
+Tests for approximate pair counting (sketch.py)
+
+Usage:
+    pytest tests/test_sketch.py -v
+"""
+
+import itertools
+import random
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "english_version" / "scripts"))
+
+from cooccurrence import CooccurrenceCounter  # noqa: E402
+from sketch import CountMinSketch, SketchedCooccurrenceCounter  # noqa: E402
+
+VOCABULARY = [f"Term {i}" for i in range(60)]
+
+
+def _articles(n, seed=11):
+    # A few common terms and a long tail, as in the tag corpus
+    rng = random.Random(seed)
+    return [
+        rng.sample(VOCABULARY[:8] if rng.random() < 0.5 else VOCABULARY, rng.randint(0, 7))
+        for _ in range(n)
+    ]
+
+
+def _reference(articles):
+    weights = defaultdict(int)
+    for terms in articles:
+        for pair in itertools.combinations(sorted(terms), 2):
+            weights[pair] += 1
+    return dict(weights)
+
+
+class TestCountMinSketch:
+    """Tests for the sketch itself"""
+
+    def test_never_undercounts(self):
+        """Test that estimates are upper bounds within the error bound here"""
+        rng = np.random.default_rng(3)
+        keys = np.arange(5000, dtype=np.int64) * 7919
+        counts = rng.integers(1, 20, size=len(keys))
+        sketch = CountMinSketch(width=1 << 12, depth=4)
+        sketch.add(keys, counts)
+
+        estimates = sketch.estimate(keys)
+        assert (estimates >= counts).all()
+        assert sketch.total == counts.sum()
+        assert np.mean(estimates - counts <= sketch.error_bound) > 1 - sketch.delta
+
+    def test_width_must_be_power_of_two(self):
+        """Test that other widths are rejected"""
+        with pytest.raises(ValueError):
+            CountMinSketch(width=1000)
+
+
+class TestSketchedCooccurrenceCounter:
+    """Tests for the two-pass counter"""
+
+    @pytest.mark.parametrize("width", [2, 1 << 6, 1 << 16])
+    def test_edges_match_exact_counts(self, width, monkeypatch):
+        """Test that edges reaching min_weight are exact however small the sketch"""
+        monkeypatch.setattr(CooccurrenceCounter, "BATCH_SIZE", 13)
+        articles = _articles(400)
+        counter = SketchedCooccurrenceCounter(width=width)
+        for terms in articles:
+            counter.add(terms)
+
+        reference = _reference(articles)
+        for min_weight in (10, 3, 25):
+            expected = {pair: w for pair, w in reference.items() if w >= min_weight}
+            sources, targets, weights = counter.edges(min_weight)
+            assert dict(zip(zip(sources, targets), weights)) == expected
+
+    def test_only_candidates_are_counted(self):
+        """Test that a wide sketch keeps far fewer pairs than exact counting"""
+        articles = _articles(400)
+        counter = SketchedCooccurrenceCounter(width=1 << 16)
+        for terms in articles:
+            counter.add(terms)
+
+        first, _, _ = counter.pairs(min_weight=10)
+        assert 0 < len(first) <= len(counter._keys) < len(_reference(articles)) / 4
+
+    def test_second_pass_replaces_spilled_runs(self, monkeypatch):
+        """Test that a lower min_weight recounts from scratch, deleting the old runs"""
+        monkeypatch.setattr(CooccurrenceCounter, "BATCH_SIZE", 13)
+        articles = _articles(400)
+        counter = SketchedCooccurrenceCounter(width=1 << 6, memory_budget=256)
+        for terms in articles:
+            counter.add(terms)
+
+        reference = _reference(articles)
+        for min_weight in (25, 3):
+            expected = {pair: w for pair, w in reference.items() if w >= min_weight}
+            sources, targets, weights = counter.edges(min_weight)
+            assert dict(zip(zip(sources, targets), weights)) == expected
+            runs = list(Path(counter._spill_dir.name).glob("run-*"))
+            assert len(runs) == 2 * counter.spilled_runs > 0
+
+    def test_subtract_rejected(self):
+        """Test that removing articles is refused instead of corrupting the sketch"""
+        counter = SketchedCooccurrenceCounter()
+        counter.add(["Aura", "Migraine"])
+
+        with pytest.raises(ValueError):
+            counter.subtract(["Aura", "Migraine"])
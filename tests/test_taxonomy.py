@@ -0,0 +1,117 @@
+"""
+Tests for external taxonomy files and hot reload (taxonomy.py)
+
+Usage:
+    pytest tests/test_taxonomy.py -v
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "english_version" / "scripts"))
+
+from main import PubMedRefinedNetworkV2  # noqa: E402
+from taxonomy import (  # noqa: E402
+    DEFAULT_TAXONOMY,
+    DISCOVERY_TAXONOMY,
+    TaxonomyWatcher,
+    read_taxonomy,
+)
+
+
+@pytest.fixture
+def taxonomy_file(tmp_path):
+    data = {
+        "version": 1,
+        "stopwords": ["study"],
+        "research_methods": ["cohort study"],
+        "categories": {
+            "trigger_mechanisms": {"description": "Trigger Mechanisms", "keywords": ["stress"]},
+            "interventions": {"description": "Interventions", "keywords": ["erenumab"]},
+        },
+    }
+    path = tmp_path / "taxonomy.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path, data
+
+
+def _rewrite(path, data):
+    """Write new content and make sure the modification time moves"""
+    path.write_text(json.dumps(data), encoding="utf-8")
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestTaxonomyFiles:
+    """Shipped taxonomy files"""
+
+    def test_default_taxonomy(self):
+        taxonomy = read_taxonomy(DEFAULT_TAXONOMY)
+        assert list(taxonomy.categories) == [
+            "trigger_mechanisms",
+            "true_comorbidities",
+            "social_impact",
+            "interventions",
+        ]
+        assert "randomized controlled trial" in taxonomy.research_methods
+        assert [category for category, _ in taxonomy.inference_words][0] == "trigger_mechanisms"
+
+    def test_discovery_taxonomy(self):
+        taxonomy = read_taxonomy(DISCOVERY_TAXONOMY)
+        assert "treatment" in taxonomy.stopwords
+        assert taxonomy.research_methods == []
+
+    def test_yaml(self, taxonomy_file, tmp_path):
+        yaml = pytest.importorskip("yaml")
+        _, data = taxonomy_file
+        path = tmp_path / "taxonomy.yaml"
+        path.write_text(yaml.safe_dump(data, sort_keys=False), encoding="utf-8")
+        assert list(read_taxonomy(str(path)).categories) == ["trigger_mechanisms", "interventions"]
+
+    def test_invalid(self, tmp_path):
+        path = tmp_path / "bad.json"
+        path.write_text(json.dumps({"categories": {"x": {"description": "X"}}}), encoding="utf-8")
+        with pytest.raises(ValueError):
+            read_taxonomy(str(path))
+
+
+class TestHotReload:
+    """Edits picked up by a running builder"""
+
+    def test_watcher(self, taxonomy_file):
+        path, data = taxonomy_file
+        watcher = TaxonomyWatcher(str(path))
+        assert watcher.check() is False
+
+        data["categories"]["interventions"]["keywords"].append("cgrp")
+        _rewrite(path, data)
+        assert watcher.check() is True
+        assert watcher.compiled.categorizer.categorize("Cgrp") == "interventions"
+
+        # A broken edit keeps the previous taxonomy
+        path.write_text("{not json", encoding="utf-8")
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 2_000_000_000))
+        assert watcher.check() is False
+        assert watcher.compiled.categorizer.categorize("Cgrp") == "interventions"
+
+    def test_builder_reloads_between_builds(self, taxonomy_file):
+        path, data = taxonomy_file
+        builder = PubMedRefinedNetworkV2(taxonomy_path=str(path))
+        df = pd.DataFrame({"Manual Tags": ["Stress; CGRP", "Stress; CGRP"]})
+
+        nodes_df, _ = builder.build_refined_network(df, min_frequency=1, min_weight=1)
+        assert nodes_df["Label"].tolist() == ["Stress"]
+
+        data["categories"]["interventions"]["keywords"].append("cgrp")
+        _rewrite(path, data)
+        nodes_df, edges_df = builder.build_refined_network(df, min_frequency=1, min_weight=1)
+        assert sorted(nodes_df["Label"]) == ["Cgrp", "Stress"]
+        assert edges_df["Weight"].tolist() == [2]
+        assert "cgrp" in builder.refined_categories["interventions"]["keywords"]
@@ -0,0 +1,103 @@
+"""
+Tests for the cached term-cleaning engine (term_cleaning.py)
+
+Usage:
+    pytest tests/test_term_cleaning.py -v
+"""
+
+import re
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "english_version" / "scripts"))
+
+from main import PubMedRefinedNetworkV2  # noqa: E402
+from term_cleaning import TermCleaner  # noqa: E402
+
+SEGMENTS = [
+    "migraine",
+    "quality of life",
+    "*Migraine Disorders/*drug therapy",
+    " Humans",
+    "Stress (psychological)",
+    "[review] anxiety",
+    "Anti-CGRP antibodies",
+    "COVID-19",
+    "the patient study",
+    "2024",
+    "x" * 25,
+    "   ",
+    "",
+    None,
+]
+
+
+@pytest.fixture
+def stopwords():
+    return PubMedRefinedNetworkV2().medical_stopwords
+
+
+def _reference(stopwords, term):
+    """The original per-call strict_term_cleaning"""
+    if pd.isna(term) or not term.strip():
+        return None
+    term = re.sub(r"^\*+|\*+$", "", term.strip())
+    term = re.sub(r"/\*.*", "", term)
+    term = re.sub(r"\[.*?\]|\(.*?\)", "", term)
+    words = [
+        word
+        for word in term.lower().split()
+        if 3 <= len(word) <= 20
+        and word not in stopwords
+        and not word.isdigit()
+        and not re.search(r"[^a-z\-]", word)
+    ]
+    return " ".join(words).title() if words else None
+
+
+class TestTermCleaner:
+    """Memoised and bulk cleaning give the original results"""
+
+    def test_clean(self, stopwords):
+        cleaner = TermCleaner(stopwords)
+        for segment in SEGMENTS:
+            assert cleaner.clean(segment) == _reference(stopwords, segment)
+            # Second call is served from the memo
+            assert cleaner.clean(segment) == _reference(stopwords, segment)
+        assert cleaner.clean("*Migraine Disorders/*drug therapy") == "Migraine Disorders"
+        assert cleaner.clean("quality of life") == "Quality Life"
+        assert cleaner.clean("Anti-CGRP antibodies") == "Anti-Cgrp Antibodies"
+        assert cleaner.clean("COVID-19") is None
+        assert cleaner.clean(float("nan")) is None
+
+    def test_memo_is_bounded(self, stopwords):
+        cleaner = TermCleaner(stopwords, memo_size=3)
+        for segment in SEGMENTS[:6]:
+            cleaner.clean(segment)
+        assert len(cleaner._memo) == 3
+        assert list(cleaner._memo) == SEGMENTS[3:6]
+
+    def test_clean_series_matches_clean(self, stopwords):
+        segments = pd.Series(SEGMENTS * 3, index=[0] * len(SEGMENTS) * 3)
+        cleaner = TermCleaner(stopwords)
+        result = cleaner.clean_series(segments)
+
+        assert result.tolist() == [_reference(stopwords, s) for s in SEGMENTS * 3]
+        assert (result.index == segments.index).all()
+        # Bulk results seed the memo for later per-segment calls
+        assert cleaner._memo["quality of life"] == "Quality Life"
+
+    def test_clean_series_arrow_strings(self, stopwords):
+        segments = pd.Series(SEGMENTS, dtype="string")
+        result = TermCleaner(stopwords).clean_series(segments)
+        assert result.tolist() == [_reference(stopwords, s) for s in SEGMENTS]
+
+    def test_builder_uses_engine(self):
+        builder = PubMedRefinedNetworkV2()
+        builder.strict_term_cleaning("Humans")
+        assert "Humans" in builder.term_cleaner._memo